@@ -0,0 +1,546 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import BaseHTTPServer
+import collections
+import json
+import re
+import SocketServer
+import threading
+import time
+import urlparse
+
+
+PROJECTS = ("P1", "P2")
+
+ISSUE_TYPES = [{"id": "1", "name": "Bug"}, {"id": "2", "name": "Task"}]
+
+STATUSES = [{"id": "3", "name": "Open"}, {"id": "4", "name": "In Progress"}, {"id": "5", "name": "Closed"}]
+
+TRANSITIONS = [
+    {"id": "11", "name": "Start", "to": STATUSES[1]},
+    {"id": "21", "name": "Close", "to": STATUSES[2]},
+    {"id": "31", "name": "Reopen", "to": STATUSES[0]},
+]
+
+LINK_TYPES = [{"id": "10", "name": "DEPENDS", "inward": "is depended on by", "outward": "depends on"}]
+
+FIELDS = [
+    {"id": x, "name": x.capitalize(), "custom": False, "clauseNames": [x]}
+    for x in ("summary", "description", "issuetype", "project", "assignee", "status", "labels", "issuelinks")
+] + [{"id": "customfield_10010", "name": "Story Points", "custom": True, "clauseNames": ["cf[10010]"]}]
+
+USERS = 10
+
+# the max number of histories of changelog, that is returned by search
+CHANGELOG_LIMIT = 100
+
+# the time of the newest synthetic issue and comment
+EPOCH = 1483228800
+
+CLAUSE = re.compile(r'(\w+)\s*(=|\bin\b)\s*(\([^)]*\)|"[^"]*"|\S+)', re.IGNORECASE)
+
+ORDER_BY = re.compile(r"\s+order\s+by\s+.*$", re.IGNORECASE | re.DOTALL)
+
+
+def format_time(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime(timestamp))
+
+
+class Dataset(object):
+    """Synthetic Jira data, the issues, comments and links are generated on demand.
+
+    The project P1 has many issues for read scenarios, the project P2 is small
+    and is modified by write scenarios. The changes are kept in memory.
+    """
+
+    def __init__(self, issues=100000, small_issues=200, comments=50, links=5, text_size=200):
+        self.sizes = {"P1": issues, "P2": small_issues}
+        self.comments = comments
+        self.links = links
+        self.text_size = text_size
+        self.lock = threading.RLock()
+        self.changes = collections.defaultdict(dict)
+        self.new_comments = collections.defaultdict(list)
+        self.new_links = {}
+        self.deleted_links = set()
+        self.matches = {}
+        self.sequence = 10 ** 9
+        # the base of resource links, it is set by server
+        self.url = ""
+
+    def parse_key(self, key):
+        """Converts issue key or ID to (project, number), None if the issue does not exist."""
+        if key.isdigit():
+            project, number = PROJECTS[int(key) // 10 ** 7 - 1], int(key) % 10 ** 7
+        else:
+            project, _, number = key.upper().partition("-")
+            if project not in self.sizes or not number.isdigit():
+                return None
+            number = int(number)
+        return (project, number) if 1 <= number <= self.sizes[project] else None
+
+    @staticmethod
+    def get_id(project, number):
+        return str((PROJECTS.index(project) + 1) * 10 ** 7 + number)
+
+    def get_fields(self, project, number):
+        fields = {
+            "summary": u"Issue {0}-{1}".format(project, number),
+            "description": u"x" * self.text_size,
+            "issuetype": ISSUE_TYPES[number % len(ISSUE_TYPES)],
+            "project": {"id": str(10000 + PROJECTS.index(project)), "key": project, "name": "Project " + project},
+            "assignee": {"name": "user{0}".format(number % USERS), "displayName": "User {0}".format(number % USERS)},
+            "status": STATUSES[0],
+            "labels": ["l{0}".format(number % 5)],
+            "created": format_time(EPOCH - number * 3600),
+            "updated": format_time(EPOCH - number * 60),
+            "customfield_10010": number % 13,
+        }
+        fields.update(self.changes.get((project, number), {}))
+        return fields
+
+    def get_issue(self, key, fields=None, links=True, expand=None, changelog_limit=None):
+        found = self.parse_key(key)
+        if found is None:
+            return None
+        project, number = found
+        issue_id = self.get_id(project, number)
+        with self.lock:
+            data = self.get_fields(project, number)
+            if links and (fields is None or "issuelinks" in fields):
+                data["issuelinks"] = self.get_links(project, number)
+        if fields is not None:
+            data = dict((k, v) for k, v in data.items() if k in fields)
+        issue = {
+            "id": issue_id, "key": u"{0}-{1}".format(project, number),
+            "self": self.url + "/rest/api/2/issue/" + issue_id, "fields": data,
+        }
+        if expand and "changelog" in expand.split(","):
+            histories = self.get_changelog(project, number)
+            shown = histories[:changelog_limit or len(histories)]
+            issue["changelog"] = {
+                "startAt": 0, "maxResults": len(shown), "total": len(histories), "histories": shown,
+            }
+        return issue
+
+    def get_changelog(self, project, number):
+        """Generates the status transitions, the issues go back and forth between statuses and half are closed.
+
+        Every 97th issue has long history, that is truncated by search.
+        """
+        cycles = 60 if number % 97 == 0 else number % 3
+        targets = [STATUSES[1], STATUSES[0]] * cycles + [STATUSES[1]] + ([STATUSES[2]] if number % 2 else [])
+        moment = EPOCH - number * 3600
+        status = STATUSES[0]
+        histories = []
+        for index, target in enumerate(targets):
+            moment += (number % 11 + 1) * 600
+            histories.append({
+                "id": str(number * 1000 + index), "author": {"name": "user{0}".format(number % USERS)},
+                "created": format_time(moment),
+                "items": [{
+                    "field": "status", "fieldtype": "jira", "from": status["id"], "fromString": status["name"],
+                    "to": target["id"], "toString": target["name"],
+                }],
+            })
+            status = target
+        return histories
+
+    def update_issue(self, key, data):
+        project, number = self.parse_key(key)
+        with self.lock:
+            changes = self.changes[(project, number)]
+            current = self.get_fields(project, number)
+            changes.update(data.get("fields", {}))
+            for name, operations in data.get("update", {}).items():
+                values = list(current.get(name) or [])
+                # the values without operations replace the current ones
+                if not all(isinstance(x, dict) for x in operations):
+                    operations = [{"set": operations}]
+                for operation in operations:
+                    for op, value in operation.items():
+                        if op == "add" and value not in values:
+                            values.append(value)
+                        elif op == "remove" and value in values:
+                            values.remove(value)
+                        elif op == "set":
+                            values = value
+                changes[name] = values
+            changes["updated"] = format_time(time.time())
+            self.matches.clear()
+
+    def create_issue(self, fields):
+        project = fields.get("project", {})
+        project = project.get("key") or PROJECTS[int(project.get("id", 10000)) - 10000]
+        with self.lock:
+            self.sizes[project] += 1
+            number = self.sizes[project]
+            self.changes[(project, number)] = dict(
+                (k, v) for k, v in fields.items() if k in ("summary", "description", "labels")
+            )
+            self.matches.clear()
+        return {"id": self.get_id(project, number), "key": u"{0}-{1}".format(project, number)}
+
+    def search(self, jql, start_at, max_results, fields, expand=None):
+        with self.lock:
+            matches = self.matches.get(jql)
+            if matches is None:
+                matches = self.matches[jql] = self.match(jql)
+            page = matches[start_at:start_at + max_results]
+            issues = [self.get_issue(x, fields, expand=expand, changelog_limit=CHANGELOG_LIMIT) for x in page]
+        return {"startAt": start_at, "maxResults": max_results, "total": len(matches), "issues": issues}
+
+    def match(self, jql):
+        """Finds keys of issues, which match the supported subset of JQL, other clauses are ignored."""
+        clauses = []
+        for name, _, value in CLAUSE.findall(ORDER_BY.sub("", jql)):
+            values = [x.strip().strip('"\'').upper() for x in value.strip("()").split(",")]
+            clauses.append((name.lower(), set(values)))
+
+        projects = [x for x in PROJECTS if all(x in v for k, v in clauses if k == "project")]
+        keys = set()
+        for name, values in clauses:
+            if name in ("key", "issuekey"):
+                keys.update(values)
+
+        def value(fields, name):
+            field = fields.get(name)
+            return (field.get("name") if isinstance(field, dict) else field or "").upper()
+
+        result = []
+        for project in projects:
+            for number in range(1, self.sizes[project] + 1):
+                key = u"{0}-{1}".format(project, number)
+                if keys and key not in keys:
+                    continue
+                fields = self.get_fields(project, number)
+                if all(value(fields, k) in v for k, v in clauses if k in ("assignee", "status", "summary")):
+                    result.append(key)
+        return result
+
+    def get_comments(self, key, start_at, max_results, order_by):
+        project, number = self.parse_key(key)
+        issue_id = int(self.get_id(project, number))
+        with self.lock:
+            added = list(self.new_comments.get(key.upper(), []))
+        total = self.comments + len(added)
+        indexes = range(total)
+        if order_by == "-created":
+            indexes = reversed(indexes)
+        comments = [
+            self.make_comment(issue_id, x) if x < self.comments else added[x - self.comments]
+            for x in list(indexes)[start_at:start_at + max_results]
+        ]
+        return {"startAt": start_at, "maxResults": max_results, "total": total, "comments": comments}
+
+    def make_comment(self, issue_id, index):
+        created = format_time(EPOCH - (self.comments - index) * 60)
+        return {
+            "id": str(issue_id * 10 ** 4 + index), "author": {"name": "user{0}".format(index % USERS)},
+            "body": u"Comment {0} ".format(index) + u"x" * self.text_size, "created": created, "updated": created,
+        }
+
+    def get_comment(self, key, comment_id):
+        comment_id = int(comment_id)
+        project, number = self.parse_key(key)
+        with self.lock:
+            for comment in self.new_comments.get(key.upper(), []):
+                if int(comment["id"]) == comment_id:
+                    return comment
+        return self.make_comment(int(self.get_id(project, number)), comment_id % 10 ** 4)
+
+    def add_comment(self, key, body):
+        now = format_time(time.time())
+        with self.lock:
+            self.sequence += 1
+            comment = {"id": str(self.sequence), "author": {"name": "user0"}, "body": body, "created": now,
+                       "updated": now}
+            self.new_comments[key.upper()].append(comment)
+        return comment
+
+    def get_links(self, project, number):
+        issue_id = int(self.get_id(project, number))
+        links = []
+        for index in range(1, self.links + 1):
+            target = (number + index - 1) % self.sizes[project] + 1
+            link_id = str(issue_id * 100 + index)
+            if link_id not in self.deleted_links:
+                links.append(self.make_link(link_id, "{0}-{1}".format(project, target), "outwardIssue"))
+        for link_id, (inward, outward) in self.new_links.items():
+            if u"{0}-{1}".format(project, number) in (inward, outward) and link_id not in self.deleted_links:
+                if outward.upper() == u"{0}-{1}".format(project, number):
+                    links.append(self.make_link(link_id, inward, "inwardIssue"))
+                else:
+                    links.append(self.make_link(link_id, outward, "outwardIssue"))
+        return links
+
+    def make_link(self, link_id, target, direction):
+        issue = self.get_issue(target, fields=("summary", "status"), links=False)
+        return {"id": link_id, "type": LINK_TYPES[0], direction: issue}
+
+    def get_link(self, link_id):
+        with self.lock:
+            if link_id in self.deleted_links:
+                return None
+            if link_id in self.new_links:
+                inward, outward = self.new_links[link_id]
+            else:
+                issue_id, index = divmod(int(link_id), 100)
+                project, number = self.parse_key(str(issue_id))
+                inward = "{0}-{1}".format(project, number)
+                outward = "{0}-{1}".format(project, (number + index - 1) % self.sizes[project] + 1)
+        link = self.make_link(link_id, outward, "outwardIssue")
+        link["inwardIssue"] = self.get_issue(inward, fields=("summary", "status"), links=False)
+        return link
+
+    def add_link(self, inward, outward):
+        with self.lock:
+            self.sequence += 1
+            self.new_links[str(self.sequence)] = (inward.upper(), outward.upper())
+            return str(self.sequence)
+
+    def delete_link(self, link_id):
+        with self.lock:
+            self.deleted_links.add(link_id)
+
+
+class Stats(object):
+    """Counters of requests and transferred bytes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes = 0
+
+    def add(self, size):
+        with self.lock:
+            self.requests += 1
+            self.bytes += size
+
+    def snapshot(self):
+        with self.lock:
+            return {"requests": self.requests, "bytes": self.bytes}
+
+
+class RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves the subset of Jira REST API, which is used by commands."""
+
+    protocol_version = "HTTP/1.1"
+
+    routes = [
+        ("GET", r"serverInfo", "server_info"),
+        ("GET", r"(field|issuetype|issueLinkType|priority|status)", "metadata"),
+        ("GET", r"project/([^/]+)", "project"),
+        ("GET", r"search", "search"),
+        ("POST", r"issue", "create_issue"),
+        ("POST", r"issue/bulk", "create_issues"),
+        ("GET", r"issue/([^/]+)", "get_issue"),
+        ("PUT", r"issue/([^/]+)", "update_issue"),
+        ("GET", r"issue/([^/]+)/transitions", "get_transitions"),
+        ("POST", r"issue/([^/]+)/transitions", "transition_issue"),
+        ("GET", r"issue/([^/]+)/comment", "get_comments"),
+        ("POST", r"issue/([^/]+)/comment", "add_comment"),
+        ("GET", r"issue/([^/]+)/comment/(\d+)", "get_comment"),
+        ("PUT", r"issue/([^/]+)/comment/(\d+)", "edit_comment"),
+        ("GET", r"issue/([^/]+)/remotelink", "get_remote_links"),
+        ("POST", r"issue/([^/]+)/remotelink", "add_remote_link"),
+        ("POST", r"issueLink", "add_link"),
+        ("GET", r"issueLink/(\d+)", "get_link"),
+        ("DELETE", r"issueLink/(\d+)", "delete_link"),
+    ]
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def dispatch(self, method):
+        url = urlparse.urlparse(self.path)
+        # the repeated parameters, e.g. fields, are joined
+        self.params = dict((k, ",".join(v)) for k, v in urlparse.parse_qs(url.query).items())
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else ""
+        path = url.path.split("/rest/api/2/", 1)[-1].rstrip("/")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        for route_method, pattern, name in self.routes:
+            match = re.match(pattern + "$", path)
+            if match and route_method == method:
+                try:
+                    status, data, headers = getattr(self, name)(*match.groups())
+                except Exception as e:
+                    status, data, headers = 500, {"errorMessages": [str(e)]}, None
+                break
+        else:
+            status, data, headers = 404, {"errorMessages": ["Not found: " + path]}, None
+        self.respond(status, data, headers, length)
+
+    def respond(self, status, data, headers, received):
+        content = json.dumps(data) if data is not None else ""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+        self.server.stats.add(received + len(content))
+
+    def get_json(self):
+        return json.loads(self.body) if self.body else {}
+
+    @property
+    def data(self):
+        return self.server.dataset
+
+    def not_found(self):
+        return 404, {"errorMessages": ["Issue Does Not Exist"]}, None
+
+    def server_info(self):
+        return 200, {"versionNumbers": [7, 3, 0], "version": "7.3.0", "deploymentType": "Server"}, None
+
+    def metadata(self, kind):
+        data = {
+            "field": FIELDS, "issuetype": ISSUE_TYPES, "issueLinkType": {"issueLinkTypes": LINK_TYPES},
+            "priority": [{"id": "1", "name": "High"}], "status": STATUSES,
+        }
+        return 200, data[kind], None
+
+    def project(self, key):
+        if key not in PROJECTS:
+            return self.not_found()
+        return 200, {"id": str(10000 + PROJECTS.index(key)), "key": key, "name": "Project " + key}, None
+
+    def get_fields_param(self):
+        fields = self.params.get("fields")
+        if not fields or fields.startswith("*"):
+            return None
+        return set(fields.split(","))
+
+    def search(self):
+        start_at = int(self.params.get("startAt", 0))
+        max_results = min(int(self.params.get("maxResults", 50)), 1000)
+        result = self.data.search(
+            self.params.get("jql", ""), start_at, max_results, self.get_fields_param(), self.params.get("expand")
+        )
+        return 200, result, None
+
+    def get_issue(self, key):
+        issue = self.data.get_issue(key, self.get_fields_param(), expand=self.params.get("expand"))
+        return (200, issue, None) if issue else self.not_found()
+
+    def update_issue(self, key):
+        if self.data.parse_key(key) is None:
+            return self.not_found()
+        self.data.update_issue(key, self.get_json())
+        return 204, None, None
+
+    def create_issue(self):
+        return 201, self.data.create_issue(self.get_json()["fields"]), None
+
+    def create_issues(self):
+        issues = [self.data.create_issue(x["fields"]) for x in self.get_json()["issueUpdates"]]
+        return 201, {"issues": issues, "errors": []}, None
+
+    def get_transitions(self, key):
+        if self.data.parse_key(key) is None:
+            return self.not_found()
+        return 200, {"transitions": TRANSITIONS}, None
+
+    def transition_issue(self, key):
+        if self.data.parse_key(key) is None:
+            return self.not_found()
+        data = self.get_json()
+        transition = [x for x in TRANSITIONS if x["id"] == str(data["transition"]["id"])]
+        if not transition:
+            return 400, {"errorMessages": ["Invalid transition"]}, None
+        self.data.update_issue(key, {"fields": dict(data.get("fields") or {}, status=transition[0]["to"])})
+        return 204, None, None
+
+    def get_comments(self, key):
+        if self.data.parse_key(key) is None:
+            return self.not_found()
+        start_at = int(self.params.get("startAt", 0))
+        max_results = min(int(self.params.get("maxResults", 50)), 1000)
+        return 200, self.data.get_comments(key, start_at, max_results, self.params.get("orderBy")), None
+
+    def add_comment(self, key):
+        if self.data.parse_key(key) is None:
+            return self.not_found()
+        return 201, self.data.add_comment(key, self.get_json().get("body", "")), None
+
+    def get_comment(self, key, comment_id):
+        if self.data.parse_key(key) is None:
+            return self.not_found()
+        return 200, self.data.get_comment(key, comment_id), None
+
+    def edit_comment(self, key, comment_id):
+        if self.data.parse_key(key) is None:
+            return self.not_found()
+        return 200, dict(self.data.get_comment(key, comment_id), body=self.get_json().get("body", "")), None
+
+    def get_remote_links(self, key):
+        return 200, [], None
+
+    def add_remote_link(self, key):
+        return 201, {"id": 1, "self": "{0}/rest/api/2/issue/{1}/remotelink/1".format(self.server.url, key)}, None
+
+    def add_link(self):
+        data = self.get_json()
+        link_id = self.data.add_link(data["inwardIssue"]["key"], data["outwardIssue"]["key"])
+        return 201, None, {"Location": "{0}/rest/api/2/issueLink/{1}".format(self.server.url, link_id)}
+
+    def get_link(self, link_id):
+        link = self.data.get_link(link_id)
+        return (200, link, None) if link else self.not_found()
+
+    def delete_link(self, link_id):
+        self.data.delete_link(link_id)
+        return 204, None, None
+
+
+class FakeJira(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Local stand-in of Jira server, each request is delayed by latency."""
+
+    daemon_threads = True
+
+    def __init__(self, dataset, latency=0, address=("127.0.0.1", 0)):
+        self.dataset = dataset
+        self.latency = latency
+        self.stats = Stats()
+        BaseHTTPServer.HTTPServer.__init__(self, address, RequestHandler)
+        self.url = dataset.url = "http://{0}:{1}".format(*self.server_address)
+
+    def start(self):
+        """Serves requests in background thread."""
+        thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05})
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,275 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import collections
+import ConfigParser
+import functools
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import fakejira
+from jiractl import index
+
+
+# Runs every command against the local fake Jira server and records its cost,
+# the package should be installed, e.g. by 'pip install -e .', so the commands are found:
+#
+#    python -m benchmarks.run --output results.json
+#    python -m benchmarks.run --output new.json --compare results.json
+#
+# The results of runs, which use the same dataset, are comparable across commits.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the command is started as the console script does
+LAUNCHER = "import sys; from jiractl import app; sys.exit(app.main(sys.argv[1:]))"
+
+# the scenario per entry point: name, command line, and optional stdin and file contents
+SCENARIOS = [
+    ("issue", ["issue", "--id", "P1-1"]),
+    ("issue_create", ["issue", "create", "--project", "P2", "--type", "Bug", "--summary", "S1",
+                      "--description", "D1"]),
+    ("issue_create_bulk", ["issue", "create", "bulk", "--file", "{issues_csv}", "--project", "P2", "--type", "Bug"]),
+    ("issue_edit", ["issue", "edit", "--query", "project = P2", "--status", "Start"]),
+    ("issues", ["issues", "--project", "P1", "--assignee", "user1", "--status", "Open"]),
+    ("issues_search", ["issues", "search", "--query", "project = P1"]),
+    ("issues_search_raw", ["issues", "search", "--query", "project = P1", "--raw-json"]),
+    ("issues_search_pages", ["issues", "search", "--query", "project = P1", "--raw-json", "--page-size", "1000"]),
+    ("issues_sync", ["issues", "sync", "--query", "project = P2", "--db", "{tmpdir}/mirror.db"]),
+    ("issues_export", ["issues", "export", "--query", "project = P1", "--out", "{tmpdir}/issues.jsonl.gz",
+                       "--restart"]),
+    ("issues_stats", ["issues", "stats", "--query", "project = P1", "--page-size", "1000"]),
+    ("issue_comment", ["issue", "comment", "--issue", "P1-1", "--id", "100000010001"]),
+    ("issue_comment_edit", ["issue", "comment", "edit", "--issue", "P1-1", "--id", "100000010001", "--text", "T"]),
+    ("issue_comments", ["issue", "comments", "--issue", "P1-1"]),
+    ("issue_comments_add", ["issue", "comments", "add", "--issue", "P1-1", "--text", "T"]),
+    ("issue_labels", ["issue", "labels", "--issue", "P1-1"]),
+    ("issue_labels_add", ["issue", "labels", "add", "--query", "project = P2", "--labels", "bench"]),
+    ("issue_labels_drop", ["issue", "labels", "drop", "--query", "project = P2", "--labels", "bench"]),
+    ("issue_link", ["issue", "link", "--issue", "P1-1", "--id", "I1000000101"]),
+    ("issue_links", ["issue", "links", "--query", "project = P2"]),
+    ("issue_links_add", ["issue", "links", "add", "--issue", "P2-1", "--type", "DEPENDS", "--target", "P2-2"]),
+    ("issue_links_drop", ["issue", "links", "drop", "--issue", "P2-1", "--id", "I2000000101"]),
+    ("daemon", ["issue", "--id", "P1-2"]),
+    ("batch", ["batch", "--file", "{batch_txt}"]),
+    ("metadata", ["metadata", "--kind", "fields"]),
+    ("metadata_refresh", ["metadata", "refresh"]),
+    # the import of application and loading of commands only
+    ("startup", ["--version"]),
+]
+
+# the size of output, which is shown if command fails, and the size of chunk, that is read at once
+OUTPUT_TAIL = 64 * 1024
+OUTPUT_CHUNK = 4096
+
+# the metrics, which are compared between runs, and the allowed growth
+THRESHOLDS = {"wall": 1.2, "requests": 1.0, "bytes": 1.1, "rss": 1.2}
+
+
+def get_entry_points():
+    """Gets names of commands from setup.cfg."""
+    config = ConfigParser.ConfigParser()
+    config.read(os.path.join(ROOT, "setup.cfg"))
+    return index.parse_entry_points(config.get("entry_points", "jiractl"))
+
+
+def write_inputs(tmpdir, args):
+    """Writes the input files of scenarios, returns their paths by name."""
+    paths = {"tmpdir": tmpdir}
+    paths["issues_csv"] = os.path.join(tmpdir, "issues.csv")
+    with io.open(paths["issues_csv"], "w", encoding="utf8") as stream:
+        stream.write(u"summary,labels\n")
+        for number in range(args.bulk_issues):
+            stream.write(u"Bulk issue {0},bench\n".format(number))
+    paths["batch_txt"] = os.path.join(tmpdir, "batch.txt")
+    with io.open(paths["batch_txt"], "w", encoding="utf8") as stream:
+        for number in range(1, args.batch_commands + 1):
+            stream.write(u"issue --id P2-{0}\n".format(number % args.small_issues + 1))
+    return paths
+
+
+def run_command(argv, env):
+    """Runs command in new process, returns exit code, wall time and peak RSS in KB.
+
+    The output is discarded, but its tail is written to stderr if the command fails.
+    """
+    with open(os.devnull) as devnull:
+        started = time.time()
+        process = subprocess.Popen(
+            [sys.executable, "-c", LAUNCHER] + argv, stdin=devnull, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            env=env
+        )
+        # the output is read by chunks, so the large one is not kept in memory
+        tail = collections.deque(maxlen=OUTPUT_TAIL // OUTPUT_CHUNK)
+        for chunk in iter(functools.partial(process.stdout.read, OUTPUT_CHUNK), b""):
+            tail.append(chunk)
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.time() - started
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    if process.returncode:
+        sys.stderr.write(b"".join(tail))
+    return process.returncode, elapsed, usage.ru_maxrss
+
+
+def start_daemon(argv, env):
+    """Starts daemon and waits until it listens."""
+    process = subprocess.Popen([sys.executable, "-c", LAUNCHER] + argv, stdout=subprocess.PIPE, env=env)
+    process.stdout.readline()
+    return process
+
+
+def run_scenario(server, name, argv, env, global_args):
+    """Runs scenario and returns its metrics or None if the command fails."""
+    daemon = None
+    if name == "daemon":
+        daemon = start_daemon(global_args + ["daemon", "--socket", env["JIRACTL_SOCKET"]], env)
+    try:
+        before = server.stats.snapshot()
+        code, elapsed, rss = run_command(global_args + argv, env)
+        after = server.stats.snapshot()
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+    if code:
+        return None
+    return {
+        "wall": round(elapsed, 4),
+        "requests": after["requests"] - before["requests"],
+        "bytes": after["bytes"] - before["bytes"],
+        "rss": rss,
+    }
+
+
+def run(args):
+    missing = sorted(set(get_entry_points()) - set(x[0] for x in SCENARIOS))
+    if missing:
+        raise ValueError("There are no scenarios for commands: " + ", ".join(missing))
+
+    dataset = fakejira.Dataset(args.issues, args.small_issues, args.comments, args.links, args.text_size)
+    server = fakejira.FakeJira(dataset, args.latency).start()
+    tmpdir = tempfile.mkdtemp()
+    try:
+        paths = write_inputs(tmpdir, args)
+        env = dict(os.environ, HOME=tmpdir, JIRACTL_SOCKET=os.path.join(tmpdir, "daemon.sock"))
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+        global_args = ["-s", server.url, "-u", "user0", "-p", "secret"]
+        # the metadata is fetched once and is cached as in normal usage
+        if run_command(global_args + ["metadata", "refresh"], env)[0]:
+            raise RuntimeError("Cannot fetch metadata, is the package installed?")
+
+        results = {}
+        failed = []
+        for name, argv in SCENARIOS:
+            if args.scenario and name not in args.scenario:
+                continue
+            argv = [x.format(**paths) for x in argv]
+            runs = [run_scenario(server, name, argv, env, global_args) for _ in range(args.repeat)]
+            if None in runs:
+                failed.append(name)
+                sys.stderr.write("{0}: FAILED\n".format(name))
+                continue
+            # the fastest run is the least affected by noise
+            results[name] = min(runs, key=lambda x: x["wall"])
+            sys.stderr.write("{0}: {1}\n".format(name, json.dumps(results[name], sort_keys=True)))
+    finally:
+        server.stop()
+        shutil.rmtree(tmpdir)
+
+    # the partial results must not become a baseline
+    if failed:
+        raise RuntimeError("The scenarios failed: " + ", ".join(failed))
+
+    return {
+        "commit": get_commit(),
+        "python": sys.version.split()[0],
+        "dataset": {
+            "issues": args.issues, "small_issues": args.small_issues, "comments": args.comments,
+            "links": args.links, "text_size": args.text_size, "latency": args.latency,
+            "bulk_issues": args.bulk_issues, "batch_commands": args.batch_commands,
+        },
+        "scenarios": results,
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results, stream):
+    """Writes the changes of metrics, returns the list of regressions."""
+    if baseline["dataset"] != results["dataset"]:
+        raise ValueError("The results use different datasets")
+    regressions = []
+    for name, metrics in sorted(results["scenarios"].items()):
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        changes = []
+        for metric, threshold in sorted(THRESHOLDS.items()):
+            ratio = float(metrics[metric]) / old[metric] if old[metric] else 1.0
+            changes.append("{0} {1:+.0%}".format(metric, ratio - 1))
+            if ratio > threshold:
+                regressions.append((name, metric, old[metric], metrics[metric]))
+        stream.write("{0}: {1}\n".format(name, ", ".join(changes)))
+    for name, metric, old, new in regressions:
+        stream.write("REGRESSION {0} {1}: {2} -> {3}\n".format(name, metric, old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of commands against the local fake Jira server")
+    parser.add_argument("--issues", type=int, default=100000, help="Number of issues in project P1")
+    parser.add_argument("--small-issues", type=int, default=200, help="Number of issues in project P2")
+    parser.add_argument("--comments", type=int, default=1000, help="Number of comments per issue")
+    parser.add_argument("--links", type=int, default=5, help="Number of links per issue")
+    parser.add_argument("--text-size", type=int, default=200, help="Size of description and comments")
+    parser.add_argument("--latency", type=float, default=0.005, help="Delay of each response, seconds")
+    parser.add_argument("--bulk-issues", type=int, default=500, help="Number of issues created by bulk")
+    parser.add_argument("--batch-commands", type=int, default=200, help="Number of commands in batch")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of runs of each scenario")
+    parser.add_argument("--scenario", nargs="+", help="Run only these scenarios")
+    parser.add_argument("--output", help="Write results to JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare results with previous ones")
+    args = parser.parse_args(argv)
+
+    try:
+        results = run(args)
+    except RuntimeError as e:
+        sys.stderr.write("{0}\n".format(e))
+        return 1
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(results, stream, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)
+        if compare(baseline, results, sys.stdout):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
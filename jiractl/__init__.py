@@ -13,9 +13,13 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import pbr.version
-
 try:
-    __version__ = pbr.version.VersionInfo(__package__).version_string()
-except Exception:
-    __version__ = "0.0.0"
+    # the version is stored in the index of commands at install time
+    from jiractl._index import VERSION as __version__
+except ImportError:
+    import pbr.version
+
+    try:
+        __version__ = pbr.version.VersionInfo(__package__).version_string()
+    except Exception:
+        __version__ = "0.0.0"
@@ -0,0 +1,188 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import array
+import collections
+import math
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+DAY = 24 * 60 * 60
+
+WEEK = 7 * DAY
+
+# the weeks start on Monday, the epoch is Thursday
+WEEK_SHIFT = 3 * DAY
+
+NAN = float("nan")
+
+
+def get_week(timestamp):
+    """Gets the start of week, which contains time."""
+    return (timestamp + WEEK_SHIFT) // WEEK * WEEK - WEEK_SHIFT
+
+
+def summarize(values, percentiles):
+    """Gets count, mean, percentiles and max of values.
+
+    The percentiles are nearest ranks, so they are values of sample
+    and do not depend on whether numpy is used.
+    """
+    if numpy is not None:
+        values = numpy.sort(numpy.asarray(values, dtype=numpy.float64))
+        count = len(values)
+        if not count:
+            return 0, None, [None] * len(percentiles), None
+        ranks = numpy.ceil(numpy.asarray(percentiles, dtype=numpy.float64) / 100.0 * count).astype(int)
+        ranks = numpy.clip(ranks - 1, 0, count - 1)
+        return count, float(values.mean()), [float(x) for x in values[ranks]], float(values[-1])
+
+    values = sorted(values)
+    count = len(values)
+    if not count:
+        return 0, None, [None] * len(percentiles), None
+    ranks = [min(max(int(math.ceil(x / 100.0 * count)) - 1, 0), count - 1) for x in percentiles]
+    return count, math.fsum(values) / count, [values[x] for x in ranks], values[-1]
+
+
+class Timeline(object):
+    """Statuses of issues over time.
+
+    The time, which the issues have spent in statuses, is kept in columns of
+    segments: issue, status, start and end, the columns are arrays, which are
+    processed by numpy if it is installed. The time of issue in the current status
+    is counted until now, unless it is one of done statuses.
+    The lead time is from creation to the last transition to done status,
+    the cycle time is from the first transition to one of started statuses to done.
+    """
+
+    def __init__(self, started, done, now=None):
+        self.started = frozenset(started)
+        self.done = frozenset(done)
+        self.now = now or time.time()
+        self.names = []
+        self.codes = {}
+        # the segments
+        self.issue = array.array("i")
+        self.status = array.array("i")
+        self.start = array.array("d")
+        self.end = array.array("d")
+        # the issues
+        self.created = array.array("d")
+        self.first_started = array.array("d")
+        self.completed = array.array("d")
+
+    def __len__(self):
+        return len(self.created)
+
+    def get_code(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def add_issue(self, created, transitions, status=None):
+        """Adds issue, the transitions are (time, from status, to status) in order of time.
+
+        The status is the current status, it is used if there are no transitions.
+        """
+        index = len(self.created)
+        if transitions:
+            status = transitions[0][1]
+        since = created
+        first_started = NAN
+        for moment, _, to_status in transitions:
+            self.add_segment(index, status, since, moment)
+            if first_started != first_started and to_status in self.started:
+                first_started = moment
+            status, since = to_status, moment
+
+        if status in self.done:
+            completed = since
+        else:
+            completed = NAN
+            self.add_segment(index, status, since, max(since, self.now))
+        self.created.append(created)
+        self.first_started.append(first_started)
+        self.completed.append(completed)
+
+    def add_segment(self, index, status, start, end):
+        self.issue.append(index)
+        self.status.append(self.get_code(status))
+        self.start.append(start)
+        self.end.append(end)
+
+    def get_time_in_status(self):
+        """Gets the total time of each issue in status, keyed by name of status.
+
+        Only the issues, which have been in status, are counted.
+        """
+        if numpy is not None:
+            count = len(self.names)
+            keys = numpy.frombuffer(self.issue, dtype=numpy.intc).astype(numpy.int64) * count
+            keys += numpy.frombuffer(self.status, dtype=numpy.intc)
+            durations = numpy.frombuffer(self.end) - numpy.frombuffer(self.start)
+            size = len(self) * count
+            totals = numpy.bincount(keys, weights=durations, minlength=size).reshape(len(self), count)
+            visited = numpy.bincount(keys, minlength=size).reshape(len(self), count) > 0
+            return dict((name, totals[visited[:, i], i]) for i, name in enumerate(self.names))
+
+        totals = collections.defaultdict(float)
+        for key in zip(self.issue, self.status, self.start, self.end):
+            totals[key[:2]] += key[3] - key[2]
+        result = dict((name, []) for name in self.names)
+        for (_, status), total in totals.items():
+            result[self.names[status]].append(total)
+        return result
+
+    def get_lead_times(self):
+        """Gets times from creation to completion of completed issues."""
+        return self.get_durations(self.created, self.completed)
+
+    def get_cycle_times(self):
+        """Gets times from start to completion of issues, which have been started and completed."""
+        return self.get_durations(self.first_started, self.completed)
+
+    @staticmethod
+    def get_durations(start, end):
+        if numpy is not None:
+            durations = numpy.frombuffer(end) - numpy.frombuffer(start)
+            return durations[~numpy.isnan(durations)]
+        # the NaN is not equal to itself
+        return [e - s for s, e in zip(start, end) if e - s == e - s]
+
+    def get_throughput(self):
+        """Gets the number of completed issues per week, returns list of (start of week, count)."""
+        if numpy is not None:
+            completed = numpy.frombuffer(self.completed)
+            completed = completed[~numpy.isnan(completed)]
+            if not len(completed):
+                return []
+            weeks = ((completed + WEEK_SHIFT) // WEEK).astype(numpy.int64)
+            first = weeks.min()
+            counts = numpy.bincount(weeks - first)
+            return [(int((first + i) * WEEK - WEEK_SHIFT), int(x)) for i, x in enumerate(counts)]
+
+        counts = collections.Counter(get_week(x) for x in self.completed if x == x)
+        if not counts:
+            return []
+        first, last = min(counts), max(counts)
+        return [(int(x), counts.get(x, 0)) for x in range(int(first), int(last) + 1, WEEK)]
@@ -13,11 +13,21 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import functools
+import io
+import os
+import sys
+import threading
+
 from cliff import app
 from cliff.commandmanager import CommandManager
-import jira
 
 import jiractl
+from jiractl import backend
+from jiractl import cache
+from jiractl import config
+from jiractl import daemon
+from jiractl import index
 
 
 class JiraApp(app.App):
@@ -28,6 +38,17 @@ class JiraApp(app.App):
     """
 
     _jira = None
+    _issue_cache = None
+    _transition_cache = None
+    _metadata_cache = None
+    _backend = None
+    _tracer = None
+    config_problems = ()
+
+    def __init__(self, *args, **kwargs):
+        # guards the lazy creation of caches
+        self._lock = threading.Lock()
+        super(JiraApp, self).__init__(*args, **kwargs)
 
     def build_option_parser(self, description, version, argparse_kwargs=None):
         """Specifies global options."""
@@ -50,34 +71,275 @@ class JiraApp(app.App):
             metavar="PASSWORD",
             help="Jira password"
         )
+        parser.add_argument(
+            "--backend",
+            choices=sorted(backend.BACKENDS),
+            default="threads",
+            help="The way to execute many requests, default: %(default)s"
+        )
+        parser.add_argument(
+            "--raw-json",
+            action="store_true",
+            help="Read issues, comments and links of lists directly from JSON instead of making jira resources, "
+                 "the custom fields are displayed as they are returned by server"
+        )
+        parser.add_argument(
+            "--concurrency",
+            metavar="REQUESTS",
+            type=int,
+            default=8,
+            help="Max number of requests in flight, default: %(default)s"
+        )
+        parser.add_argument(
+            "--max-rate",
+            metavar="REQUESTS",
+            type=float,
+            help="Max number of requests per second, by default it is found out by throttling of server"
+        )
+        parser.add_argument(
+            "--throttle-retries",
+            metavar="COUNT",
+            type=int,
+            default=3,
+            help="Number of retries of GET request, which has been throttled by server, default: %(default)s"
+        )
+        parser.add_argument(
+            "--pool-size",
+            metavar="CONNECTIONS",
+            type=int,
+            help="Number of kept-alive connections to server, default: concurrency"
+        )
+        parser.add_argument(
+            "--no-keep-alive",
+            dest="keep_alive",
+            action="store_false",
+            help="Close connection after each request"
+        )
+        parser.add_argument(
+            "--no-compression",
+            dest="compression",
+            action="store_false",
+            help="Do not ask server to compress responses"
+        )
+        parser.add_argument(
+            "--connect-timeout",
+            metavar="SECONDS",
+            type=float,
+            default=10,
+            help="Timeout of connecting to server, default: %(default)s"
+        )
+        parser.add_argument(
+            "--read-timeout",
+            metavar="SECONDS",
+            type=float,
+            default=120,
+            help="Timeout of waiting for response data, default: %(default)s"
+        )
+        parser.add_argument(
+            "--json-decoder",
+            choices=("auto", "orjson", "ujson", "json"),
+            default="auto",
+            help="The decoder of responses, auto means the fastest of installed ones, default: %(default)s"
+        )
+        parser.add_argument(
+            "--trace-http",
+            action="store_true",
+            help="Print statistics of HTTP requests and time of command phases at exit"
+        )
+        parser.add_argument(
+            "--trace-format",
+            choices=("table", "json"),
+            default="table",
+            help="The format of trace, default: %(default)s"
+        )
+        parser.add_argument(
+            "--max-stale",
+            metavar="SECONDS",
+            type=int,
+            help="Use the local issue cache, the cached issue is not revalidated if it is younger than %(metavar)s"
+        )
+        parser.add_argument(
+            "--cache-file",
+            metavar="PATH",
+            default=cache.get_cache_path(),
+            help="The local issue cache, default: %(default)s"
+        )
+        parser.add_argument(
+            "--cache-size",
+            metavar="BYTES",
+            type=int,
+            default=64 * 1024 * 1024,
+            help="Max size of the local issue cache, default: %(default)s"
+        )
+        parser.add_argument(
+            "--metadata-ttl",
+            metavar="SECONDS",
+            type=int,
+            default=cache.METADATA_TTL,
+            help="Refresh the cached server metadata (fields, types, etc.) if it is older, default: %(default)s"
+        )
+        # the options, that are specified in command line, override the config
+        defaults, self.config_problems = config.load_defaults(config.get_config_path(), parser)
+        parser.set_defaults(**defaults)
         return parser
 
     @property
     def jira(self):
         if self._jira is None:
-            self._jira = jira.JIRA(server=self.options.server, basic_auth=(self.options.user, self.options.password))
+            # the client pulls many dependencies, so it is imported only if needed
+            from jiractl import client
+            from jiractl import ratelimit
+
+            create = functools.partial(
+                client.JiraClient,
+                self.metadata_cache, server=self.options.server, basic_auth=(self.options.user, self.options.password),
+                limiter=ratelimit.RateLimiter(self.options.concurrency, self.options.max_rate),
+                retries=self.options.throttle_retries, pool_size=self.options.pool_size,
+                keep_alive=self.options.keep_alive, compression=self.options.compression,
+                timeout=(self.options.connect_timeout, self.options.read_timeout),
+                json_decoder=self.options.json_decoder
+            )
+            if self._tracer is not None:
+                # the authentication and handshake with server
+                create = self._tracer.wrap(create, "connect")
+            self._jira = create()
         return self._jira
 
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = backend.BACKENDS[self.options.backend](
+                self.jira, self.options.concurrency, self.options.raw_json
+            )
+        return self._backend
 
-def run_app(cmd_mgr, argv=None):
-    """Runs application."""
-    return JiraApp(
+    @property
+    def issue_cache(self):
+        if self._issue_cache is None:
+            # the first call may come from the workers of bulk command
+            with self._lock:
+                if self._issue_cache is None:
+                    self._issue_cache = cache.IssueCache(self.options.cache_file, self.options.cache_size)
+        return self._issue_cache
+
+    @property
+    def transition_cache(self):
+        if self._transition_cache is None:
+            with self._lock:
+                if self._transition_cache is None:
+                    self._transition_cache = cache.TransitionCache(self.options.cache_file)
+        return self._transition_cache
+
+    @property
+    def metadata_cache(self):
+        if self._metadata_cache is None:
+            with self._lock:
+                if self._metadata_cache is None:
+                    self._metadata_cache = cache.MetadataCache(self.options.cache_file, self.options.metadata_ttl)
+        return self._metadata_cache
+
+    def initialize_app(self, argv):
+        # the logging is not configured yet, when the config is loaded
+        for problem in self.config_problems:
+            self.LOG.warning(problem)
+
+    def prepare_to_run_command(self, cmd):
+        if self.options.trace_http:
+            from jiractl import trace
+
+            self._tracer = trace.Tracer().start()
+            self._tracer.instrument_command(cmd)
+
+    def clean_up(self, cmd, result, err):
+        if self._tracer is not None:
+            self._tracer.finish()
+            self._tracer.report(self.stderr, self.options.trace_format)
+            self._tracer = None
+
+    def find_command(self, argv):
+        """Gets the name of command and its arguments or (None, argv) if the command is not found.
+
+        The errors in global options are not reported, they are reported when the command is run.
+        """
+        stderr = sys.stderr
+        # argparse writes the errors and version to stderr
+        sys.stderr = io.BytesIO()
+        try:
+            _, remainder = self.parser.parse_known_args(argv)
+            _, name, args = self.command_manager.find_command(remainder)
+        except (SystemExit, ValueError):
+            return None, argv
+        finally:
+            sys.stderr = stderr
+        return name, args
+
+    def get_metadata(self, kind):
+        """Gets the list of metadata objects of kind, e.g. fields or issuetypes."""
+        return self.metadata_cache.get(self.jira, kind)
+
+    def get_issue(self, issue, fields=None, max_stale=None):
+        """Gets issue by ID or key, uses the local cache if it is enabled."""
+        if self.options.max_stale is None:
+            return self.jira.issue(issue, fields=fields)
+        if max_stale is None:
+            max_stale = self.options.max_stale
+        return self.issue_cache.get_issue(self.jira, issue, fields=fields, max_stale=max_stale)
+
+    def invalidate_issue(self, *issues):
+        """Removes modified issues from the local cache."""
+        if self._issue_cache is None and not os.path.exists(self.options.cache_file):
+            return
+        for issue in issues:
+            self.issue_cache.invalidate(self.jira, issue)
+
+
+class JiraCommandManager(CommandManager):
+    """Loads commands from the index, which is generated at install time.
+
+    Falls back to scanning of entry points if the index is not available.
+    """
+
+    def load_commands(self, namespace):
+        commands_index = index.load_index() if namespace == __package__ else None
+        if commands_index is None:
+            return super(JiraCommandManager, self).load_commands(namespace)
+        for name, target in commands_index.COMMANDS.items():
+            cmd_name = name.replace('_', ' ') if self.convert_underscores else name
+            self.commands[cmd_name] = index.IndexEntryPoint(name, target)
+
+
+def create_app(cmd_mgr, app_class=JiraApp, **kwargs):
+    """Creates application."""
+    return app_class(
         description="The command line interface for Jira REST API",
         version=jiractl.__version__,
         command_manager=cmd_mgr,
-        deferred_help=True
-    ).run(argv)
+        deferred_help=True,
+        **kwargs
+    )
+
+
+def run_app(cmd_mgr, argv=None):
+    """Runs application."""
+    return create_app(cmd_mgr).run(argv)
 
 
 def main(argv=None):
     """Entry point."""
-    return run_app(CommandManager(__package__, convert_underscores=True), argv)
+    if argv is None:
+        argv = sys.argv[1:]
+
+    cmd_app = create_app(JiraCommandManager(__package__, convert_underscores=True))
+    # the daemon keeps warm Jira session, execute command in the current process only if it is not running
+    if not daemon.is_local(*cmd_app.find_command(argv)):
+        result = daemon.forward(argv)
+        if result is not None:
+            return result
+    return cmd_app.run(argv)
 
 
 def debug(name, cmd_class, argv=None):
     """Helper for debugging single command without package installation."""
-    import sys
-
     if argv is None:
         argv = sys.argv[1:]
 
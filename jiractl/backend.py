@@ -0,0 +1,154 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import threading
+
+from jiractl.commands import base
+from jiractl import records
+
+
+class Backend(object):
+    """Executes requests to Jira one by one.
+
+    The backend implements the requests, which are fanned out by commands,
+    e.g. fetching of many pages or many issues. If raw, the issues, comments
+    and links are returned as records of parsed JSON instead of jira resources.
+    """
+
+    def __init__(self, jira, concurrency=1, raw=False):
+        self.jira = jira
+        self.concurrency = concurrency
+        self.raw = raw
+
+    def call(self, func, *args, **kwargs):
+        """Executes one request."""
+        return func(*args, **kwargs)
+
+    def map(self, func, iterable, workers=None):
+        """Applies func to each element of iterable, yields results in order."""
+        return (func(x) for x in iterable)
+
+    def fetch_pages(self, fetch, page_size, lazy=False):
+        """Iterates over items of all pages.
+
+        The fetch(start_at, max_results) returns list of items and total number of items or None.
+        If lazy, the next page is fetched only when items of previous one have been consumed.
+        """
+        items, total = self.call(fetch, 0, page_size)
+        for item in items:
+            yield item
+
+        step = len(items)
+        if total is None or lazy:
+            # the pages are fetched one by one, server may limit size of page, so rely on total if it is known
+            start_at = step
+            while items and (start_at < total if total is not None else len(items) >= page_size):
+                items, total = self.call(fetch, start_at, page_size)
+                for item in items:
+                    yield item
+                start_at += len(items)
+            return
+
+        if not step:
+            return
+        # server may limit size of page, so rely on the size of first page
+        pages = self.map(lambda x: fetch(x, page_size)[0], range(step, total, step))
+        for items in pages:
+            for item in items:
+                yield item
+
+    def search_issues(self, query, page_size, fields=None, lazy=False):
+        """Iterates over all issues which match query, see fetch_pages for lazy."""
+
+        def fetch(start_at, max_results):
+            if self.raw:
+                # the page is referenced only by records, so it is freed as soon as they are consumed
+                data = self.jira.search_issues(
+                    query, startAt=start_at, maxResults=max_results, fields=fields, json_result=True
+                )
+                return [records.Record(x) for x in data["issues"]], data.get("total")
+            page = self.jira.search_issues(query, startAt=start_at, maxResults=max_results, fields=fields)
+            return page, getattr(page, "total", None)
+
+        return self.fetch_pages(fetch, page_size, lazy)
+
+    def comments(self, issue, page_size, order=None, lazy=False):
+        """Iterates over all comments of issue, the order is created or -created for newest first."""
+        from jira import resources
+
+        path = "issue/{0}/comment".format(issue)
+
+        def fetch(start_at, max_results):
+            params = {"startAt": start_at, "maxResults": max_results}
+            if order:
+                params["orderBy"] = order
+            data = self.jira._get_json(path, params=params)
+            if self.raw:
+                return [records.Record(x) for x in data["comments"]], data.get("total")
+            comments = [resources.Comment(self.jira._options, self.jira._session, raw=x) for x in data["comments"]]
+            return comments, data.get("total")
+
+        return self.fetch_pages(fetch, page_size, lazy)
+
+    def remote_links(self, issue):
+        """Gets remote links of issue."""
+        if self.raw:
+            return [records.Record(x) for x in self.jira._get_json("issue/{0}/remotelink".format(issue))]
+        return self.jira.remote_links(issue)
+
+
+class ThreadedBackend(Backend):
+    """Executes requests to Jira concurrently in threads.
+
+    The requests share the connection pool of Jira session, the number
+    of requests in flight is limited by concurrency for all callers.
+    """
+
+    def __init__(self, jira, concurrency=8, raw=False):
+        super(ThreadedBackend, self).__init__(jira, concurrency, raw)
+        self.semaphore = threading.BoundedSemaphore(concurrency)
+        self.local = threading.local()
+        self.resize_pool()
+
+    def resize_pool(self):
+        """Makes the connection pool big enough to keep connections of all concurrent requests."""
+        session = self.jira._session
+        for prefix in ("https://", "http://"):
+            adapter = session.get_adapter(prefix)
+            if getattr(adapter, "_pool_maxsize", 0) < self.concurrency:
+                # the adapter may be customized, e.g. rate limited, so only its pool is replaced
+                adapter.init_poolmanager(adapter._pool_connections, self.concurrency, adapter._pool_block)
+
+    def call(self, func, *args, **kwargs):
+        # the nested calls use the slot of caller
+        if getattr(self.local, "active", False):
+            return func(*args, **kwargs)
+        with self.semaphore:
+            self.local.active = True
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.local.active = False
+
+    def map(self, func, iterable, workers=None):
+        workers = min(workers or self.concurrency, self.concurrency)
+        return base.imap(lambda x: self.call(func, x), iterable, workers)
+
+
+# the available backends
+BACKENDS = {
+    "sync": Backend,
+    "threads": ThreadedBackend,
+}
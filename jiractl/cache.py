@@ -0,0 +1,310 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS server_issues (
+    server TEXT,
+    name TEXT,
+    id TEXT,
+    key TEXT,
+    fields TEXT,
+    updated TEXT,
+    fetched REAL,
+    accessed REAL,
+    size INTEGER,
+    raw TEXT,
+    PRIMARY KEY (server, name)
+);
+CREATE INDEX IF NOT EXISTS server_issues_id ON server_issues (server, id);
+CREATE INDEX IF NOT EXISTS server_issues_key ON server_issues (server, key);
+CREATE INDEX IF NOT EXISTS server_issues_accessed ON server_issues (accessed);
+"""
+
+TRANSITIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS server_transitions (
+    server TEXT,
+    project TEXT,
+    issuetype TEXT,
+    status TEXT,
+    transitions TEXT,
+    fetched REAL,
+    PRIMARY KEY (server, project, issuetype, status)
+);
+"""
+
+METADATA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    server TEXT,
+    kind TEXT,
+    data TEXT,
+    fetched REAL,
+    PRIMARY KEY (server, kind)
+);
+"""
+
+# the kinds of metadata and REST resources, that return them
+METADATA = {
+    "fields": "field",
+    "issuetypes": "issuetype",
+    "linktypes": "issueLinkType",
+    "priorities": "priority",
+    "statuses": "status",
+}
+
+# the default time to live of cached metadata, in seconds
+METADATA_TTL = 24 * 60 * 60
+
+# means that all fields of issue has been fetched
+ALL_FIELDS = "*all"
+
+# the paths and schemas of databases, which have been created by this process
+SCHEMAS = set()
+SCHEMAS_LOCK = threading.Lock()
+
+
+def get_cache_path():
+    """Gets default path to the issue cache."""
+    return os.path.join(os.path.expanduser("~"), ".jiractl", "cache.db")
+
+
+def connect(path, schema):
+    """Opens the cache database, creates it if it does not exist.
+
+    The schema is created once per path in process, because the concurrent
+    changes of schema fail the statements of other connections.
+    """
+    directory = os.path.dirname(path)
+    with SCHEMAS_LOCK:
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        key = (os.path.abspath(path), schema)
+        exists = os.path.exists(path)
+        # the cache may be shared between threads of one command
+        connection = sqlite3.connect(path, check_same_thread=False)
+        if key not in SCHEMAS or not exists:
+            connection.executescript(schema)
+            SCHEMAS.add(key)
+    return connection
+
+
+class IssueCache(object):
+    """Persistent cache of raw issues.
+
+    The issues are looked up by the server and the ID or key, that was used
+    to fetch them, and are evicted in least recently used order when total size of cached
+    data exceeds max_size bytes.
+    """
+
+    def __init__(self, path, max_size=64 * 1024 * 1024):
+        self.max_size = max_size
+        self.lock = threading.RLock()
+        self.connection = connect(path, SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def get_issue(self, jira, name, fields=None, max_stale=0):
+        """Gets issue from cache or from server.
+
+        The cached issue is returned as is if it has been fetched less than max_stale seconds ago,
+        otherwise only the updated timestamp is requested to check that the cached issue is still actual.
+        """
+        requested = set(fields.split(",")) if fields else {ALL_FIELDS}
+        server = jira._options["server"]
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT fields, updated, fetched, raw FROM server_issues WHERE server = ? AND name = ?", (server, name)
+            ).fetchone()
+        if row is not None:
+            cached = set(row[0].split(","))
+            if ALL_FIELDS in cached or requested.issubset(cached):
+                fresh = time.time() - row[2] <= max_stale
+                if fresh or self._get_updated(jira, name) == row[1]:
+                    self._touch(server, name, revalidated=not fresh)
+                    from jira import resources
+
+                    return resources.Issue(jira._options, jira._session, raw=json.loads(row[3]))
+            # fetch the fields that are already cached to keep them in actual state
+            requested.update(cached)
+
+        fields = ALL_FIELDS if ALL_FIELDS in requested else ",".join(sorted(requested | {"updated"}))
+        issue = jira.issue(name, fields=fields)
+        self.put(jira, name, issue.raw, fields)
+        return issue
+
+    def put(self, jira, name, raw, fields):
+        """Stores issue in cache."""
+        data = json.dumps(raw)
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO server_issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (jira._options["server"], name, raw.get("id"), raw.get("key"), fields,
+                 raw.get("fields", {}).get("updated"), now, now, len(data), data)
+            )
+            self._evict()
+
+    def invalidate(self, jira, name):
+        """Removes issue from cache, name can be issue ID or key."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM server_issues WHERE server = ? AND (name = ? OR id = ? OR key = ?)",
+                (jira._options["server"], name, name, name)
+            )
+
+    @staticmethod
+    def _get_updated(jira, name):
+        return jira.issue(name, fields="updated").fields.updated
+
+    def _touch(self, server, name, revalidated):
+        now = time.time()
+        with self.lock, self.connection:
+            if revalidated:
+                self.connection.execute(
+                    "UPDATE server_issues SET accessed = ?, fetched = ? WHERE server = ? AND name = ?",
+                    (now, now, server, name)
+                )
+            else:
+                self.connection.execute(
+                    "UPDATE server_issues SET accessed = ? WHERE server = ? AND name = ?", (now, server, name)
+                )
+
+    def _evict(self):
+        total = 0
+        rows = self.connection.execute("SELECT server, name, size FROM server_issues ORDER BY accessed DESC")
+        evicted = []
+        for server, name, size in rows:
+            total += size
+            if total > self.max_size:
+                evicted.append((server, name))
+        self.connection.executemany("DELETE FROM server_issues WHERE server = ? AND name = ?", evicted)
+
+
+class TransitionCache(object):
+    """Persistent cache of workflow transitions.
+
+    The available transitions depend on the workflow and the current status of issue,
+    so they are looked up by server and (project, issue type, status) of issue. The transitions
+    are fetched again if the requested one is not found in cache.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.RLock()
+        self.connection = connect(path, TRANSITIONS_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def get_transition_id(self, jira, issue, key, name):
+        """Gets ID of transition by its name or name of the target status.
+
+        The issue is used to fetch transitions if they are not cached,
+        key is (project, issue type, status) of this issue.
+        """
+        transitions = self.get(jira, key)
+        transition_id = find_transition(transitions or (), name)
+        if transition_id is None:
+            transitions = [
+                {"id": x["id"], "name": x["name"], "to": x.get("to", {}).get("name")} for x in jira.transitions(issue)
+            ]
+            self.put(jira, key, transitions)
+            transition_id = find_transition(transitions, name)
+        if transition_id is None:
+            raise ValueError(u"Transition '{0}' is not available for {1}".format(name, issue))
+        return transition_id
+
+    def get(self, jira, key):
+        """Gets cached transitions, returns None if they are not cached."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT transitions FROM server_transitions "
+                "WHERE server = ? AND project = ? AND issuetype = ? AND status = ?",
+                (jira._options["server"],) + tuple(key)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, jira, key, transitions):
+        """Stores transitions in cache."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO server_transitions VALUES (?, ?, ?, ?, ?, ?)",
+                (jira._options["server"],) + tuple(key) + (json.dumps(transitions), time.time())
+            )
+
+    def invalidate(self, jira, key):
+        """Removes transitions from cache, e.g. after the workflow has been changed."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM server_transitions WHERE server = ? AND project = ? AND issuetype = ? AND status = ?",
+                (jira._options["server"],) + tuple(key)
+            )
+
+
+def find_transition(transitions, name):
+    """Finds transition by its name or name of the target status, returns its ID."""
+    name = name.lower()
+    for field in ("name", "to"):
+        for transition in transitions:
+            if (transition[field] or "").lower() == name:
+                return transition["id"]
+    return None
+
+
+class MetadataCache(object):
+    """Persistent cache of the server metadata.
+
+    The metadata (fields, issue types, link types, priorities and statuses)
+    is changed rarely, so it is fetched again only if it is older than ttl
+    seconds or on explicit refresh.
+    """
+
+    def __init__(self, path, ttl=METADATA_TTL):
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.connection = connect(path, METADATA_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def get(self, jira, kind):
+        """Gets the list of metadata objects of kind."""
+        server = jira._options["server"]
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT data, fetched FROM metadata WHERE server = ? AND kind = ?", (server, kind)
+            ).fetchone()
+            if row is not None and time.time() - row[1] <= self.ttl:
+                return json.loads(row[0])
+            return self.refresh(jira, kind)
+
+    def refresh(self, jira, kind):
+        """Fetches metadata of kind from server and stores it in cache."""
+        data = jira._get_json(METADATA[kind])
+        if isinstance(data, dict):
+            # the link types are wrapped in object
+            data = data["issueLinkTypes"]
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)",
+                (jira._options["server"], kind, json.dumps(data), time.time())
+            )
+        return data
@@ -0,0 +1,79 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import jira
+from jira import resources
+
+from jiractl import jsonlib
+from jiractl import ratelimit
+
+
+class JiraClient(jira.JIRA):
+    """Jira client, which takes the server metadata from the local cache.
+
+    The metadata is requested by the base client on every start (fields)
+    and before some requests (link types), the cache saves these requests.
+    If limiter is specified, all requests of session are executed within its limits.
+    The connections are kept alive in pool of pool_size, which is equal to
+    concurrency of limiter by default, the responses are compressed
+    and are decoded by json_decoder, see jsonlib.
+    """
+
+    def __init__(self, metadata, *args, **kwargs):
+        self.metadata = metadata
+        limiter = kwargs.pop("limiter", None)
+        retries = kwargs.pop("retries", 3)
+        pool_size = kwargs.pop("pool_size", None)
+        keep_alive = kwargs.pop("keep_alive", True)
+        compression = kwargs.pop("compression", True)
+        self.decoder = jsonlib.get_decoder(kwargs.pop("json_decoder", "auto"))
+        super(JiraClient, self).__init__(*args, **kwargs)
+        self._session.headers.update({
+            "Accept-Encoding": "gzip, deflate" if compression else "identity",
+            "Connection": "keep-alive" if keep_alive else "close",
+        })
+        if limiter is not None:
+            # the session retries 502, 503 and 504 of any request with its own delays, even POST,
+            # which may have been processed, so the requests are retried only by the adapter
+            self._session.max_retries = 0
+            pool_size = pool_size or limiter.max_concurrency
+            for prefix in ("https://", "http://"):
+                self._session.mount(prefix, ratelimit.RateLimitedAdapter(limiter, retries, pool_maxsize=pool_size))
+
+    def _get_json(self, path, params=None, base=jira.JIRA.JIRA_BASE_URL):
+        response = self._session.get(self._get_url(path, base), params=params)
+        return self.decode_json(response.content)
+
+    def decode_json(self, content):
+        """Decodes response, the response is not decoded to text, because JSON is always UTF-8."""
+        # the empty body means no content, see jira.utils.json_loads
+        return self.decoder(content) if content else {}
+
+    def fields(self):
+        return self.metadata.get(self, "fields")
+
+    def issue_types(self):
+        return [resources.IssueType(self._options, self._session, raw=x) for x in self.metadata.get(self, "issuetypes")]
+
+    def issue_link_types(self):
+        return [
+            resources.IssueLinkType(self._options, self._session, raw=x) for x in self.metadata.get(self, "linktypes")
+        ]
+
+    def priorities(self):
+        return [resources.Priority(self._options, self._session, raw=x) for x in self.metadata.get(self, "priorities")]
+
+    def statuses(self):
+        return [resources.Status(self._options, self._session, raw=x) for x in self.metadata.get(self, "statuses")]
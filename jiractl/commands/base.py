@@ -13,16 +13,151 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import collections
+import json
+import logging
+import Queue
+import random
+import threading
+import time
+
 from cliff import command
 from cliff import lister
 from cliff import show
 
 
+LOG = logging.getLogger(__name__)
+
+
 def utf8(text):
     """Converts text to utf8 encoded string"""
     return unicode(text, "utf8")
 
 
+def search_issues(jira, query, page_size, fields=None):
+    """Iterates over all issues which match query.
+
+    The issues are requested page by page, the next page is requested
+    only after all issues from previous one have been consumed.
+    """
+    start_at = 0
+    while True:
+        page = jira.search_issues(query, startAt=start_at, maxResults=page_size, fields=fields)
+        for issue in page:
+            yield issue
+
+        start_at += len(page)
+        # server may limit size of page, so rely on total if it is available
+        total = getattr(page, "total", None)
+        if not page or (start_at >= total if total is not None else len(page) < page_size):
+            break
+
+
+def find_metadata(items, value, *keys):
+    """Finds metadata object by ID or by one of keys, e.g. name.
+
+    The keys are checked in the specified order, the values are compared case-insensitively.
+    Returns the key, that matches, and object or (None, None) if nothing is found.
+    """
+    for item in items:
+        if item.get("id") == value:
+            return "id", item
+    value = value.lower()
+    for key in keys or ("name",):
+        for item in items:
+            if (item.get(key) or "").lower() == value:
+                return key, item
+    return None, None
+
+
+def put(jira, path, data):
+    """Updates resource without reading it back."""
+    return jira._session.put(jira._get_url(path), data=json.dumps(data))
+
+
+def post(jira, path, data):
+    """Creates resource, returns the decoded response."""
+    return jira._session.post(jira._get_url(path), data=json.dumps(data)).json()
+
+
+def imap(func, iterable, workers):
+    """Applies function to each element of iterable concurrently.
+
+    Yields results in the same order as elements of iterable,
+    only limited number of elements is being processed at once.
+    """
+    tasks = Queue.Queue()
+    threads = []
+
+    def work():
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            item, result = task
+            try:
+                result.put((func(item), None))
+            except Exception as e:
+                result.put((None, e))
+
+    def get_result(result):
+        value, error = result.get()
+        if error is not None:
+            raise error
+        return value
+
+    pending = collections.deque()
+    try:
+        for item in iterable:
+            if len(threads) < workers:
+                threads.append(threading.Thread(target=work))
+                threads[-1].daemon = True
+                threads[-1].start()
+            pending.append(Queue.Queue(maxsize=1))
+            tasks.put((item, pending[-1]))
+            if len(pending) >= workers * 2:
+                yield get_result(pending.popleft())
+        while pending:
+            yield get_result(pending.popleft())
+    finally:
+        # drop the tasks, that have not been started yet
+        try:
+            while True:
+                tasks.get_nowait()
+        except Queue.Empty:
+            pass
+        for _ in threads:
+            tasks.put(None)
+
+
+def follow(poll, interval, max_interval, stream=None):
+    """Yields items of poll(since) repeatedly, since is the start time of previous successful poll.
+
+    The first poll gets None. The delay between polls is doubled after each poll,
+    which has found nothing or failed, up to max interval, and is reset when new items are found.
+    The random jitter spreads the polls of many clients.
+    """
+    since = None
+    delay = interval
+    while True:
+        started = time.time()
+        found = 0
+        try:
+            for item in poll(since):
+                found += 1
+                yield item
+        except Exception as e:
+            if since is None:
+                raise
+            LOG.warning(u"Poll failed: %s", e)
+        else:
+            since = started
+        if stream is not None:
+            stream.flush()
+        delay = interval if found else min(delay * 2, max_interval)
+        time.sleep(delay / 2.0 + random.uniform(0, delay / 2.0))
+
+
 class JiraCommand(command.Command):
     """Executes command."""
 
@@ -33,3 +168,94 @@ class JiraShow(show.ShowOne):
 
 class JiraList(lister.Lister):
     """Executes command and displays list of elements."""
+
+
+class JiraPagedList(JiraList):
+    """Executes command and displays list of elements, which are fetched page by page."""
+
+    page_size = 100
+
+    def get_parser(self, prog_name):
+        parser = super(JiraPagedList, self).get_parser(prog_name)
+        parser.add_argument(
+            "--page-size", type=int, default=self.page_size, help="Number of elements to fetch per request"
+        )
+        return parser
+
+
+# the formatters, which write rows as they are produced, the other ones wait for all rows
+STREAMING_FORMATTERS = ("value", "csv", "jsonl", "tsv", "csv-stream", "table-stream")
+
+
+class JiraFollowMixin(object):
+    """Adds mode, that keeps polling server and displays new elements as they appear.
+
+    The rows are displayed only by streaming formatters, the default table is
+    replaced by the streaming one.
+    """
+
+    def get_parser(self, prog_name):
+        parser = super(JiraFollowMixin, self).get_parser(prog_name)
+        parser.add_argument(
+            "--follow", action="store_true", help="Keep polling and display new or changed elements, until interrupted"
+        )
+        parser.add_argument(
+            "--interval", type=float, default=30, metavar="SECONDS",
+            help="Delay between polls, while elements keep changing, default: %(default)s"
+        )
+        parser.add_argument(
+            "--max-interval", type=float, default=600, metavar="SECONDS",
+            help="Maximal delay between polls, when nothing changes, default: %(default)s"
+        )
+        return parser
+
+    def follow(self, poll, parsed_args):
+        """Polls until interrupted, the rows are flushed to output after each poll."""
+        if parsed_args.formatter == "table" and "table-stream" in self._formatter_plugins:
+            parsed_args.formatter = "table-stream"
+            # the formatter has been chosen before the command is executed
+            self.formatter = self._formatter_plugins[parsed_args.formatter].obj
+        elif parsed_args.formatter not in STREAMING_FORMATTERS:
+            raise ValueError(
+                u"The formatter '{0}' displays nothing until all rows are found, use --follow with one of: {1}".format(
+                    parsed_args.formatter, u", ".join(STREAMING_FORMATTERS)
+                )
+            )
+        if parsed_args.formatter == "table-stream":
+            # the polls may find few rows, so the widths of columns are determined by the first row
+            parsed_args.sample_rows = 1
+        return follow(poll, parsed_args.interval, parsed_args.max_interval, self.app.stdout)
+
+
+class JiraBulkCommand(JiraCommand):
+    """Executes command, which modifies many issues concurrently."""
+
+    workers = 8
+
+    def get_parser(self, prog_name):
+        parser = super(JiraBulkCommand, self).get_parser(prog_name)
+        parser.add_argument("--workers", type=int, default=self.workers, help="Number of issues updated at once")
+        parser.add_argument(
+            "--page-size", type=int, default=JiraPagedList.page_size, help="Number of issues to fetch per request"
+        )
+        return parser
+
+    def update_all(self, update, issues, workers):
+        """Applies update to issues, reports failures.
+
+        The update returns tuple (issue, error), error is None on success.
+        Returns exit code of command.
+        """
+        processed = failed = 0
+        for issue, error in self.app.backend.map(update, issues, workers):
+            processed += 1
+            if error is not None:
+                failed += 1
+                self.app.stderr.write(u"{0}: {1}\n".format(issue, error))
+            if processed % 100 == 0:
+                LOG.info("%d issues processed, %d failed", processed, failed)
+
+        if failed:
+            self.app.stdout.write("Failed {0} of {1}.\n".format(failed, processed))
+            return 1
+        self.app.stdout.write("Done.\n")
@@ -0,0 +1,217 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import codecs
+import io
+import itertools
+import json
+import logging
+import Queue
+import shlex
+import threading
+
+from cliff import display
+from cliff import lister
+
+from jiractl.commands import base
+
+
+LOG = logging.getLogger(__name__)
+
+
+def parse_line(line):
+    """Converts line to the list of command line arguments.
+
+    The line is either a JSON list of arguments, JSON object with key 'argv'
+    or command line as it would be written in shell.
+    Returns None for empty lines and comments.
+    """
+    line = line.strip()
+    if not line or line.startswith(u"#"):
+        return None
+    if line[0] in u"[{":
+        argv = json.loads(line)
+        if isinstance(argv, dict):
+            argv = argv["argv"]
+        return [x.encode("utf8") for x in argv]
+    return shlex.split(line.encode("utf8"))
+
+
+class LineApp(object):
+    """Proxy of application, that collects output of one command."""
+
+    def __init__(self, app):
+        self.app = app
+        self.output = io.BytesIO()
+        self.stdout = codecs.getwriter("utf8")(self.output)
+
+    def __getattr__(self, item):
+        return getattr(self.app, item)
+
+
+class Barrier(object):
+    """The task, which is executed after all workers have finished the previous tasks.
+
+    It is put to the queues of all workers, the last worker, that reaches it, executes
+    the task, the other ones wait until it is done.
+    """
+
+    def __init__(self, task, workers):
+        self.task = task
+        self.waiting = workers
+        self.done = False
+        self.condition = threading.Condition()
+
+    def wait(self, execute):
+        """Waits for other workers, returns the result of task if it has been executed by this worker."""
+        with self.condition:
+            self.waiting -= 1
+            if self.waiting:
+                while not self.done:
+                    self.condition.wait()
+                return None
+        try:
+            return execute(*self.task)
+        finally:
+            with self.condition:
+                self.done = True
+                self.condition.notify_all()
+
+
+class Batch(base.JiraList):
+    """Executes commands from file, one command per line.
+
+    Commands are executed concurrently, but the commands, that touch
+    the same issue, are executed in the order they appear in file.
+    The commands, that touch several issues or issues found by query,
+    are executed after all previous commands and before the next ones.
+    """
+
+    columns = ("line", "command", "status", "result")
+
+    def get_parser(self, prog_name):
+        parser = super(Batch, self).get_parser(prog_name)
+        parser.add_argument("--file", type=base.utf8, default="-", help="File with commands, '-' means stdin")
+        parser.add_argument("--workers", type=int, default=4, help="Number of commands executed at once")
+        return parser
+
+    def take_action(self, parsed_args):
+        """Executes commands."""
+        if parsed_args.file == "-":
+            stream = self.app.stdin
+        else:
+            stream = io.open(parsed_args.file, encoding="utf8")
+        # all workers use one session
+        self.app.jira
+        return self.columns, self.execute_all(stream, parsed_args.workers)
+
+    def execute_all(self, stream, workers):
+        """Executes commands and yields results as soon as they are ready."""
+        queues = [Queue.Queue(maxsize=workers) for _ in range(workers)]
+        results = Queue.Queue(maxsize=workers)
+        threads = [threading.Thread(target=self._work, args=(x, results)) for x in queues]
+        threads.append(threading.Thread(target=self._dispatch, args=(stream, queues, results)))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        running = len(queues)
+        while running:
+            result = results.get()
+            if result is None:
+                running -= 1
+            else:
+                yield result
+
+    def _dispatch(self, stream, queues, results):
+        # the commands, that modify the same issue, are executed by the same worker
+        shards = itertools.cycle(queues)
+        try:
+            for line_no, line in enumerate(stream, 1):
+                try:
+                    argv = parse_line(line)
+                    if argv is None:
+                        continue
+                    cmd, cmd_name, parsed_args = self.prepare(argv)
+                except Exception as e:
+                    results.put((line_no, line.strip(), "error", self.format_error(e)))
+                    continue
+                task = (line_no, cmd, cmd_name, parsed_args)
+                issues = self.get_issues(parsed_args)
+                if issues is None or len(issues) > 1:
+                    barrier = Barrier(task, len(queues))
+                    for queue in queues:
+                        queue.put(barrier)
+                elif issues:
+                    queues[hash(issues[0]) % len(queues)].put(task)
+                else:
+                    next(shards).put(task)
+        finally:
+            for queue in queues:
+                queue.put(None)
+
+    def _work(self, queue, results):
+        while True:
+            task = queue.get()
+            if task is None:
+                break
+            if isinstance(task, Barrier):
+                result = task.wait(self.execute)
+                if result is not None:
+                    results.put(result)
+            else:
+                results.put(self.execute(*task))
+        results.put(None)
+
+    @staticmethod
+    def get_issues(parsed_args):
+        """Gets the list of issues, that are touched by command, None if they are found by query."""
+        if getattr(parsed_args, "query", None):
+            return None
+        issue = getattr(parsed_args, "issue", None) or getattr(parsed_args, "id", None)
+        if issue is None:
+            return []
+        return issue if isinstance(issue, list) else [issue]
+
+    def prepare(self, argv):
+        """Finds command and parses its arguments."""
+        cmd_factory, cmd_name, sub_argv = self.app.command_manager.find_command(argv)
+        cmd = cmd_factory(LineApp(self.app), self.app_args, cmd_name=cmd_name)
+        try:
+            parsed_args = cmd.get_parser(" ".join((self.app.NAME, cmd_name))).parse_args(sub_argv)
+        except SystemExit:
+            raise ValueError("invalid arguments: {0}".format(" ".join(sub_argv)))
+        return cmd, cmd_name, parsed_args
+
+    def execute(self, line_no, cmd, cmd_name, parsed_args):
+        """Executes one command, returns row with result."""
+        try:
+            if isinstance(cmd, lister.Lister):
+                columns, data = cmd.take_action(parsed_args)
+                result = [dict(zip(columns, x)) for x in data]
+            elif isinstance(cmd, display.DisplayCommandBase):
+                columns, data = cmd.take_action(parsed_args)
+                result = dict(zip(columns, data))
+            else:
+                cmd.run(parsed_args)
+                result = cmd.app.output.getvalue().decode("utf8").strip()
+        except Exception as e:
+            LOG.debug("Command %s failed", cmd_name, exc_info=True)
+            return line_no, cmd_name, "error", self.format_error(e)
+        return line_no, cmd_name, "ok", json.dumps(result, default=unicode)
+
+    @staticmethod
+    def format_error(exc):
+        return u"{0}: {1}".format(type(exc).__name__, exc)
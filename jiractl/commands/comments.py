@@ -13,7 +13,22 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import functools
+import itertools
+
 from jiractl.commands import base
+from jiractl import jql
+
+
+def timestamp(value):
+    """Parses time: Jira time, JQL date, e.g. -1h or 2017-01-01 10:00, or seconds since epoch."""
+    result = jql.parse_time(value)
+    if result is not None:
+        return result
+    try:
+        return float(value)
+    except ValueError:
+        return jql.parse_date(value)
 
 
 class JiraCommentMixin(object):
@@ -35,12 +50,91 @@ class JiraCommentMixin(object):
         return text.replace("<br>", "\n")
 
 
-class ListComments(JiraCommentMixin, base.JiraList):
-    """Gets all comments for issue."""
+class ListComments(JiraCommentMixin, base.JiraFollowMixin, base.JiraPagedList):
+    """Gets comments for issue.
+
+    The comments, which have been added since time or after comment, are looked up
+    from the newest one, so only the tail of long discussion is fetched.
+    In follow mode the new and edited comments are displayed, the comments are fetched
+    again only if the issue has been updated, which happens when comment is added or edited.
+    """
+
+    def get_parser(self, prog_name):
+        parser = super(ListComments, self).get_parser(prog_name)
+        parser.add_argument(
+            "--since", type=timestamp, metavar="TIMESTAMP", help="Show comments, that have been created after time"
+        )
+        parser.add_argument("--after-id", type=int, metavar="ID", help="Show comments, that follow the comment")
+        parser.add_argument("--limit", type=int, metavar="N", help="Show at most N comments")
+        parser.add_argument("--newest", action="store_true", help="Show the newest comments first")
+        return parser
 
     def take_action(self, parsed_args):
         """Get issue by id."""
-        return self.columns, [self.format_comment(x) for x in self.app.jira.comments(parsed_args.issue)]
+        if parsed_args.follow:
+            state = {"updated": None, "comments": {}}
+            return self.columns, self.follow(functools.partial(self.poll, parsed_args, state), parsed_args)
+        return self.columns, (self.format_comment(x) for x in self.get_comments(parsed_args))
+
+    def get_comments(self, parsed_args):
+        """Gets comments, which are selected by arguments."""
+        bounded = parsed_args.since is not None or parsed_args.after_id is not None
+        descending = parsed_args.newest or bounded
+        page_size = parsed_args.page_size
+        if parsed_args.limit:
+            page_size = min(page_size, parsed_args.limit)
+
+        comments = self.app.backend.comments(
+            parsed_args.issue, page_size, "-created" if descending else "created",
+            lazy=bool(descending or parsed_args.limit)
+        )
+        if bounded:
+            comments = itertools.takewhile(lambda x: self.is_new(x, parsed_args), comments)
+            if not parsed_args.newest:
+                comments = reversed(list(comments))
+        if parsed_args.limit:
+            comments = itertools.islice(comments, parsed_args.limit)
+        return comments
+
+    def poll(self, parsed_args, state, since):
+        """Yields rows of comments, which have been added or edited since the previous poll.
+
+        The state keeps the update time of issue and of each displayed comment.
+        """
+        updated = self.app.jira.issue(parsed_args.issue, fields="updated").fields.updated
+        seen = state["comments"]
+        if since is None:
+            comments = self.get_comments(parsed_args)
+        elif updated == state["updated"]:
+            return
+        else:
+            # the comment may be edited anywhere in discussion
+            last = max([int(x) for x in seen] or [0])
+            comments = (
+                x for x in self.app.backend.comments(parsed_args.issue, parsed_args.page_size, "created")
+                if (x.id in seen or int(x.id) > last) and self.is_new(x, parsed_args)
+            )
+        found = set()
+        for comment in comments:
+            found.add(comment.id)
+            if seen.get(comment.id) != comment.updated:
+                seen[comment.id] = comment.updated
+                yield self.format_comment(comment)
+        if since is not None:
+            # the deleted comments are forgotten
+            for comment_id in set(seen) - found:
+                del seen[comment_id]
+        state["updated"] = updated
+
+    @staticmethod
+    def is_new(comment, parsed_args):
+        """Checks that comment has been created after time or after comment."""
+        if parsed_args.after_id is not None and int(comment.id) <= parsed_args.after_id:
+            return False
+        if parsed_args.since is not None:
+            created = jql.parse_time(getattr(comment, "created", None))
+            return created is None or created > parsed_args.since
+        return True
 
 
 class AddComment(JiraCommentMixin, base.JiraShow):
@@ -63,6 +157,7 @@ class AddComment(JiraCommentMixin, base.JiraShow):
         comment = self.app.jira.add_comment(
             parsed_args.issue, self.format_text(parsed_args.text), visibility=visibility
         )
+        self.app.invalidate_issue(parsed_args.issue)
         return self.columns, self.format_comment(comment)
 
 
@@ -74,6 +169,7 @@ class EditComment(JiraCommentMixin, base.JiraCommand):
         parser.add_argument("--id", type=base.utf8, help="Comment ID", required=True)
         parser.add_argument("--text", type=base.utf8, help="Comment", required=True)
         parser.add_argument("--visibility", type=base.utf8, help="Visibility in format type:value")
+        parser.add_argument("--verify", action="store_true", help="Read the comment before and after update")
         return parser
 
     def take_action(self, parsed_args):
@@ -82,8 +178,15 @@ class EditComment(JiraCommentMixin, base.JiraCommand):
         if parsed_args.visibility:
             visibility = dict(zip(("type", "value"), parsed_args.visibility.split(":", 2)))
 
-        comment = self.app.jira.comment(parsed_args.issue, parsed_args.id)
-        comment.update(body=self.format_text(parsed_args.text), visibility=visibility)
+        if parsed_args.verify:
+            comment = self.app.jira.comment(parsed_args.issue, parsed_args.id)
+            comment.update(body=self.format_text(parsed_args.text), visibility=visibility)
+        else:
+            data = {"body": self.format_text(parsed_args.text)}
+            if visibility:
+                data["visibility"] = visibility
+            base.put(self.app.jira, "issue/{0}/comment/{1}".format(parsed_args.issue, parsed_args.id), data)
+        self.app.invalidate_issue(parsed_args.issue)
         self.app.stdout.write("Done.\n")
 
 
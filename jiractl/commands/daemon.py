@@ -0,0 +1,63 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import functools
+
+from jiractl import app
+from jiractl.commands import base
+from jiractl import daemon
+
+
+class DaemonApp(app.JiraApp):
+    """Application, that shares Jira sessions between commands."""
+
+    def __init__(self, *args, **kwargs):
+        self.sessions = kwargs.pop("sessions")
+        super(DaemonApp, self).__init__(*args, **kwargs)
+
+    @property
+    def jira(self):
+        key = (self.options.server, self.options.user, self.options.password)
+        session = self.sessions.get(key)
+        if session is None:
+            session = self.sessions[key] = super(DaemonApp, self).jira
+        return session
+
+
+class RunDaemon(base.JiraCommand):
+    """Runs daemon, that executes commands in the warm Jira session."""
+
+    def get_parser(self, prog_name):
+        parser = super(RunDaemon, self).get_parser(prog_name)
+        parser.add_argument(
+            "--socket", type=base.utf8, default=daemon.get_socket_path(), help="Path to UNIX socket to listen on"
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        """Serves commands until interrupted."""
+        app_factory = functools.partial(
+            app.create_app, self.app.command_manager, app_class=DaemonApp, sessions={}
+        )
+        server = daemon.Server(parsed_args.socket, app_factory)
+        self.app.stdout.write("Listening on {0}.\n".format(parsed_args.socket))
+        self.app.stdout.flush()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        self.app.stdout.write("Done.\n")
@@ -0,0 +1,256 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import collections
+import gzip
+import io
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+from jiractl.commands import base
+from jiractl.commands import issues
+from jiractl import formatters
+from jiractl import jql
+from jiractl import jsonlib
+from jiractl import records
+
+
+LOG = logging.getLogger(__name__)
+
+# the suffix of file, that keeps the progress of export next to the output file
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+# the order of issues, the key makes it total for issues created at the same time
+ORDER = u" ORDER BY created ASC, key ASC"
+
+# the JQL dates are in time zone of user, so the resumed export searches from a day earlier
+RESUME_MARGIN = 24 * 60 * 60
+
+
+def compress(data):
+    """Compresses data to gzip member, the members may be concatenated to one gzip file."""
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as stream:
+        stream.write(data)
+    return buf.getvalue()
+
+
+def encode_row(row, columns, output_format):
+    """Converts row to line of output file."""
+    if output_format == "csv":
+        return u",".join(formatters.CSVFormatter.quote(x) for x in row) + u"\r\n"
+    return json.dumps(collections.OrderedDict(zip(columns, row)), default=unicode) + u"\n"
+
+
+def get_position(issue):
+    """Gets position of issue in the order of export: creation time in milliseconds, project key and number.
+
+    The server orders by creation time with milliseconds, so the issues, which are created
+    in the same second, are not ordered by key.
+    """
+    project, _, number = issue["key"].rpartition("-")
+    return [jql.parse_time(issue["fields"].get("created"), milliseconds=True), project, int(number)]
+
+
+def encode_page(start_at, content, columns, custom_fields, output_format, decoder, after=None):
+    """Converts the search response to compressed rows, skips issues up to position after.
+
+    The function is executed by worker processes, so it gets the response as is and returns
+    the picklable result: start_at, number of issues, number of rows, gzip member and
+    position of the last issue.
+    """
+    page = jsonlib.get_decoder(decoder)(content)["issues"]
+    positions = [get_position(x) for x in page]
+    lines = [
+        encode_row(issues.JiraIssueMixin.format_issue(records.Record(x), custom_fields), columns, output_format)
+        for x, position in zip(page, positions) if after is None or position > after
+    ]
+    last = positions[-1] if positions else None
+    return start_at, len(page), len(lines), compress(u"".join(lines).encode("utf8")), last
+
+
+def imap_bounded(pool, func, iterable, size):
+    """Applies func to each element of iterable in pool, yields results in order.
+
+    Unlike pool.imap, at most size elements are submitted at once, so the elements
+    are not read ahead of slow workers.
+    """
+    pending = collections.deque()
+    for args in iterable:
+        pending.append(pool.apply_async(func, args))
+        if len(pending) >= size:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+class ExportIssues(issues.JiraIssueMixin, base.JiraShow):
+    """Exports issues, which match query, to gzip-compressed JSONL or CSV file.
+
+    The pages of issues are fetched concurrently and are decoded and compressed
+    by pool of processes, each page is appended to file as separate gzip member.
+    The position of the last written issue is saved after each page, so the
+    interrupted export is resumed after it by the same command, even if issues
+    have been created or deleted in the meantime.
+    """
+
+    columns = ("query", "file", "exported", "total")
+
+    def get_parser(self, prog_name):
+        parser = super(ExportIssues, self).get_parser(prog_name)
+        parser.add_argument("--query", type=base.utf8, help="Query string", required=True)
+        parser.add_argument("--out", type=base.utf8, help="Path to the output file", required=True)
+        parser.add_argument(
+            "--output-format", choices=("jsonl", "csv"),
+            help="Format of rows, by default is detected by file extension, e.g. issues.csv.gz"
+        )
+        parser.add_argument("--fields", type=base.utf8, nargs='+', help="Custom fields to export")
+        parser.add_argument(
+            "--page-size", type=int, default=base.JiraPagedList.page_size, help="Number of issues to fetch per request"
+        )
+        parser.add_argument("--workers", type=int, default=8, help="Number of requests executed at once")
+        parser.add_argument(
+            "--processes", type=int, default=multiprocessing.cpu_count(),
+            help="Number of processes, which decode pages, 1 means no pool, default: %(default)s"
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore the saved progress and start from scratch")
+        return parser
+
+    def take_action(self, parsed_args):
+        """Exports issues."""
+        output_format = parsed_args.output_format or (
+            "csv" if parsed_args.out.endswith((".csv", ".csv.gz")) else "jsonl"
+        )
+        custom_columns = tuple(parsed_args.fields or ())
+        custom_fields = self.get_field_ids(custom_columns) if custom_columns else []
+        columns = issues.JiraIssueMixin.columns + custom_columns
+        state = {
+            "query": parsed_args.query, "format": output_format, "fields": custom_fields,
+            "after": None, "exported": 0, "size": 0,
+        }
+
+        checkpoint_path = parsed_args.out + CHECKPOINT_SUFFIX
+        saved = None if parsed_args.restart else self.load_checkpoint(checkpoint_path, parsed_args.out)
+        if saved is not None:
+            if any(saved.get(x) != state[x] for x in ("query", "format", "fields")):
+                raise ValueError(
+                    u"The file {0} is exported with other arguments, use --restart to export it again".format(
+                        parsed_args.out
+                    )
+                )
+            state = saved
+            LOG.info("Resuming export after %d issues", state["exported"])
+            stream = io.open(parsed_args.out, "r+b")
+            # the data after checkpoint may be incomplete
+            stream.seek(state["size"])
+            stream.truncate()
+        else:
+            stream = io.open(parsed_args.out, "wb")
+            if output_format == "csv":
+                stream.write(compress(encode_row(columns, columns, output_format).encode("utf8")))
+                state["size"] = stream.tell()
+
+        try:
+            total = self.export(stream, state, columns, parsed_args, checkpoint_path)
+        finally:
+            stream.close()
+        os.remove(checkpoint_path)
+        return self.columns, (parsed_args.query, parsed_args.out, state["exported"], total)
+
+    def export(self, stream, state, columns, parsed_args, checkpoint_path):
+        """Appends pages to stream after saved position, returns the total number of issues."""
+        query = jql.strip_order(state["query"])
+        after = state["after"]
+        if after is not None:
+            since = time.strftime("%Y/%m/%d %H:%M", time.gmtime(after[0] // 1000 - RESUME_MARGIN))
+            query = u'({0}) AND created >= "{1}"'.format(query, since)
+        # the created issues are appended to the end, so the offsets of pages are stable,
+        # unless issues are deleted while the export is in progress
+        query += ORDER
+        fields = self.get_fields(issues.JiraIssueMixin.columns, state["fields"]) + ",created"
+
+        def fetch(start_at):
+            return self.fetch_page(query, fields, start_at, parsed_args.page_size)
+
+        decoder = self.app.options.json_decoder
+        first = fetch(0)
+        data = jsonlib.get_decoder(decoder)(first)
+        total, step = data["total"], len(data["issues"])
+        del data
+        # server may limit size of page, so rely on the size of first page
+        offsets = range(step, total, step) if step else []
+        contents = itertools.chain([first], self.app.backend.map(fetch, offsets, parsed_args.workers))
+        tasks = (
+            (start_at, content, columns, state["fields"], state["format"], decoder, after)
+            for start_at, content in itertools.izip([0] + offsets, contents)
+        )
+
+        if parsed_args.processes > 1:
+            pool = multiprocessing.Pool(parsed_args.processes)
+            results = imap_bounded(pool, encode_page, tasks, parsed_args.processes * 2)
+        else:
+            pool = None
+            results = itertools.starmap(encode_page, tasks)
+
+        # the issues before the saved position, that are found again
+        skipped = 0
+        exported = state["exported"]
+        try:
+            self.save_checkpoint(checkpoint_path, state)
+            for _, count, written, member, last in results:
+                skipped += count - written
+                if written:
+                    stream.write(member)
+                    stream.flush()
+                state.update(
+                    after=last or state["after"], exported=state["exported"] + written, size=stream.tell()
+                )
+                self.save_checkpoint(checkpoint_path, state)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        return exported + total - skipped
+
+    def fetch_page(self, query, fields, start_at, max_results):
+        """Gets the search response as is, it is decoded by worker process."""
+        jira = self.app.jira
+        params = {"jql": query, "startAt": start_at, "maxResults": max_results, "fields": fields}
+        return jira._session.get(jira._get_url("search"), params=params).content
+
+    @staticmethod
+    def load_checkpoint(path, out):
+        """Loads the saved progress of export, returns None if there is nothing to resume."""
+        if not os.path.exists(path) or not os.path.exists(out):
+            return None
+        with io.open(path, "rb") as stream:
+            try:
+                state = json.load(stream)
+            except ValueError:
+                LOG.warning(u"The progress of export is damaged, starting from scratch")
+                return None
+        return state
+
+    @staticmethod
+    def save_checkpoint(path, state):
+        """Saves the progress of export, the file is replaced atomically."""
+        tmp_path = path + ".tmp"
+        with io.open(tmp_path, "wb") as stream:
+            stream.write(json.dumps(state))
+        os.rename(tmp_path, path)
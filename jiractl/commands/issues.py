@@ -13,22 +13,147 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import collections
+import csv
+import functools
+import io
+import itertools
+import json
+import logging
+import math
+import os
+import time
+
 from jiractl.commands import base
+from jiractl import jql
+from jiractl import mirror
+
+
+LOG = logging.getLogger(__name__)
+
+# the maximal number of issues, that Jira accepts in one bulk request by default
+BULK_SIZE = 50
+
+# the input columns, which are used to make fields of new issue
+BULK_COLUMNS = ("project", "type", "summary", "description", "assignee", "parent", "components", "labels")
+
+# the statuses of throttled or unavailable server, which rejects the request without processing it
+RETRY_STATUSES = (429, 503)
+
+
+def read_csv(stream):
+    """Reads rows from CSV with header, yields line number and row."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, dict((k, v.decode("utf8")) for k, v in row.items() if k and v)
+
+
+def read_jsonl(stream):
+    """Reads rows from file with one JSON object per line, yields line number and row."""
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError:
+            LOG.debug("Line %d is not valid JSON", line_no, exc_info=True)
+            yield line_no, None
+
+
+def split_list(value):
+    """Converts comma-separated string to list, lists are returned as is."""
+    if value is None or isinstance(value, list):
+        return value
+    return [x.strip() for x in value.split(u",") if x.strip()]
+
+
+def format_bulk_error(error):
+    """Converts the element error of bulk request to string."""
+    details = error.get("elementErrors") or {}
+    messages = list(details.get("errorMessages") or ())
+    messages.extend(u"{0}: {1}".format(k, v) for k, v in sorted((details.get("errors") or {}).items()))
+    return u"; ".join(messages) or u"status {0}".format(error.get("status"))
 
 
 class JiraIssueMixin(object):
     columns = ("project", "id", "key", "summary", "type", "assignee", "status")
 
+    # the issue fields, which are required to display columns, id and key are always returned
+    column_fields = {
+        "project": "project", "summary": "summary", "type": "issuetype", "assignee": "assignee", "status": "status"
+    }
+
+    @classmethod
+    def get_fields(cls, columns, custom_fields=None):
+        """Gets the comma-separated list of issue fields, which are required to display columns."""
+        fields = [cls.column_fields[x] for x in columns if x in cls.column_fields]
+        if custom_fields:
+            fields.extend(custom_fields)
+        # empty list means all fields, so ask for one of cheapest
+        return ",".join(fields) or "summary"
+
+    def get_field_ids(self, names, strict=True):
+        """Translates field names to IDs using the cached metadata.
+
+        The unknown fields raise error if strict, otherwise are returned as is.
+        """
+        fields = self.app.get_metadata("fields")
+        result = []
+        for name in names:
+            _, field = base.find_metadata(fields, name)
+            if field is None and strict:
+                raise ValueError(u"Unknown field '{0}'".format(name))
+            result.append(field["id"] if field else name)
+        return result
+
+    def get_issue_type(self, name, issue_types=None):
+        """Validates issue type using the cached metadata, returns its name."""
+        if issue_types is None:
+            issue_types = self.app.get_metadata("issuetypes")
+        _, issue_type = base.find_metadata(issue_types, name)
+        if issue_type is None:
+            raise ValueError(u"Unknown issue type '{0}', expected one of: {1}".format(
+                name, u", ".join(x["name"] for x in issue_types)
+            ))
+        return issue_type["name"]
+
+    @staticmethod
+    def make_fields(project, issue_type, summary, description=None, assignee=None, parent=None,
+                    components=None, labels=None):
+        """Makes fields of the new issue."""
+        # project and type are referenced by key and name, so they are resolved by server
+        fields = {
+            "project": {"key": project},
+            "issuetype": {"name": issue_type},
+            "summary": summary,
+        }
+        if description is not None:
+            fields["description"] = description
+        if assignee:
+            fields["assignee"] = {"name": assignee}
+        if parent:
+            fields["parent"] = {"id": parent}
+        if components:
+            fields["components"] = [{'name': c} for c in components]
+        if labels:
+            fields["labels"] = labels
+        return fields
+
     @staticmethod
     def format_issue(issue, custom_fields=None):
         """Converts issue to tuple."""
 
+        def get_name(field):
+            value = getattr(issue.fields, field, None)
+            return value and value.name
+
         result = (
-            issue.fields.project.name, issue.id, issue.key, issue.fields.summary,
-            issue.fields.issuetype.name, issue.fields.assignee.name, issue.fields.status.name,
+            get_name("project"), issue.id, issue.key, getattr(issue.fields, "summary", None),
+            get_name("issuetype"), get_name("assignee"), get_name("status"),
         )
         if custom_fields:
-            result += tuple(getattr(issue.fields, x) for x in custom_fields)
+            result += tuple(getattr(issue.fields, x, None) for x in custom_fields)
         return result
 
 
@@ -45,37 +170,194 @@ class CreateIssue(JiraIssueMixin, base.JiraShow):
         parser.add_argument("--parent", type=base.utf8, help="Issue parent")
         parser.add_argument("--components", type=base.utf8, nargs='+', help="Issue component")
         parser.add_argument("--labels", type=base.utf8, nargs='+', help="Issue label")
+        parser.add_argument("--verify", action="store_true", help="Read the created issue back from server")
 
         return parser
 
     def take_action(self, parsed_args):
         """Creates a new jira issue."""
-        fields = {
-            "project": parsed_args.project,
-            "issuetype": parsed_args.type,
-            "summary": parsed_args.summary,
-            "description": parsed_args.description
-        }
-        if parsed_args.assignee:
-            fields["assignee"] = parsed_args.assignee
-        if parsed_args.labels:
-            fields["assignee"] = {"name": parsed_args.assignee}
-        if parsed_args.parent:
-            fields["parent"] = {"id": parsed_args.parent}
-        if parsed_args.components:
-            fields["components"] = [{'name': c} for c in parsed_args.components]
-        if parsed_args.labels:
-            fields["labels"] = parsed_args.labels
+        fields = self.make_fields(
+            parsed_args.project, self.get_issue_type(parsed_args.type), parsed_args.summary, parsed_args.description,
+            assignee=parsed_args.assignee, parent=parsed_args.parent,
+            components=parsed_args.components, labels=parsed_args.labels
+        )
 
-        return self.columns, self.format_issue(self.app.jira.create_issue(fields=fields, prefetch=True))
+        if parsed_args.verify:
+            return self.columns, self.format_issue(self.app.jira.create_issue(fields=fields, prefetch=True))
 
+        # the server returns only id and key of the new issue
+        issue = self.app.jira.create_issue(fields=fields, prefetch=False)
+        return self.columns, (
+            parsed_args.project, issue.id, issue.key, parsed_args.summary, parsed_args.type, parsed_args.assignee, None
+        )
 
-class EditIssue(JiraIssueMixin, base.JiraCommand):
-    """Updates issue"""
+
+class CreateIssues(JiraIssueMixin, base.JiraList):
+    """Creates issues from CSV or JSONL file, one issue per row.
+
+    The rows have the same fields as arguments of 'issue create': project, type,
+    summary, description, assignee, parent, components and labels, the lists are
+    comma-separated. The issues are created in chunks via bulk request, the chunks
+    are sent concurrently and the rows, that have been rejected by overloaded or
+    unavailable server, are sent again.
+    """
+
+    columns = ("line", "id", "key", "summary", "error")
+
+    def get_parser(self, prog_name):
+        parser = super(CreateIssues, self).get_parser(prog_name)
+        parser.add_argument("--file", type=base.utf8, default="-", help="File with issues, '-' means stdin")
+        parser.add_argument(
+            "--input-format", choices=("csv", "jsonl"), help="Format of file, by default is detected by file extension"
+        )
+        parser.add_argument("--project", type=base.utf8, help="Jira project, if it is not specified in row")
+        parser.add_argument("--type", type=base.utf8, help="Issue Type, if it is not specified in row")
+        parser.add_argument("--chunk-size", type=int, default=BULK_SIZE, help="Number of issues per request")
+        parser.add_argument("--workers", type=int, default=4, help="Number of requests sent at once")
+        parser.add_argument("--retries", type=int, default=2, help="Number of attempts to resend failed rows")
+        return parser
+
+    def take_action(self, parsed_args):
+        """Creates issues."""
+        if parsed_args.file == "-":
+            # the rows are decoded as UTF-8 like the ones of file, so the stdin is read without codec of locale
+            stream = getattr(self.app.stdin, "stream", self.app.stdin)
+        else:
+            stream = io.open(parsed_args.file, "rb")
+        file_format = parsed_args.input_format or ("csv" if parsed_args.file.endswith(".csv") else "jsonl")
+        rows = read_csv(stream) if file_format == "csv" else read_jsonl(stream)
+        issue_types = self.app.get_metadata("issuetypes")
+        entries = (self.parse_row(line_no, row, parsed_args, issue_types) for line_no, row in rows)
+        return self.columns, self.create_all(entries, parsed_args)
+
+    def parse_row(self, line_no, row, parsed_args, issue_types):
+        """Converts input row to entry (line, fields, error)."""
+        if not isinstance(row, dict):
+            return line_no, {"summary": None}, u"invalid row"
+        row = dict(row)
+        row.setdefault("type", row.pop("issuetype", None) or parsed_args.type)
+        row.setdefault("project", parsed_args.project)
+        missing = [x for x in ("project", "type", "summary") if not row.get(x)]
+        if missing:
+            return line_no, {"summary": row.get("summary")}, u"missing {0}".format(u", ".join(missing))
+        unknown = sorted(x for x in row if x not in BULK_COLUMNS)
+        if unknown:
+            return line_no, {"summary": row["summary"]}, u"unknown columns {0}".format(u", ".join(unknown))
+
+        try:
+            issue_type = self.get_issue_type(row["type"], issue_types)
+        except ValueError as e:
+            return line_no, {"summary": row["summary"]}, unicode(e)
+
+        fields = self.make_fields(
+            row["project"], issue_type, row["summary"], row.get("description"),
+            assignee=row.get("assignee"), parent=row.get("parent"),
+            components=split_list(row.get("components")), labels=split_list(row.get("labels"))
+        )
+        return line_no, fields, None
+
+    def create_all(self, entries, parsed_args):
+        """Creates issues and yields results as soon as they are ready."""
+        for attempt in range(parsed_args.retries + 1):
+            retry = []
+            chunks = iter(lambda: list(itertools.islice(entries, parsed_args.chunk_size)), [])
+            for results in self.app.backend.map(self.create_chunk, chunks, parsed_args.workers):
+                for entry, row, retryable in results:
+                    if retryable and attempt < parsed_args.retries:
+                        retry.append(entry)
+                    else:
+                        yield row
+            if not retry:
+                break
+            LOG.info("Resending %d rows", len(retry))
+            entries = iter(retry)
+
+    def create_chunk(self, chunk):
+        """Creates issues via one bulk request.
+
+        Returns list of (entry, row, retryable) in the same order as chunk.
+        """
+        results = {}
+        valid = []
+        for entry in chunk:
+            line_no, fields, error = entry
+            if error:
+                results[line_no] = (entry, (line_no, None, None, fields["summary"], error), False)
+            else:
+                valid.append(entry)
+
+        if valid:
+            try:
+                response = base.post(
+                    self.app.jira, "issue/bulk", {"issueUpdates": [{"fields": x[1]} for x in valid]}
+                )
+            except Exception as e:
+                response = self.get_error_response(e)
+                if response is None:
+                    LOG.debug("Bulk request failed", exc_info=True)
+                    response = {"errors": [
+                        {"failedElementNumber": i, "status": getattr(e, "status_code", None), "error": e}
+                        for i in range(len(valid))
+                    ]}
+
+            errors = dict((x["failedElementNumber"], x) for x in response.get("errors", ()))
+            # the created issues are listed in order of rows, the failed rows are skipped
+            created = iter(response.get("issues", ()))
+            for i, entry in enumerate(valid):
+                line_no, fields, _ = entry
+                error = errors.get(i)
+                issue = next(created, None) if error is None else None
+                if issue is not None:
+                    row = (line_no, issue["id"], issue["key"], fields["summary"], None)
+                    results[line_no] = (entry, row, False)
+                elif error is None:
+                    row = (line_no, None, None, fields["summary"], u"the issue is not reported by server")
+                    results[line_no] = (entry, row, False)
+                else:
+                    message = unicode(error["error"]) if "error" in error else format_bulk_error(error)
+                    row = (line_no, None, None, fields["summary"], message)
+                    results[line_no] = (entry, row, self.is_retryable(error.get("status")))
+
+        return [results[x[0]] for x in chunk]
+
+    @staticmethod
+    def is_retryable(status):
+        """Checks that request may succeed, if it is sent again.
+
+        The request is not idempotent, so it is sent again only if server has rejected it without processing,
+        e.g. after timeout or internal error the issues may have been created.
+        """
+        return status in RETRY_STATUSES
+
+    @staticmethod
+    def get_error_response(exc):
+        """Gets the body of bulk response, if request was rejected because of all rows are invalid."""
+        # the errors of Jira client have status code and response
+        status_code = getattr(exc, "status_code", None)
+        if not status_code or status_code >= 500 or getattr(exc, "response", None) is None:
+            return None
+        try:
+            response = exc.response.json()
+        except ValueError:
+            return None
+        return response if isinstance(response.get("errors"), list) else None
+
+
+class EditIssue(JiraIssueMixin, base.JiraBulkCommand):
+    """Updates issues
+
+    The transitions of issues in the same project, type and status are looked up
+    once and are stored in the local cache.
+    """
+
+    # the issue fields, which determine the available transitions
+    workflow_fields = "project,issuetype,status"
 
     def get_parser(self, prog_name):
         parser = super(EditIssue, self).get_parser(prog_name)
-        parser.add_argument("--id", type=base.utf8, help="Issue ID", required=True)
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument("--id", type=base.utf8, nargs='+', help="Issue ID")
+        group.add_argument("--query", type=base.utf8, help="Query string to select issues")
         parser.add_argument("--summary", type=base.utf8, help="New issue Summary")
         parser.add_argument("--description", type=base.utf8, help="New issue description")
         parser.add_argument("--assignee", type=base.utf8, help="New issue assignee")
@@ -85,25 +367,118 @@ class EditIssue(JiraIssueMixin, base.JiraCommand):
         return parser
 
     def take_action(self, parsed_args):
-        """Update issue."""
+        """Update issues."""
         fields = {}
         if parsed_args.summary:
             fields["summary"] = parsed_args.summary
         if parsed_args.description:
             fields["description"] = parsed_args.description
         if parsed_args.fields:
-            fields.update((x.split(':', 1)) for x in parsed_args.fields)
+            names, values = zip(*(x.split(':', 1) for x in parsed_args.fields))
+            fields.update(zip(self.get_field_ids(names), values))
 
-        if fields:
-            self.app.jira.issue(parsed_args.id).update(fields=fields)
-
-        if parsed_args.assignee:
-            self.app.jira.assign_issue(parsed_args.id, parsed_args.assignee)
+        issues, transitions = self.get_transitions(parsed_args)
+        update = functools.partial(
+            self.update_issue, fields=fields, assignee=parsed_args.assignee, status=parsed_args.status,
+            transitions=transitions
+        )
+        return self.update_all(update, issues, parsed_args.workers)
+
+    def get_transitions(self, parsed_args):
+        """Gets the issues and transition to perform for each of them.
+
+        Returns list of issues and dict issue: (transition, workflow key).
+        """
+        status = parsed_args.status
+        jira = self.app.jira
+        if not status or status.isdigit():
+            # the transition ID is used as is
+            issues = parsed_args.id or [
+                x.key for x in base.search_issues(jira, parsed_args.query, parsed_args.page_size, fields="summary")
+            ]
+            return issues, dict((x, (status, None)) for x in issues if status)
+
+        if parsed_args.query:
+            found = base.search_issues(jira, parsed_args.query, parsed_args.page_size, fields=self.workflow_fields)
+        elif len(parsed_args.id) > 1:
+            found = self.find_issues(parsed_args.id, parsed_args.page_size)
+        elif self.app.options.max_stale is not None:
+            found = [self.app.get_issue(parsed_args.id[0], fields=self.workflow_fields)]
+        else:
+            # the status of issue is unknown, so the transition is looked up by server
+            return parsed_args.id, {parsed_args.id[0]: (status, None)}
+
+        issues = []
+        transitions = {}
+        groups = collections.OrderedDict()
+        for issue in found:
+            name = issue.key if parsed_args.query else self.match_issue(issue, parsed_args.id)
+            issues.append(name)
+            groups.setdefault(self.get_workflow_key(issue), []).append(name)
+        if not parsed_args.query:
+            # the issues, which are not found by search, e.g. moved to other project
+            found = set(issues)
+            missed = [x for x in parsed_args.id if x not in found]
+            issues.extend(missed)
+            transitions.update((x, (status, None)) for x in missed)
+
+        # the issues in the same status of the same workflow have the same transitions
+        for key, names in groups.items():
+            try:
+                transition = (self.app.transition_cache.get_transition_id(jira, names[0], key, status), key)
+            except Exception as e:
+                LOG.debug("Failed to get transitions of %s", names[0], exc_info=True)
+                transition = (e, key)
+            transitions.update((x, transition) for x in names)
+        return issues, transitions
+
+    def find_issues(self, names, page_size):
+        """Searches issues by ID or key, page_size issues per request."""
+        for i in range(0, len(names), page_size):
+            query = u"issuekey in ({0})".format(u",".join(u'"{0}"'.format(x) for x in names[i:i + page_size]))
+            for issue in base.search_issues(self.app.jira, query, page_size, fields=self.workflow_fields):
+                yield issue
 
-        if parsed_args.status:
-            self.app.jira.transition_issue(parsed_args.id, parsed_args.status)
+    @staticmethod
+    def match_issue(issue, names):
+        """Gets the name, that is used to specify issue."""
+        return issue.key if issue.key in names or issue.id not in names else issue.id
 
-        self.app.stdout.write("Done.\n")
+    @staticmethod
+    def get_workflow_key(issue):
+        """Gets key of cached transitions, that are available for issue."""
+        return issue.fields.project.id, issue.fields.issuetype.id, issue.fields.status.id
+
+    def update_issue(self, issue, fields, assignee, status, transitions):
+        """Updates one issue, returns error if any."""
+        try:
+            if fields:
+                base.put(self.app.jira, "issue/{0}".format(issue), {"fields": fields})
+            if assignee:
+                self.app.jira.assign_issue(issue, assignee)
+            if issue in transitions:
+                self.transition_issue(issue, status, *transitions[issue])
+        except Exception as e:
+            LOG.debug("Failed to update %s", issue, exc_info=True)
+            return issue, e
+        finally:
+            self.app.invalidate_issue(issue)
+        return issue, None
+
+    def transition_issue(self, issue, status, transition, key):
+        """Performs transition, transition is either ID or name, key is set if ID is cached."""
+        if isinstance(transition, Exception):
+            raise transition
+        try:
+            self.app.jira.transition_issue(issue, transition)
+        except Exception as e:
+            # the errors of Jira client have status code
+            if key is None or getattr(e, "status_code", None) is None:
+                raise
+            # the workflow might be changed, so look up the transition by name
+            LOG.debug("Transition %s failed for %s, looking up by name", transition, issue, exc_info=True)
+            self.app.transition_cache.invalidate(self.app.jira, key)
+            self.app.jira.transition_issue(issue, status)
 
 
 class ShowIssue(JiraIssueMixin, base.JiraShow):
@@ -117,12 +492,102 @@ class ShowIssue(JiraIssueMixin, base.JiraShow):
     def take_action(self, parsed_args):
         """Get issue by id."""
         known_fields = set(self.columns)
-        custom_fields = tuple(x for x in parsed_args.columns if x not in known_fields)
-        columns = self.columns + custom_fields
-        return columns, self.format_issue(self.app.jira.issue(parsed_args.id), custom_fields)
+        custom_columns = tuple(x for x in parsed_args.columns if x not in known_fields)
+        # the custom columns may be specified by field name
+        custom_fields = self.get_field_ids(custom_columns, strict=False) if custom_columns else None
+        columns = self.columns + custom_columns
+        fields = self.get_fields(parsed_args.columns or columns, custom_fields)
+        return columns, self.format_issue(self.app.get_issue(parsed_args.id, fields=fields), custom_fields)
+
+
+class JiraIssueSearch(JiraIssueMixin, base.JiraFollowMixin, base.JiraPagedList):
+    """Displays issues, which match query, the query may be answered by the local mirror.
 
+    In follow mode the server is polled for issues, which have been updated since previous poll.
+    """
 
-class ListIssues(JiraIssueMixin, base.JiraList):
+    def get_parser(self, prog_name):
+        parser = super(JiraIssueSearch, self).get_parser(prog_name)
+        parser.add_argument(
+            "--local", action="store_true",
+            help="Search in issues, that have been copied by 'issues sync', the queries, which cannot be "
+                 "evaluated locally or are not covered by synced queries, are sent to server"
+        )
+        parser.add_argument(
+            "--db", type=base.utf8, default=mirror.get_mirror_path(), help="Path to the local database"
+        )
+        return parser
+
+    def search(self, parsed_args, query):
+        """Gets rows of issues, which match query."""
+        if parsed_args.follow:
+            return self.follow(functools.partial(self.poll, parsed_args, query, {}), parsed_args)
+
+        if parsed_args.local:
+            rows = self.search_local(parsed_args.db, query)
+            if rows is not None:
+                return rows
+
+        fields = self.get_fields(parsed_args.columns or self.columns)
+        issues = self.app.backend.search_issues(query, parsed_args.page_size, fields=fields)
+        return (self.format_issue(issue) for issue in issues)
+
+    @classmethod
+    def search_local(cls, path, query):
+        """Gets rows of stored issues, which match query, or None if the query must be sent to server.
+
+        The local database answers only the queries, which are covered by one of synced queries.
+        """
+        if not os.path.exists(path):
+            LOG.warning(u"The local database %s does not exist, fallback to server", path)
+            return None
+        try:
+            where, params, order = jql.compile_query(query)
+        except jql.UnsupportedQuery as e:
+            LOG.info(u"Cannot search locally, fallback to server: %s", e)
+            return None
+
+        store = mirror.IssueMirror(path)
+        if not any(jql.covers(x, query) for x in store.get_queries()):
+            store.close()
+            LOG.warning(u"The query is not covered by queries, which have been synced, fallback to server")
+            return None
+        return cls.read_rows(store, where, params, order)
+
+    @staticmethod
+    def read_rows(store, where, params, order):
+        """Yields rows of stored issues, the database is closed when all rows have been consumed."""
+        try:
+            for row in store.search(where, params, order):
+                yield row
+        finally:
+            store.close()
+
+    def poll(self, parsed_args, query, seen, since):
+        """Yields rows of issues, which have not been seen or have been updated since.
+
+        Only the issues, that have been found by the latest poll, are kept in seen.
+        """
+        if since is not None:
+            # the relative time does not depend on time zone of user, see issues sync
+            query = u"({0}) AND updated >= -{1}m ORDER BY updated ASC".format(
+                jql.strip_order(query), int(math.ceil((time.time() - since) / 60.0)) + 1
+            )
+        fields = self.get_fields(parsed_args.columns or self.columns) + ",updated"
+        found = set()
+        for issue in self.app.backend.search_issues(query, parsed_args.page_size, fields=fields):
+            updated = getattr(issue.fields, "updated", None)
+            found.add(issue.id)
+            if issue.id not in seen or seen[issue.id] != updated:
+                seen[issue.id] = updated
+                yield self.format_issue(issue)
+        # the next poll finds only issues, which have been updated since this one started,
+        # the issues, that have not been found by this poll, are not found again with the same update time
+        for issue_id in set(seen) - found:
+            del seen[issue_id]
+
+
+class ListIssues(JiraIssueSearch):
     """Get list of issues which match specified criteria."""
 
     def get_parser(self, prog_name):
@@ -137,11 +602,10 @@ class ListIssues(JiraIssueMixin, base.JiraList):
         query = u'project="{0}" AND assignee="{1}" AND status IN ("{2}")'.format(
             parsed_args.project, parsed_args.assignee, u'","'.join(x for x in parsed_args.status)
         )
-        issues = self.app.jira.search_issues(query)
-        return self.columns, [self.format_issue(issue) for issue in issues]
+        return self.columns, self.search(parsed_args, query)
 
 
-class SearchIssues(JiraIssueMixin, base.JiraList):
+class SearchIssues(JiraIssueSearch):
     """Searches issues by Jira Query string."""
     def get_parser(self, prog_name):
         parser = super(SearchIssues, self).get_parser(prog_name)
@@ -150,5 +614,4 @@ class SearchIssues(JiraIssueMixin, base.JiraList):
 
     def take_action(self, parsed_args):
         """Searches issues."""
-        issues = self.app.jira.search_issues(parsed_args.query)
-        return self.columns, [self.format_issue(issue) for issue in issues]
+        return self.columns, self.search(parsed_args, parsed_args.query)
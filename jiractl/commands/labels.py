@@ -13,59 +13,88 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import urlparse
+import functools
+import logging
 
 from jiractl.commands import base
 
 
+LOG = logging.getLogger(__name__)
+
+
 class JiraLabelMixin(object):
     columns = "label",
 
-    def get_parser(self, prog_name):
-        parser = super(JiraLabelMixin, self).get_parser(prog_name)
-        parser.add_argument("--issue", type=base.utf8, help="Issue ID", required=True)
-        return parser
-
 
 class ListLabels(JiraLabelMixin, base.JiraList):
     """Gets all labels for issue."""
 
-    def take_action(self, parsed_args):
-        """Get issue by id."""
-
-        return self.columns, [(x,) for x in self.app.jira.issue(parsed_args.issue).fields.labels]
-
-
-class AddLabel(JiraLabelMixin, base.JiraCommand):
-    """Adds new link."""
-
     def get_parser(self, prog_name):
-        parser = super(AddLabel, self).get_parser(prog_name)
-        parser.add_argument("--labels", type=base.utf8, nargs='+', required=True, help="Label text")
+        parser = super(ListLabels, self).get_parser(prog_name)
+        parser.add_argument("--issue", type=base.utf8, help="Issue ID", required=True)
         return parser
 
     def take_action(self, parsed_args):
-        """Adds new link."""
-        issue = self.app.jira.issue(parsed_args.issue)
-        labels = issue.fields.labels
-        missing = set(parsed_args.labels).difference(labels)
-        if missing:
-            issue.update(fields={'labels': labels + sorted(missing)})
+        """Get issue by id."""
 
-        self.app.stdout.write("Done.\n")
+        return self.columns, [(x,) for x in self.app.get_issue(parsed_args.issue, fields="labels").fields.labels]
 
 
-class DropLabel(JiraLabelMixin, base.JiraCommand):
+class JiraLabelUpdate(JiraLabelMixin, base.JiraBulkCommand):
+    """Updates labels of issues."""
+
+    # the update operation, add or remove
+    operation = None
+
     def get_parser(self, prog_name):
-        parser = super(DropLabel, self).get_parser(prog_name)
+        parser = super(JiraLabelUpdate, self).get_parser(prog_name)
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument("--issue", type=base.utf8, nargs='+', help="Issue ID")
+        group.add_argument("--query", type=base.utf8, help="Query string to select issues")
         parser.add_argument("--labels", type=base.utf8, nargs='+', required=True, help="Label text")
         return parser
 
     def take_action(self, parsed_args):
-        """Get issue by id."""
-        issue = self.app.jira.issue(parsed_args.issue)
-        labels = set(issue.fields.labels).difference(parsed_args.labels)
-        if len(labels) != len(issue.fields.labels):
-            issue.update(fields={'labels': sorted(labels)})
-
-        self.app.stdout.write("Done.\n")
+        """Updates labels."""
+        if parsed_args.query:
+            # the updates may change the result of query, so all issues are found before update
+            issues = [
+                x.key for x in base.search_issues(
+                    self.app.jira, parsed_args.query, parsed_args.page_size, fields="labels"
+                )
+                if self.is_affected(x.fields.labels, parsed_args.labels)
+            ]
+        else:
+            issues = parsed_args.issue
+
+        update = functools.partial(self.update_labels, labels=parsed_args.labels)
+        return self.update_all(update, issues, parsed_args.workers)
+
+    def update_labels(self, issue, labels):
+        """Updates labels of one issue in single request, returns error if any."""
+        data = {"update": {"labels": [{self.operation: x} for x in labels]}}
+        try:
+            base.put(self.app.jira, "issue/{0}".format(issue), data)
+        except Exception as e:
+            LOG.debug("Failed to update %s", issue, exc_info=True)
+            return issue, e
+        self.app.invalidate_issue(issue)
+        return issue, None
+
+    def is_affected(self, current, labels):
+        """Checks that update changes the labels."""
+        if self.operation == "add":
+            return not set(labels).issubset(current)
+        return not set(labels).isdisjoint(current)
+
+
+class AddLabel(JiraLabelUpdate):
+    """Adds labels to issues."""
+
+    operation = "add"
+
+
+class DropLabel(JiraLabelUpdate):
+    """Removes labels from issues."""
+
+    operation = "remove"
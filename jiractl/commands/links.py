@@ -13,6 +13,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import functools
+import itertools
 import urlparse
 
 from jiractl.commands import base
@@ -23,11 +25,6 @@ class JiraLinkMixin(object):
 
     TYPE_REMOTE_LINK = 'link'
 
-    def get_parser(self, prog_name):
-        parser = super(JiraLinkMixin, self).get_parser(prog_name)
-        parser.add_argument("--issue", type=base.utf8, help="Issue ID", required=True)
-        return parser
-
     @staticmethod
     def format_issue_link(link):
         """Converts issue link to tuple."""
@@ -52,14 +49,48 @@ class JiraLinkMixin(object):
         return "L{0}".format(link.id), self.TYPE_REMOTE_LINK, link.object.title, link.object.url, icon
 
 
-class ListLinks(JiraLinkMixin, base.JiraList):
-    """Gets all links for issue."""
+class ListLinks(JiraLinkMixin, base.JiraPagedList):
+    """Gets all links for issues."""
+
+    columns = ("issue",) + JiraLinkMixin.columns
+
+    def get_parser(self, prog_name):
+        parser = super(ListLinks, self).get_parser(prog_name)
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument("--issue", type=base.utf8, nargs='+', help="Issue ID")
+        group.add_argument("--query", type=base.utf8, help="Query string to select issues")
+        parser.add_argument("--workers", type=int, default=8, help="Number of requests executed at once")
+        return parser
 
     def take_action(self, parsed_args):
-        """Get issue by id."""
-        issue_links = [self.format_issue_link(x) for x in self.app.jira.issue(parsed_args.issue).fields.issuelinks]
-        remote_links = [self.format_remote_link(x) for x in self.app.jira.remote_links(parsed_args.issue)]
-        return self.columns, issue_links + remote_links
+        """Get links of issues."""
+        if parsed_args.query:
+            # the issue links are returned by search, only remote links should be requested separately
+            issues = self.app.backend.search_issues(
+                parsed_args.query, parsed_args.page_size, fields="issuelinks", lazy=True
+            )
+            tasks = (
+                (functools.partial(self.get_issue_links, x.key, x), functools.partial(self.get_remote_links, x.key))
+                for x in issues
+            )
+        else:
+            tasks = (
+                (functools.partial(self.get_issue_links, x), functools.partial(self.get_remote_links, x))
+                for x in parsed_args.issue
+            )
+
+        results = self.app.backend.map(lambda x: x(), itertools.chain.from_iterable(tasks), parsed_args.workers)
+        return self.columns, itertools.chain.from_iterable(results)
+
+    def get_issue_links(self, key, issue=None):
+        """Gets issue links as list of tuples."""
+        if issue is None:
+            issue = self.app.get_issue(key, fields="issuelinks")
+        return [(key,) + self.format_issue_link(x) for x in issue.fields.issuelinks]
+
+    def get_remote_links(self, key):
+        """Gets remote links as list of tuples."""
+        return [(key,) + self.format_remote_link(x) for x in self.app.backend.remote_links(key)]
 
 
 class AddLink(JiraLinkMixin, base.JiraShow):
@@ -67,10 +98,12 @@ class AddLink(JiraLinkMixin, base.JiraShow):
 
     def get_parser(self, prog_name):
         parser = super(AddLink, self).get_parser(prog_name)
+        parser.add_argument("--issue", type=base.utf8, help="Issue ID", required=True)
         parser.add_argument("--type", type=base.utf8, help="Link type", required=True)
         parser.add_argument("--target", type=base.utf8, help="Link target, web link or issue ID", required=True)
         parser.add_argument("--text", type=base.utf8, help="Additional text for link")
         parser.add_argument("--icon", type=base.utf8, help="Icon for link, actual only for remote links")
+        parser.add_argument("--verify", action="store_true", help="Read the created link back from server")
 
         return parser
 
@@ -83,15 +116,42 @@ class AddLink(JiraLinkMixin, base.JiraShow):
                 "icon": {"url16x16": parsed_args.icon or self._get_favicon(parsed_args.target)},
             }
             link_id = self.app.jira.add_simple_link(parsed_args.issue, data).id
-            link = self.format_remote_link(self.app.jira.remote_link(parsed_args.issue, link_id))
+            if parsed_args.verify:
+                link = self.format_remote_link(self.app.jira.remote_link(parsed_args.issue, link_id))
+            else:
+                link = (
+                    "L{0}".format(link_id), self.TYPE_REMOTE_LINK, data["title"], data["url"], data["icon"]["url16x16"]
+                )
         else:
-            link_id = self.app.jira.create_issue_link(
-                parsed_args.type, parsed_args.target, parsed_args.issue, parsed_args.text
-            ).id
-            link = self.format_issue_link(self.app.jira.issue_link(parsed_args.issue, link_id))
-
+            link_type, inward, outward = self.get_link_type(parsed_args.type, parsed_args.target, parsed_args.issue)
+            response = self.app.jira.create_issue_link(link_type, inward, outward, parsed_args.text)
+            # the server does not return the link, its id is available only from location
+            link_id = response.headers.get("Location", "").rsplit("/", 1)[-1]
+            if parsed_args.verify and link_id:
+                link = self.format_issue_link(self.app.jira.issue_link(link_id))
+            else:
+                link = ("I{0}".format(link_id), parsed_args.type, parsed_args.target, "", "")
+            self.app.invalidate_issue(parsed_args.target)
+
+        self.app.invalidate_issue(parsed_args.issue)
         return self.columns, link
 
+    def get_link_type(self, name, inward, outward):
+        """Validates link type using the cached metadata.
+
+        The type can be specified by name or by description of outward or inward link,
+        in last case the issues are swapped. Returns the name of type and issues.
+        """
+        link_types = self.app.get_metadata("linktypes")
+        key, link_type = base.find_metadata(link_types, name, "name", "outward", "inward")
+        if link_type is None:
+            raise ValueError(u"Unknown link type '{0}', expected one of: {1}".format(
+                name, u", ".join(x["name"] for x in link_types)
+            ))
+        if key == "inward":
+            inward, outward = outward, inward
+        return link_type["name"], inward, outward
+
     @staticmethod
     def _get_title(url):
         data = urlparse.urlparse(url)
@@ -108,6 +168,7 @@ class ShowLink(JiraLinkMixin, base.JiraShow):
 
     def get_parser(self, prog_name):
         parser = super(ShowLink, self).get_parser(prog_name)
+        parser.add_argument("--issue", type=base.utf8, help="Issue ID", required=True)
         parser.add_argument("--id", type=base.utf8, help="Link ID", required=True)
         return parser
 
@@ -125,6 +186,7 @@ class ShowLink(JiraLinkMixin, base.JiraShow):
 class DropLink(JiraLinkMixin, base.JiraCommand):
     def get_parser(self, prog_name):
         parser = super(DropLink, self).get_parser(prog_name)
+        parser.add_argument("--issue", type=base.utf8, help="Issue ID", required=True)
         parser.add_argument("--id", type=base.utf8, help="Link ID", required=True)
         return parser
 
@@ -136,4 +198,5 @@ class DropLink(JiraLinkMixin, base.JiraCommand):
             self.app.jira.delete_issue_link(parsed_args.id[1:])
         else:
             raise ValueError("Link is not found")
+        self.app.invalidate_issue(parsed_args.issue)
         self.app.stdout.write("Done.\n")
@@ -0,0 +1,53 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from jiractl import cache
+from jiractl.commands import base
+
+
+class JiraMetadataMixin(object):
+    columns = ("id", "name")
+
+    kinds = tuple(sorted(cache.METADATA))
+
+
+class ListMetadata(JiraMetadataMixin, base.JiraList):
+    """Shows the cached server metadata: fields, issue types, link types, priorities or statuses."""
+
+    def get_parser(self, prog_name):
+        parser = super(ListMetadata, self).get_parser(prog_name)
+        parser.add_argument("--kind", choices=self.kinds, help="Kind of metadata", required=True)
+        return parser
+
+    def take_action(self, parsed_args):
+        """Gets metadata."""
+        return self.columns, [(x.get("id"), x.get("name")) for x in self.app.get_metadata(parsed_args.kind)]
+
+
+class RefreshMetadata(JiraMetadataMixin, base.JiraCommand):
+    """Fetches the server metadata again, e.g. after new field has been added."""
+
+    def get_parser(self, prog_name):
+        parser = super(RefreshMetadata, self).get_parser(prog_name)
+        parser.add_argument(
+            "--kind", choices=self.kinds, nargs='+', help="Kind of metadata to refresh, by default all"
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        """Refreshes metadata."""
+        for kind in parsed_args.kind or self.kinds:
+            self.app.metadata_cache.refresh(self.app.jira, kind)
+        self.app.stdout.write("Done.\n")
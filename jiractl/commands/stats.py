@@ -0,0 +1,137 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import logging
+import time
+
+from jiractl import analytics
+from jiractl.commands import base
+from jiractl import jql
+
+
+LOG = logging.getLogger(__name__)
+
+# the fields, which are needed to build timeline of issue
+FIELDS = "status,created"
+
+
+class StatsIssues(base.JiraPagedList):
+    """Displays statistics of issues, which match query, based on their changelog.
+
+    The durations report contains lead time, cycle time and time spent in each status,
+    the times are in days. The throughput report contains the number of issues completed per week.
+    The search returns truncated changelog of issues with long history, the full
+    changelog of such issues is fetched separately.
+    """
+
+    def get_parser(self, prog_name):
+        parser = super(StatsIssues, self).get_parser(prog_name)
+        parser.add_argument("--query", type=base.utf8, help="Query string", required=True)
+        parser.add_argument(
+            "--report", choices=("durations", "throughput"), default="durations",
+            help="Type of report, default: %(default)s"
+        )
+        parser.add_argument(
+            "--started", type=base.utf8, nargs='+', default=[u"In Progress"], metavar="STATUS",
+            help="Statuses, the first transition to which starts the cycle time"
+        )
+        parser.add_argument(
+            "--done", type=base.utf8, nargs='+', default=[u"Done", u"Closed", u"Resolved"], metavar="STATUS",
+            help="Statuses of completed issues"
+        )
+        parser.add_argument(
+            "--percentiles", type=int, nargs='+', default=[50, 85, 95], help="Percentiles of durations to display"
+        )
+        parser.add_argument("--workers", type=int, default=8, help="Number of requests executed at once")
+        return parser
+
+    def take_action(self, parsed_args):
+        """Displays statistics of issues."""
+        timeline = analytics.Timeline(parsed_args.started, parsed_args.done)
+        truncated = []
+        for issue in self.search(parsed_args.query, parsed_args.page_size):
+            changelog = issue.get("changelog") or {}
+            if changelog.get("total", 0) > len(changelog.get("histories") or ()):
+                truncated.append(issue["key"])
+            else:
+                self.add_issue(timeline, issue)
+
+        if truncated:
+            LOG.debug("Fetching full changelog of %d issues", len(truncated))
+        for issue in self.app.backend.map(self.get_issue, truncated, parsed_args.workers):
+            self.add_issue(timeline, issue)
+
+        if parsed_args.report == "throughput":
+            return self.get_throughput(timeline)
+        return self.get_durations(timeline, parsed_args.percentiles)
+
+    def search(self, query, page_size):
+        """Iterates over issues with changelog, the issues are decoded as plain data."""
+        jira = self.app.jira
+
+        def fetch(start_at, max_results):
+            params = {
+                "jql": query, "startAt": start_at, "maxResults": max_results, "fields": FIELDS, "expand": "changelog",
+            }
+            data = jira._get_json("search", params=params)
+            return data["issues"], data.get("total")
+
+        return self.app.backend.fetch_pages(fetch, page_size)
+
+    def get_issue(self, key):
+        """Gets issue with full changelog."""
+        return self.app.jira._get_json(u"issue/{0}".format(key), params={"fields": FIELDS, "expand": "changelog"})
+
+    @staticmethod
+    def add_issue(timeline, issue):
+        """Adds status transitions of issue to timeline."""
+        fields = issue.get("fields") or {}
+        created = jql.parse_time(fields.get("created"))
+        if created is None:
+            LOG.debug(u"Skipping issue %s without creation time", issue.get("key"))
+            return
+
+        transitions = []
+        for history in (issue.get("changelog") or {}).get("histories") or ():
+            moment = None
+            for item in history.get("items") or ():
+                if item.get("field") == "status":
+                    if moment is None:
+                        moment = jql.parse_time(history.get("created"))
+                    transitions.append((moment, item.get("fromString"), item.get("toString")))
+        # the sort is stable, so transitions at the same time keep their order
+        transitions.sort(key=lambda x: x[0])
+        timeline.add_issue(created, transitions, (fields.get("status") or {}).get("name"))
+
+    @staticmethod
+    def to_days(value):
+        return None if value is None else round(value / analytics.DAY, 2)
+
+    def get_durations(self, timeline, percentiles):
+        columns = ("metric", "issues", "mean") + tuple("p{0}".format(x) for x in percentiles) + ("max",)
+        metrics = [("lead time", timeline.get_lead_times()), ("cycle time", timeline.get_cycle_times())]
+        in_status = timeline.get_time_in_status()
+        metrics.extend((u"status {0}".format(x), in_status[x]) for x in timeline.names)
+
+        data = []
+        for name, values in metrics:
+            count, mean, values, maximum = analytics.summarize(values, percentiles)
+            data.append((name, count) + tuple(self.to_days(x) for x in [mean] + values + [maximum]))
+        return columns, data
+
+    @staticmethod
+    def get_throughput(timeline):
+        data = [(time.strftime("%Y-%m-%d", time.gmtime(week)), count) for week, count in timeline.get_throughput()]
+        return ("week", "completed"), data
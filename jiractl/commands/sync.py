@@ -0,0 +1,102 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import itertools
+import math
+import time
+
+from jiractl.commands import base
+from jiractl.commands import issues
+from jiractl import jql
+from jiractl import mirror
+
+
+class SyncIssues(issues.JiraIssueMixin, base.JiraShow):
+    """Copies issues, which match query, to the local database.
+
+    Only the issues, which have been updated since the previous sync, are fetched.
+    The issues, which do not match query anymore, e.g. deleted or moved, are found
+    by periodic scan, that fetches only the IDs of matching issues.
+    """
+
+    columns = ("query", "fetched", "removed", "total")
+
+    def get_parser(self, prog_name):
+        parser = super(SyncIssues, self).get_parser(prog_name)
+        parser.add_argument("--query", type=base.utf8, help="Query string", required=True)
+        parser.add_argument(
+            "--db", type=base.utf8, default=mirror.get_mirror_path(), help="Path to the local database"
+        )
+        parser.add_argument("--fields", type=base.utf8, nargs='+', help="Custom fields to store in raw issue")
+        parser.add_argument(
+            "--scan-interval", type=int, default=3600, metavar="SECONDS",
+            help="Check that the stored issues still match query, if the last check is older, default: %(default)s"
+        )
+        parser.add_argument("--full", action="store_true", help="Fetch all issues, that match query")
+        parser.add_argument(
+            "--page-size", type=int, default=base.JiraPagedList.page_size, help="Number of issues to fetch per request"
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        """Synchronizes issues."""
+        store = mirror.IssueMirror(parsed_args.db)
+        try:
+            return self.columns, self.sync(store, parsed_args)
+        finally:
+            store.close()
+
+    def sync(self, store, parsed_args):
+        started = time.time()
+        synced, scanned = store.get_cursor(parsed_args.query)
+        query = jql.strip_order(parsed_args.query)
+        full = parsed_args.full or synced is None
+        if not full:
+            # the relative time is evaluated by server, so it does not depend on time zones and clock skew,
+            # one more minute covers the rounding and the issues updated during previous sync
+            query = u"({0}) AND updated >= -{1}m".format(query, int(math.ceil((started - synced) / 60.0)) + 1)
+
+        custom_fields = self.get_field_ids(parsed_args.fields) if parsed_args.fields else []
+        fields = ",".join([self.get_fields(issues.JiraIssueMixin.columns), "updated", "created"] + custom_fields)
+        # the created issues are appended to the end, so pages are stable while the sync is in progress
+        found = self.app.backend.search_issues(query + u" ORDER BY created ASC", parsed_args.page_size, fields)
+
+        fetched = 0
+        ids = []
+        rows = (
+            self.format_issue(x) + (
+                x.fields.project.key, getattr(x.fields, "updated", None), getattr(x.fields, "created", None), x.raw
+            ) for x in found
+        )
+        for chunk in iter(lambda: list(itertools.islice(rows, parsed_args.page_size)), []):
+            fetched += store.put(parsed_args.query, chunk)
+            ids.extend(x[1] for x in chunk)
+
+        removed = 0
+        if full:
+            removed = store.reconcile(parsed_args.query, ids)
+            scanned = started
+        elif scanned is None or started - scanned >= parsed_args.scan_interval:
+            removed = store.reconcile(parsed_args.query, self.scan(parsed_args.query, parsed_args.page_size))
+            scanned = started
+
+        store.set_cursor(parsed_args.query, started, scanned)
+        return parsed_args.query, fetched, removed, store.count(parsed_args.query)
+
+    def scan(self, query, page_size):
+        """Gets IDs of all issues, which match query."""
+        # the id and key are always returned, so ask for one of cheapest fields
+        found = self.app.backend.search_issues(jql.strip_order(query), page_size, "updated")
+        return [x.id for x in found]
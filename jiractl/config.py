@@ -0,0 +1,69 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import ConfigParser
+import os
+
+from jiractl import cache
+
+
+# the environment variable, that overrides the path to config
+CONFIG_ENV = "JIRACTL_CONFIG"
+
+# the section of config, that contains the global options
+SECTION = "jiractl"
+
+
+def get_config_path():
+    """Gets path to the config file."""
+    return os.environ.get(CONFIG_ENV) or os.path.join(os.path.dirname(cache.get_cache_path()), "config")
+
+
+def load_defaults(path, parser):
+    """Reads the defaults of global options from config.
+
+    The config is INI file, the keys of section [jiractl] are names of options,
+    e.g. concurrency = 16 or compression = false. The values are converted by
+    parser as if they were specified in command line.
+
+    Returns the defaults and the list of problems, the keys with problems are
+    skipped, because the config must not prevent the tool from running.
+    """
+    config = ConfigParser.RawConfigParser()
+    try:
+        if not config.read(path) or not config.has_section(SECTION):
+            return {}, []
+    except ConfigParser.Error as e:
+        return {}, [u"Cannot read {0}: {1}".format(path, e)]
+
+    known = vars(parser.parse_known_args([])[0])
+    types = dict((action.dest, action.type) for action in parser._actions if action.type is not None)
+    defaults = {}
+    problems = []
+    for key, value in config.items(SECTION):
+        dest = key.replace("-", "_")
+        if dest not in known:
+            problems.append(u"Unknown option '{0}' in {1}".format(key, path))
+            continue
+        try:
+            if isinstance(known[dest], bool):
+                value = config.getboolean(SECTION, key)
+            elif dest in types:
+                types[dest](value)
+        except (TypeError, ValueError):
+            problems.append(u"Invalid value of option '{0}' in {1}: {2}".format(key, path, value))
+            continue
+        defaults[dest] = value
+    return defaults, problems
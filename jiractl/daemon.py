@@ -0,0 +1,187 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import codecs
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import SocketServer
+import sys
+
+
+SOCKET_ENV = "JIRACTL_SOCKET"
+
+# commands, which are always executed in the calling process (they may read stdin)
+LOCAL_COMMANDS = ("daemon", "batch", "issue create bulk")
+
+# options of commands, which run until interrupted, they are executed in the calling process too
+LOCAL_OPTIONS = ("--follow",)
+
+LOG = logging.getLogger(__name__)
+
+
+def get_socket_path():
+    """Gets path to the daemon socket."""
+    return os.environ.get(SOCKET_ENV) or os.path.join(os.path.expanduser("~"), ".jiractl", "daemon.sock")
+
+
+def send_message(stream, message):
+    """Writes message to stream, one message per line."""
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+def receive_message(stream):
+    """Reads one message from stream."""
+    line = stream.readline()
+    if not line:
+        raise EOFError("Connection closed")
+    return json.loads(line)
+
+
+def is_local(name, argv):
+    """Checks that command must be executed in the calling process.
+
+    The name is the command name, that is found by command manager or None,
+    the argv are arguments of command.
+    """
+    return name is None or name in LOCAL_COMMANDS or any(x.split("=", 1)[0] in LOCAL_OPTIONS for x in argv)
+
+
+def forward(argv, path=None, stdout=None, stderr=None):
+    """Executes command in the daemon, the output is written as the command produces it.
+
+    The command is executed in the current directory of calling process.
+    Returns the exit code of command or None if the daemon is not running.
+    """
+    path = path or get_socket_path()
+    if not os.path.exists(path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with contextlib.closing(sock):
+        try:
+            sock.connect(path)
+        except socket.error as e:
+            LOG.debug("Daemon is not available: %s", e)
+            return None
+
+        stream = sock.makefile("rw")
+        with contextlib.closing(stream):
+            send_message(stream, {"argv": argv, "cwd": os.getcwd()})
+            streams = {"stdout": stdout or sys.stdout, "stderr": stderr or sys.stderr}
+            while True:
+                message = receive_message(stream)
+                if "code" in message:
+                    return message["code"]
+                output = streams[message["stream"]]
+                output.write(message["data"].encode("utf8"))
+                output.flush()
+
+
+class OutputStream(object):
+    """Sends the output of command to client, one message per write."""
+
+    def __init__(self, stream, name):
+        self.stream = stream
+        self.name = name
+        self.disconnected = False
+
+    def write(self, data):
+        if self.disconnected:
+            return
+        try:
+            send_message(self.stream, {"stream": self.name, "data": data.decode("utf8", "replace")})
+        except socket.error as e:
+            # the command keeps running, its output is discarded
+            LOG.debug("Client has disconnected: %s", e)
+            self.disconnected = True
+
+    def flush(self):
+        pass
+
+
+class RequestHandler(SocketServer.StreamRequestHandler):
+    """Handles one command per connection."""
+
+    def handle(self):
+        try:
+            request = receive_message(self.rfile)
+        except (EOFError, ValueError) as e:
+            LOG.warning("Invalid request: %s", e)
+            return
+        # the command line arguments are byte strings
+        argv = [x.encode("utf8") for x in request["argv"]]
+        stdout = OutputStream(self.wfile, "stdout")
+        code = self.server.execute(argv, stdout, OutputStream(self.wfile, "stderr"), request.get("cwd"))
+        if not stdout.disconnected:
+            send_message(self.wfile, {"code": code})
+
+
+class Server(SocketServer.UnixStreamServer):
+    """Executes commands, that are sent by clients over UNIX socket.
+
+    The commands are executed one by one by the app_factory,
+    which is a callable that accepts stdin, stdout and stderr
+    and returns a new application. The output of command is sent
+    to client while the command is running.
+    """
+
+    def __init__(self, path, app_factory):
+        self.path = path
+        self.app_factory = app_factory
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        if os.path.exists(path):
+            os.unlink(path)
+        SocketServer.UnixStreamServer.__init__(self, path, RequestHandler)
+        os.chmod(path, 0o600)
+
+    def execute(self, argv, stdout, stderr, cwd=None):
+        """Executes command in directory cwd, writes output to byte streams and returns exit code."""
+        streams = sys.stdout, sys.stderr
+        directory = os.getcwd()
+        # argparse writes usage and errors directly to sys streams
+        sys.stdout = codecs.getwriter("utf8")(stdout)
+        sys.stderr = codecs.getwriter("utf8")(stderr)
+        # each run of application adds new logging handler
+        root_logger = logging.getLogger("")
+        handlers = root_logger.handlers[:]
+        level = root_logger.level
+        try:
+            if cwd:
+                # the relative paths in arguments are relative to the directory of client
+                os.chdir(cwd)
+            code = self.app_factory(stdin=io.BytesIO(), stdout=sys.stdout, stderr=sys.stderr).run(argv)
+        except SystemExit as e:
+            code = e.code
+        except Exception:
+            LOG.exception("Command failed: %s", argv)
+            code = 1
+        finally:
+            sys.stdout, sys.stderr = streams
+            root_logger.handlers = handlers
+            root_logger.setLevel(level)
+            os.chdir(directory)
+        return code
+
+    def server_close(self):
+        SocketServer.UnixStreamServer.server_close(self)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
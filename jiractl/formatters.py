@@ -0,0 +1,165 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import collections
+import itertools
+import json
+
+from cliff.formatters import base
+
+
+def get_value(value):
+    """Gets the machine readable value of column."""
+    # the complex values of cliff are formatted by themselves
+    if hasattr(value, "machine_readable"):
+        return value.machine_readable()
+    return value
+
+
+def to_text(value):
+    """Converts value to unicode, None is converted to empty string."""
+    value = get_value(value)
+    if value is None:
+        return u""
+    if isinstance(value, str):
+        return value.decode("utf8")
+    return unicode(value)
+
+
+class StreamFormatter(base.ListFormatter):
+    """Writes each row as soon as it is produced by command.
+
+    The rows are not collected, so the memory does not depend on number of rows,
+    the stream is flushed after each row, so the output may be piped to other tools
+    while the next pages are being fetched.
+    """
+
+    def add_argument_group(self, parser):
+        pass
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        self.write_header(column_names, stdout)
+        for row in data:
+            self.write_row(column_names, row, stdout)
+            stdout.flush()
+
+    def write_header(self, column_names, stdout):
+        pass
+
+    def write_row(self, column_names, row, stdout):
+        raise NotImplementedError
+
+
+class JSONLinesFormatter(StreamFormatter):
+    """Writes one JSON object per line."""
+
+    def write_row(self, column_names, row, stdout):
+        item = collections.OrderedDict((n, get_value(v)) for n, v in zip(column_names, row))
+        stdout.write(json.dumps(item, default=unicode) + u"\n")
+
+
+class CSVFormatter(StreamFormatter):
+    """Writes header and rows as comma-separated values, the values are quoted if necessary."""
+
+    SPECIAL = (u",", u'"', u"\r", u"\n")
+
+    @classmethod
+    def quote(cls, value):
+        text = to_text(value)
+        if any(x in text for x in cls.SPECIAL):
+            return u'"{0}"'.format(text.replace(u'"', u'""'))
+        return text
+
+    def write_header(self, column_names, stdout):
+        self.write_row(column_names, column_names, stdout)
+
+    def write_row(self, column_names, row, stdout):
+        stdout.write(u",".join(self.quote(x) for x in row) + u"\r\n")
+
+
+class TSVFormatter(StreamFormatter):
+    """Writes header and rows as tab-separated values.
+
+    The tabs, line breaks and backslashes in values are escaped as \\t, \\n, \\r and \\\\,
+    so each row takes exactly one line.
+    """
+
+    ESCAPES = ((u"\\", u"\\\\"), (u"\t", u"\\t"), (u"\n", u"\\n"), (u"\r", u"\\r"))
+
+    @classmethod
+    def escape(cls, value):
+        text = to_text(value)
+        for char, escaped in cls.ESCAPES:
+            text = text.replace(char, escaped)
+        return text
+
+    def write_header(self, column_names, stdout):
+        self.write_row(column_names, column_names, stdout)
+
+    def write_row(self, column_names, row, stdout):
+        stdout.write(u"\t".join(self.escape(x) for x in row) + u"\n")
+
+
+class TableFormatter(StreamFormatter):
+    """Writes rows as table, the widths of columns are determined by the first rows.
+
+    Unlike the table of cliff, only the first rows are kept in memory, the longer
+    values of the following rows widen their cells and shift the rest of row.
+    """
+
+    sample_size = 100
+
+    def add_argument_group(self, parser):
+        group = parser.add_argument_group("streaming table formatter")
+        group.add_argument(
+            "--sample-rows", metavar="N", type=int, default=self.sample_size,
+            help="Number of first rows, which determine widths of columns, default: %(default)s"
+        )
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        data = iter(data)
+        sample = list(itertools.islice(data, max(1, parsed_args.sample_rows)))
+        if not sample:
+            # the empty table is not printed as in table of cliff
+            return
+        # the numbers are aligned to right as in table of cliff
+        numbers = [isinstance(get_value(x), (int, long, float)) for x in sample[0]]
+        sample = [self.format_row(x) for x in sample]
+        widths = [len(x) for x in column_names]
+        for row in sample:
+            widths = [max(w, len(x)) for w, x in zip(widths, row)]
+
+        border = u"+" + u"+".join(u"-" * (w + 2) for w in widths) + u"+\n"
+        stdout.write(border)
+        self.write_line(column_names, widths, [False] * len(column_names), stdout)
+        stdout.write(border)
+        for row in sample:
+            self.write_line(row, widths, numbers, stdout)
+        stdout.flush()
+        del sample
+        for row in data:
+            self.write_line(self.format_row(row), widths, numbers, stdout)
+            stdout.flush()
+        stdout.write(border)
+
+    @staticmethod
+    def format_row(row):
+        # the row should take one line
+        return [u" ".join(to_text(x).splitlines()) for x in row]
+
+    @staticmethod
+    def write_line(values, widths, numbers, stdout):
+        cells = (v.rjust(w) if n else v.ljust(w) for v, w, n in zip(values, widths, numbers))
+        stdout.write(u"| " + u" | ".join(cells) + u" |\n")
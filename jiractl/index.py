@@ -0,0 +1,71 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import importlib
+import os
+import pprint
+
+
+# the module, that is generated at install time and contains VERSION and COMMANDS,
+# it saves scanning of all installed packages for entry points on every start
+INDEX_MODULE = "_index.py"
+
+
+def parse_entry_points(text):
+    """Parses entry points in format of setup.cfg, one 'name=module:attr' per line."""
+    result = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            name, target = line.split("=", 1)
+            result[name.strip()] = target.strip()
+    return result
+
+
+def write_index(path, version, commands):
+    """Writes the index module."""
+    with open(path, "w") as stream:
+        stream.write("# This file is generated by setup, do not edit it.\n\n")
+        stream.write("VERSION = {0!r}\n\n".format(version))
+        stream.write("COMMANDS = {0}\n".format(pprint.pformat(commands)))
+
+
+def get_index_path():
+    """Gets path to the index module of installed package."""
+    return os.path.join(os.path.dirname(__file__), INDEX_MODULE)
+
+
+def load_index():
+    """Loads the index, returns None if it has not been generated."""
+    try:
+        from jiractl import _index
+    except ImportError:
+        return None
+    return _index
+
+
+class IndexEntryPoint(object):
+    """The command from index, the command module is imported only when it is used."""
+
+    def __init__(self, name, target):
+        self.name = name
+        self.target = target
+
+    def resolve(self):
+        module, attr = self.target.split(":", 1)
+        return getattr(importlib.import_module(module), attr)
+
+    def load(self, require=False):
+        return self.resolve()
@@ -0,0 +1,339 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import calendar
+import re
+import time
+
+
+ORDER_BY = re.compile(r"\s+order\s+by\s+.*$", re.IGNORECASE | re.DOTALL)
+
+TOKEN = re.compile(r'''\s*(?:("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|(!=|<=|>=|!~|=|~|<|>|\(|\)|,)|([^\s=!<>~(),"']+))''')
+
+# JQL field: (column, kind), the project is matched by key or by name
+FIELDS = {
+    "project": ("project", "project"),
+    "id": ("id", "text"),
+    "key": ("key", "key"),
+    "issuekey": ("key", "key"),
+    "summary": ("summary", "text"),
+    "type": ("type", "text"),
+    "issuetype": ("type", "text"),
+    "assignee": ("assignee", "text"),
+    "status": ("status", "text"),
+    "updated": ("updated_at", "date"),
+    "created": ("created_at", "date"),
+}
+
+# the operators, which are supported for kind of field
+OPERATORS = {
+    "project": ("=", "!=", "in", "not in"),
+    "key": ("=", "!=", "in", "not in"),
+    "text": ("=", "!=", "in", "not in", "~", "!~"),
+    "date": ("<", "<=", ">", ">="),
+}
+
+# the keys are ordered by project and number
+ORDER_COLUMNS = {
+    "key": "project_key {0}, CAST(substr(key, instr(key, '-') + 1) AS INTEGER) {0}",
+}
+
+DURATION = re.compile(r"^([-+]?)(\d+)([wdhm])$")
+
+UNITS = {"w": 7 * 24 * 60 * 60, "d": 24 * 60 * 60, "h": 60 * 60, "m": 60}
+
+DATE_FORMATS = ("%Y-%m-%d %H:%M", "%Y/%m/%d %H:%M", "%Y-%m-%d", "%Y/%m/%d")
+
+TIME = re.compile(r"^(\d{4}-\d{2}-\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?([-+])(\d{2}):?(\d{2})$")
+
+# the timestamps of dates, which have been parsed, the times of issues span a limited number of days,
+# the cache is cleared when it reaches the limit, so it does not grow in long-running processes
+DAYS = {}
+DAYS_LIMIT = 4096
+
+
+class UnsupportedQuery(ValueError):
+    """The query uses syntax, that cannot be evaluated locally."""
+
+
+def strip_order(text):
+    """Removes ORDER BY from query."""
+    return ORDER_BY.sub(u"", text)
+
+
+def tokenize(text):
+    """Splits query to tokens: (kind, value), kind is string, operator or word."""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise UnsupportedQuery(u"Unexpected symbol at {0}".format(position))
+        string, operator, word = match.groups()
+        if string is not None:
+            tokens.append(("string", re.sub(r"\\(.)", r"\1", string[1:-1])))
+        elif operator is not None:
+            tokens.append(("operator", operator))
+        else:
+            tokens.append(("word", word))
+        position = match.end()
+    return tokens
+
+
+def parse_time(value, milliseconds=False):
+    """Converts Jira time, e.g. 2017-01-01T00:00:00.000+0000, to timestamp.
+
+    The timestamp is integer number of seconds, or of milliseconds if milliseconds is true.
+    """
+    match = TIME.match(value or "")
+    if match is None:
+        return None
+    date, hours, minutes, seconds, fraction, sign, offset_hours, offset_minutes = match.groups()
+    day = DAYS.get(date)
+    if day is None:
+        if len(DAYS) >= DAYS_LIMIT:
+            DAYS.clear()
+        day = DAYS[date] = calendar.timegm(time.strptime(date, "%Y-%m-%d"))
+    timestamp = day + (int(hours) * 60 + int(minutes)) * 60 + int(seconds)
+    offset = (int(offset_hours) * 60 + int(offset_minutes)) * 60
+    timestamp = timestamp - offset if sign == "+" else timestamp + offset
+    if milliseconds:
+        return timestamp * 1000 + int((fraction or "0")[:3].ljust(3, "0"))
+    return timestamp
+
+
+def parse_date(value, now=None):
+    """Converts JQL date to timestamp, the absolute dates are in local time."""
+    match = DURATION.match(value)
+    if match:
+        sign, count, unit = match.groups()
+        offset = int(count) * UNITS[unit]
+        return (now or time.time()) + (-offset if sign == "-" else offset)
+    for date_format in DATE_FORMATS:
+        try:
+            return time.mktime(time.strptime(value, date_format))
+        except ValueError:
+            pass
+    raise UnsupportedQuery(u"Unsupported date '{0}'".format(value))
+
+
+class Compiler(object):
+    """Compiles the subset of JQL to SQL condition over the local mirror of issues.
+
+    Supports operators =, !=, IN, NOT IN, ~ and !~ for issue columns, date comparisons
+    for updated and created, AND, OR, NOT, parentheses and ORDER BY.
+    The rest of JQL, e.g. functions or other fields, raises UnsupportedQuery.
+    """
+
+    def __init__(self, text, now=None):
+        self.tokens = tokenize(text)
+        self.position = 0
+        self.now = now
+        self.params = []
+
+    def compile(self):
+        """Returns SQL condition, its parameters and SQL order."""
+        where = "1"
+        if self.peek() and not self.is_keyword("order"):
+            where = self.parse_or()
+        order = self.parse_order() if self.peek() else ""
+        if self.peek():
+            raise UnsupportedQuery(u"Unexpected '{0}'".format(self.peek()[1]))
+        return where, self.params, order
+
+    def compile_terms(self):
+        """Returns the conditions, which are joined by AND at the top level, as list of (SQL condition, parameters).
+
+        The query, which is not a conjunction, is one condition, the order is ignored.
+        """
+        terms = []
+        if self.peek() and not self.is_keyword("order"):
+            while True:
+                start = len(self.params)
+                terms.append((self.parse_not(), self.params[start:]))
+                if not self.is_keyword("and"):
+                    break
+                self.position += 1
+        if self.peek() and not self.is_keyword("order"):
+            # e.g. OR at the top level
+            self.position = 0
+            self.params = []
+            where, params, _ = self.compile()
+            return [(where, params)]
+        return terms
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise UnsupportedQuery(u"Unexpected end of query")
+        self.position += 1
+        return token
+
+    def is_keyword(self, word):
+        token = self.peek()
+        return token is not None and token[0] == "word" and token[1].lower() == word
+
+    def is_operator(self, operator):
+        token = self.peek()
+        return token is not None and token[0] == "operator" and token[1] == operator
+
+    def expect_keyword(self, word):
+        if not self.is_keyword(word):
+            raise UnsupportedQuery(u"Expected {0}".format(word.upper()))
+        self.position += 1
+
+    def expect_operator(self, operator):
+        if not self.is_operator(operator):
+            raise UnsupportedQuery(u"Expected '{0}'".format(operator))
+        self.position += 1
+
+    def parse_or(self):
+        parts = [self.parse_and()]
+        while self.is_keyword("or"):
+            self.position += 1
+            parts.append(self.parse_and())
+        return parts[0] if len(parts) == 1 else u"({0})".format(u" OR ".join(parts))
+
+    def parse_and(self):
+        parts = [self.parse_not()]
+        while self.is_keyword("and"):
+            self.position += 1
+            parts.append(self.parse_not())
+        return parts[0] if len(parts) == 1 else u"({0})".format(u" AND ".join(parts))
+
+    def parse_not(self):
+        if self.is_keyword("not"):
+            self.position += 1
+            return u"NOT {0}".format(self.parse_not())
+        if self.is_operator("("):
+            self.position += 1
+            condition = self.parse_or()
+            self.expect_operator(")")
+            return condition
+        return self.parse_clause()
+
+    def parse_clause(self):
+        kind, name = self.next()
+        if kind == "operator" or name.lower() not in FIELDS:
+            raise UnsupportedQuery(u"Unsupported field '{0}'".format(name))
+        column, field_kind = FIELDS[name.lower()]
+
+        if self.is_keyword("not"):
+            self.position += 1
+            self.expect_keyword("in")
+            operator = "not in"
+        elif self.is_keyword("in"):
+            self.position += 1
+            operator = "in"
+        else:
+            kind, operator = self.next()
+            if kind != "operator":
+                raise UnsupportedQuery(u"Unsupported operator '{0}'".format(operator))
+        if operator not in OPERATORS[field_kind]:
+            raise UnsupportedQuery(u"Operator '{0}' is not supported for {1}".format(operator, name))
+
+        if operator in ("in", "not in"):
+            values = self.parse_list()
+        else:
+            values = [self.parse_value()]
+
+        if field_kind == "date":
+            self.params.append(parse_date(values[0], self.now))
+            return u"{0} {1} ?".format(column, operator)
+        if operator in ("~", "!~"):
+            self.params.append(u"%{0}%".format(escape_like(values[0])))
+            return u"{0} {1}LIKE ? ESCAPE '\\'".format(column, "NOT " if operator == "!~" else "")
+
+        placeholders = u", ".join("?" * len(values))
+        sql_operator = {"=": "IN", "!=": "NOT IN"}.get(operator, operator.upper())
+        columns = ("project_key", "project") if field_kind == "project" else (column,)
+        conditions = []
+        for x in columns:
+            self.params.extend(values)
+            conditions.append(u"{0} COLLATE NOCASE {1} ({2})".format(x, sql_operator, placeholders))
+        joiner = u" AND " if sql_operator == "NOT IN" else u" OR "
+        return conditions[0] if len(conditions) == 1 else u"({0})".format(joiner.join(conditions))
+
+    def parse_value(self):
+        kind, value = self.next()
+        if kind == "operator" or self.is_operator("("):
+            # functions, e.g. currentUser(), are evaluated by server only
+            raise UnsupportedQuery(u"Unsupported value '{0}'".format(value))
+        if kind == "word" and value.lower() in ("empty", "null"):
+            raise UnsupportedQuery(u"EMPTY is not supported")
+        return value
+
+    def parse_list(self):
+        self.expect_operator("(")
+        values = [self.parse_value()]
+        while self.is_operator(","):
+            self.position += 1
+            values.append(self.parse_value())
+        self.expect_operator(")")
+        return values
+
+    def parse_order(self):
+        self.expect_keyword("order")
+        self.expect_keyword("by")
+        parts = []
+        while True:
+            kind, name = self.next()
+            if kind == "operator" or name.lower() not in FIELDS:
+                raise UnsupportedQuery(u"Unsupported order by '{0}'".format(name))
+            direction = "ASC"
+            if self.is_keyword("asc") or self.is_keyword("desc"):
+                direction = self.next()[1].upper()
+            column = FIELDS[name.lower()][0]
+            if column in ORDER_COLUMNS:
+                parts.append(ORDER_COLUMNS[column].format(direction))
+            else:
+                parts.append(u"{0} {1}".format(column, direction))
+            if not self.is_operator(","):
+                break
+            self.position += 1
+        return u", ".join(parts)
+
+
+def compile_query(text, now=None):
+    """Compiles JQL to (SQL condition, parameters, SQL order), raises UnsupportedQuery."""
+    return Compiler(text, now).compile()
+
+
+def escape_like(text):
+    """Escapes the wildcards of SQL LIKE, the escape character is backslash."""
+    return text.replace(u"\\", u"\\\\").replace(u"%", u"\\%").replace(u"_", u"\\_")
+
+
+def covers(query, other, now=None):
+    """Checks that all issues, which match other query, match query too.
+
+    The check is conservative: the query covers other one if each of its conditions,
+    which are joined by AND, or the whole query is a condition of other query.
+    The text values are compared case-insensitively as Jira does.
+    """
+    def normalize(terms):
+        return [(x, [y.lower() if isinstance(y, basestring) else y for y in params]) for x, params in terms]
+
+    try:
+        terms = normalize(Compiler(query, now).compile_terms())
+        other_terms = normalize(Compiler(other, now).compile_terms())
+        where, params, _ = compile_query(query, now)
+    except UnsupportedQuery:
+        return False
+    return all(x in other_terms for x in terms) or normalize([(where, params)])[0] in other_terms
@@ -0,0 +1,48 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import collections
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+# the decoders in order of preference, the decoders, which are not installed, are None
+DECODERS = collections.OrderedDict([
+    ("orjson", orjson and orjson.loads),
+    ("ujson", ujson and ujson.loads),
+    ("json", json.loads),
+])
+
+
+def get_decoder(name="auto"):
+    """Gets function, that decodes JSON document from UTF-8 bytes.
+
+    The auto means the fastest of installed decoders.
+    """
+    if name == "auto":
+        return next(x for x in DECODERS.values() if x is not None)
+    decoder = DECODERS.get(name)
+    if decoder is None:
+        raise ValueError(u"The JSON decoder '{0}' is not installed".format(name))
+    return decoder
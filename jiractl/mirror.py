@@ -0,0 +1,147 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import os
+import threading
+
+from jiractl import cache
+from jiractl import jql
+
+
+# the issue columns are the same as columns of issue commands, the timestamps are used by local search,
+# the text is compared case insensitively as Jira does
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    id TEXT PRIMARY KEY,
+    project TEXT,
+    project_key TEXT,
+    key TEXT,
+    summary TEXT,
+    type TEXT,
+    assignee TEXT,
+    status TEXT,
+    created TEXT,
+    updated TEXT,
+    created_at REAL,
+    updated_at REAL,
+    raw TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_key ON issues (key);
+CREATE INDEX IF NOT EXISTS issues_project ON issues (project COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS issues_project_key ON issues (project_key COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS issues_type ON issues (type COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS issues_assignee ON issues (assignee COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS issues_status ON issues (status COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS issues_updated ON issues (updated_at);
+CREATE INDEX IF NOT EXISTS issues_created ON issues (created_at);
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT PRIMARY KEY,
+    synced REAL,
+    scanned REAL
+);
+CREATE TABLE IF NOT EXISTS query_issues (
+    query TEXT,
+    id TEXT,
+    PRIMARY KEY (query, id)
+);
+CREATE INDEX IF NOT EXISTS query_issues_id ON query_issues (id);
+"""
+
+ISSUE_COLUMNS = ("project", "id", "key", "summary", "type", "assignee", "status")
+
+
+def get_mirror_path():
+    """Gets default path to the local mirror of issues."""
+    return os.path.join(os.path.dirname(cache.get_cache_path()), "mirror.db")
+
+
+class IssueMirror(object):
+    """Local copy of issues, which match queries.
+
+    Every query has a cursor: the time of last sync and of last full scan,
+    the issue belongs to mirror while it matches at least one query.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.RLock()
+        self.connection = cache.connect(path, SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def get_cursor(self, query):
+        """Gets the time of last sync and of last full scan of query, None if it has not been done."""
+        with self.lock:
+            row = self.connection.execute("SELECT synced, scanned FROM queries WHERE query = ?", (query,)).fetchone()
+        return row or (None, None)
+
+    def get_queries(self):
+        """Gets the queries, which have been synced."""
+        with self.lock:
+            return [x[0] for x in self.connection.execute("SELECT query FROM queries WHERE synced IS NOT NULL")]
+
+    def set_cursor(self, query, synced, scanned):
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO queries VALUES (?, ?, ?)", (query, synced, scanned))
+
+    def put(self, query, rows):
+        """Inserts or updates issues.
+
+        The rows are (project, id, key, summary, type, assignee, status, project key, updated, created, raw).
+        """
+        rows = [
+            (x[1], x[0], x[2], x[3], x[4], x[5], x[6], x[8], json.dumps(x[10]), x[7], x[9],
+             jql.parse_time(x[8]), jql.parse_time(x[9])) for x in rows
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO issues (id, project, key, summary, type, assignee, status, updated, raw, "
+                "project_key, created, updated_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO query_issues VALUES (?, ?)", ((query, x[0]) for x in rows)
+            )
+        return len(rows)
+
+    def reconcile(self, query, ids):
+        """Removes the issues, that do not match query anymore, returns the number of them."""
+        ids = set(ids)
+        with self.lock, self.connection:
+            known = set(x[0] for x in self.connection.execute("SELECT id FROM query_issues WHERE query = ?", (query,)))
+            removed = [(query, x) for x in known - ids]
+            self.connection.executemany("DELETE FROM query_issues WHERE query = ? AND id = ?", removed)
+            # the issue is kept while it matches other queries
+            self.connection.execute("DELETE FROM issues WHERE id NOT IN (SELECT id FROM query_issues)")
+        return len(removed)
+
+    def count(self, query):
+        """Gets the number of issues, that match query."""
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM query_issues WHERE query = ?", (query,)).fetchone()[0]
+
+    def search(self, where, params, order=None):
+        """Iterates over the issue columns of stored issues, which match SQL condition.
+
+        The rows are read from database as they are consumed, the store is locked
+        until the iteration is finished.
+        """
+        sql = "SELECT {0} FROM issues WHERE {1}".format(", ".join(ISSUE_COLUMNS), where)
+        if order:
+            sql += " ORDER BY " + order
+        with self.lock:
+            cursor = self.connection.execute(sql, params)
+            for row in cursor:
+                yield row
@@ -0,0 +1,202 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import collections
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests import adapters
+
+
+LOG = logging.getLogger(__name__)
+
+# the requests, which can be repeated safely
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# the responses, which mean that server is overloaded
+THROTTLE_STATUSES = (429, 503)
+
+# the responses of gateway, which are retried as the throttled ones if request is idempotent
+GATEWAY_STATUSES = (502, 504)
+
+# the latency, which is this times bigger than the best one, means that server is overloaded,
+# unless the difference is small, e.g. for fast local network
+LATENCY_FACTOR = 4.0
+LATENCY_MIN_GROWTH = 0.25
+
+# the period, which is used to measure the actual rate of requests
+RATE_PERIOD = 5.0
+
+
+def parse_retry_after(value, now=None):
+    """Converts Retry-After header, seconds or HTTP date, to delay in seconds, None if it is invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(parsed) - (now or time.time()))
+
+
+class RateLimiter(object):
+    """Limits the rate and the concurrency of requests, which are executed by all threads of process.
+
+    The limits are adjusted by AIMD: they grow additively while requests succeed
+    and are decreased multiplicatively when server responds 429 or 503 or the latency
+    grows much above the best observed one. The Retry-After pauses all requests.
+    """
+
+    def __init__(self, concurrency, rate=None, min_rate=0.5, clock=time.time):
+        self.condition = threading.Condition()
+        self.clock = clock
+        self.max_concurrency = concurrency
+        self.window = float(concurrency)
+        self.in_flight = 0
+        # the rate is not limited until server throttles requests
+        self.rate = rate
+        self.min_rate = min_rate
+        self.tokens = 1.0
+        self.filled = clock()
+        self.paused_until = 0
+        self.latency = None
+        self.decreased = 0
+        self.started = collections.deque()
+
+    def get_delay(self, now):
+        """Gets the time to wait before the next request can be started."""
+        delay = self.paused_until - now
+        if self.rate is not None:
+            self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.filled) * self.rate)
+            self.filled = now
+            if self.tokens < 1:
+                delay = max(delay, (1 - self.tokens) / self.rate)
+        return max(0.0, delay)
+
+    def acquire(self):
+        """Waits until the request can be started."""
+        with self.condition:
+            while True:
+                now = self.clock()
+                delay = self.get_delay(now)
+                if delay <= 0 and self.in_flight < int(self.window):
+                    break
+                self.condition.wait(delay if delay > 0 else None)
+            self.in_flight += 1
+            if self.rate is not None:
+                self.tokens -= 1
+            self.started.append(now)
+            while self.started[0] < now - RATE_PERIOD:
+                self.started.popleft()
+
+    def release(self, latency=None, throttled=False, retry_after=None):
+        """Marks the request completed and adjusts the limits by its result."""
+        with self.condition:
+            self.in_flight -= 1
+            now = self.clock()
+            if throttled:
+                self.decrease(now, 0.5)
+                if retry_after is not None:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            elif latency is not None:
+                slow = self.latency is not None and latency > max(
+                    self.latency * LATENCY_FACTOR, self.latency + LATENCY_MIN_GROWTH
+                )
+                if slow:
+                    # the slow responses limit the concurrency only, the rate is limited by throttling
+                    self.decrease(now, 0.8, limit_rate=False)
+                else:
+                    self.increase()
+                # the baseline follows the best latency quickly and the worse one slowly
+                self.latency = latency if self.latency is None else min(latency, self.latency * 0.95 + latency * 0.05)
+            self.condition.notify_all()
+
+    def pause(self, delay):
+        """Delays all requests."""
+        with self.condition:
+            self.paused_until = max(self.paused_until, self.clock() + delay)
+
+    def increase(self):
+        self.window = min(self.max_concurrency, self.window + 1.0 / self.window)
+        if self.rate is not None:
+            # about one request per second more after each second of successful requests
+            self.rate += 1.0 / self.rate
+
+    def decrease(self, now, factor, limit_rate=True):
+        # the requests in flight were sent with the old limits, so decrease once per period
+        if now - self.decreased < 1.0:
+            return
+        self.decreased = now
+        self.window = max(1.0, self.window * factor)
+        if not limit_rate:
+            LOG.debug(u"Server is slow, limit requests to %d in flight", int(self.window))
+            return
+        if self.rate is None:
+            period = max(1.0, now - self.started[0]) if self.started else RATE_PERIOD
+            self.rate = len(self.started) / period
+        self.rate = max(self.min_rate, self.rate * factor)
+        LOG.info(u"Server is overloaded, limit requests to %.1f/s and %d in flight", self.rate, int(self.window))
+
+
+class RateLimitedAdapter(adapters.HTTPAdapter):
+    """Transport adapter, which executes requests within limits and retries the failed idempotent ones.
+
+    It is the only retry policy of client, so the requests, which may change data, are sent once.
+    """
+
+    def __init__(self, limiter, retries=3, **kwargs):
+        self.limiter = limiter
+        self.retries = retries
+        super(RateLimitedAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        idempotent = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            started = time.time()
+            try:
+                response = super(RateLimitedAdapter, self).send(request, **kwargs)
+            except Exception as e:
+                self.limiter.release()
+                if not isinstance(e, requests.ConnectionError) or not idempotent or attempt >= self.retries:
+                    raise
+                attempt += 1
+                LOG.info(u"%s %s: %s, retry %d of %d", request.method, request.url, e, attempt, self.retries)
+                time.sleep(min(60, 2 ** attempt) * random.random())
+                continue
+
+            throttled = response.status_code in THROTTLE_STATUSES
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) if throttled else None
+            self.limiter.release(time.time() - started, throttled, retry_after)
+            retryable = throttled or response.status_code in GATEWAY_STATUSES
+            if not retryable or not idempotent or attempt >= self.retries:
+                return response
+
+            attempt += 1
+            if not throttled:
+                time.sleep(min(60, 2 ** attempt) * random.random())
+            elif retry_after is None:
+                self.limiter.pause(min(60, 2 ** attempt) * random.random())
+            LOG.info(u"%s %s: %s, retry %d of %d", request.method, request.url, response.status_code,
+                     attempt, self.retries)
+            response.close()
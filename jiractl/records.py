@@ -0,0 +1,48 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+class Record(object):
+    """Read-only view of parsed JSON object, which provides access to keys as attributes.
+
+    The record is a light replacement of jira resources for the code, that only reads
+    attributes, e.g. issue.fields.status.name. Unlike resources, the nested objects are
+    not converted in advance, the views of them are made on access and are not kept,
+    so the record costs one reference besides the parsed JSON.
+    """
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def __getattr__(self, name):
+        try:
+            value = self.raw[name]
+        except KeyError:
+            raise AttributeError(name)
+        return wrap(value)
+
+    def __repr__(self):
+        return "<Record {0!r}>".format(self.raw)
+
+
+def wrap(value):
+    """Makes records of JSON objects, other values are returned as is."""
+    if isinstance(value, dict):
+        return Record(value)
+    if isinstance(value, list):
+        return [wrap(x) for x in value]
+    return value
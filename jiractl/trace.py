@@ -0,0 +1,211 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import collections
+import contextlib
+import json
+import math
+import re
+import threading
+import time
+import urlparse
+
+
+# the path segments, which identify objects, are replaced to group requests by endpoint
+SEGMENTS = (
+    (re.compile(r"^[A-Za-z][A-Za-z0-9_]*-\d+$"), "{key}"),
+    (re.compile(r"^\d+$"), "{id}"),
+)
+
+# the methods of commands, which convert objects to rows
+FORMAT_METHODS = ("format_issue", "format_comment", "format_issue_link", "format_remote_link")
+
+PERCENTILES = (50, 90, 99)
+
+# the columns of report of requests
+COLUMNS = ("method", "endpoint", "count", "errors", "bytes") + tuple("p{0}".format(x) for x in PERCENTILES) + ("max",)
+
+
+def get_endpoint(url):
+    """Converts URL to endpoint template, e.g. /rest/api/2/issue/P1-1 to issue/{key}."""
+    path = urlparse.urlparse(url).path
+    path = re.sub(r"^.*/rest/api/\d+/", "", path).strip("/")
+    segments = []
+    for segment in path.split("/"):
+        for pattern, template in SEGMENTS:
+            if pattern.match(segment):
+                segment = template
+                break
+        segments.append(segment)
+    return "/".join(segments)
+
+
+def percentile(values, percent):
+    """Gets percentile of sorted values by nearest rank."""
+    index = max(0, int(math.ceil(percent / 100.0 * len(values))) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+class Tracer(object):
+    """Records HTTP requests and time of command phases.
+
+    The phases are nested, the time of nested phase is not counted in outer one,
+    the time of phases of concurrent threads is summed. The requests are recorded
+    by instrumentation of requests library, which is installed only while tracing.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.requests = []
+        self.phases = collections.defaultdict(float)
+        self.started = clock()
+        self.finished = None
+        self.patches = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Measures the time of phase, excluding the time of nested phases."""
+        stack = self.local.__dict__.setdefault("stack", [])
+        started = self.clock()
+        stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - started
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self.lock:
+                self.phases[name] += elapsed - nested
+
+    def wrap(self, func, name):
+        """Makes function, that executes func in phase."""
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def patch(self, owner, attr, name):
+        """Executes method of owner in phase until the tracing is finished."""
+        original = owner.__dict__.get(attr)
+        self.patches.append((owner, attr, original))
+        setattr(owner, attr, self.wrap(getattr(owner, attr), name))
+
+    def record(self, method, url, status, size, latency):
+        with self.lock:
+            self.requests.append((method, get_endpoint(url), status, size, latency))
+
+    def send(self, send, session, request, **kwargs):
+        started = self.clock()
+        status = None
+        size = 0
+        try:
+            with self.phase("http"):
+                response = send(session, request, **kwargs)
+            status = response.status_code
+            size = int(response.headers.get("Content-Length") or len(response.content))
+            return response
+        finally:
+            self.record(request.method, request.url, status, size, self.clock() - started)
+
+    def start(self):
+        """Installs instrumentation of HTTP requests and JSON decoding."""
+        from jira import client
+        from jira import resources
+        from requests import models
+        from requests import sessions
+
+        from jiractl import client as jiractl_client
+
+        send = sessions.Session.send
+        self.patches.append((sessions.Session, "send", sessions.Session.__dict__["send"]))
+        sessions.Session.send = lambda session, request, **kwargs: self.send(send, session, request, **kwargs)
+        self.patch(models.Response, "json", "decode")
+        # the jira decodes responses by helper, which is imported to its modules
+        for module in (client, resources):
+            if "json_loads" in module.__dict__:
+                self.patch(module, "json_loads", "decode")
+        self.patch(jiractl_client.JiraClient, "decode_json", "decode")
+        return self
+
+    def instrument_command(self, cmd):
+        """Measures the phases of command."""
+        cmd.take_action = self.wrap(cmd.take_action, "command")
+        if hasattr(cmd, "produce_output"):
+            cmd.produce_output = self.wrap(cmd.produce_output, "render")
+        for name in FORMAT_METHODS:
+            if hasattr(cmd, name):
+                setattr(cmd, name, self.wrap(getattr(cmd, name), "format"))
+
+    def finish(self):
+        """Removes instrumentation."""
+        self.finished = self.clock()
+        while self.patches:
+            owner, attr, original = self.patches.pop()
+            if original is None:
+                delattr(owner, attr)
+            else:
+                setattr(owner, attr, original)
+
+    def get_summary(self):
+        """Gets statistics of requests per endpoint and time of phases."""
+        endpoints = collections.defaultdict(list)
+        with self.lock:
+            for method, endpoint, status, size, latency in self.requests:
+                endpoints[(method, endpoint)].append((status, size, latency))
+            phases = dict(self.phases)
+
+        total = (self.finished or self.clock()) - self.started
+        summary = {"total": total, "phases": phases, "endpoints": []}
+        for (method, endpoint), requests in sorted(endpoints.items()):
+            latencies = sorted(x[2] for x in requests)
+            stats = {
+                "method": method,
+                "endpoint": endpoint,
+                "count": len(requests),
+                "errors": sum(1 for x in requests if x[0] is None or x[0] >= 400),
+                "bytes": sum(x[1] for x in requests),
+                "max": latencies[-1],
+            }
+            for percent in PERCENTILES:
+                stats["p{0}".format(percent)] = percentile(latencies, percent)
+            summary["endpoints"].append(stats)
+        return summary
+
+    def report(self, stream, output_format="table"):
+        """Writes summary to stream as table or JSON."""
+        summary = self.get_summary()
+        if output_format == "json":
+            stream.write(json.dumps(summary, sort_keys=True) + "\n")
+            return
+
+        rows = [COLUMNS]
+        for stats in summary["endpoints"]:
+            rows.append([
+                "{0:.3f}".format(stats[x]) if isinstance(stats[x], float) else str(stats[x]) for x in COLUMNS
+            ])
+        widths = [max(len(x[i]) for x in rows) for i in range(len(COLUMNS))]
+        for row in rows:
+            stream.write("  ".join(x.ljust(w) for x, w in zip(row, widths)).rstrip() + "\n")
+
+        stream.write("\n")
+        phases = summary["phases"]
+        # the time, that is not covered by phases, e.g. parsing of arguments
+        other = summary["total"] - sum(phases.values())
+        for name, elapsed in sorted(phases.items(), key=lambda x: -x[1]) + [("other", max(0.0, other))]:
+            stream.write("{0:<10}{1:.3f}\n".format(name, elapsed))
+        stream.write("{0:<10}{1:.3f}\n".format("total", summary["total"]))
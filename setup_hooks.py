@@ -3,3 +3,11 @@ def setup_hook(config):
 
     # this monkey patch is to avoid appending git version to version
     pbr.packaging._get_version_from_git = lambda pre_version: pre_version
+
+    # the index of commands is loaded instead of scanning of entry points on every start
+    from jiractl import index
+    index.write_index(
+        index.get_index_path(),
+        config["metadata"]["version"],
+        index.parse_entry_points(config["entry_points"]["jiractl"])
+    )
@@ -14,17 +14,44 @@ SOFTWARE.
 """
 
 import mock
+import os
+import shutil
+import tempfile
 import unittest
 
 from jiractl import app
 
 
+# the server metadata, keyed by REST resource
+METADATA = {
+    "field": [
+        {"id": "summary", "name": "Summary"},
+        {"id": "customfield_10010", "name": "Story Points"},
+        {"id": "customfield_10020", "name": "Team"},
+    ],
+    "issuetype": [{"id": "1", "name": "T1"}, {"id": "2", "name": "Bug"}],
+    "issueLinkType": {"issueLinkTypes": [
+        {"id": "10", "name": "DEPENDS", "inward": "is depended on by", "outward": "depends on"},
+    ]},
+    "priority": [{"id": "1", "name": "High"}],
+    "status": [{"id": "3", "name": "Open"}],
+}
+
+
 class BaseUnitTest(unittest.TestCase):
 
     def setUp(self):
+        # the local caches are stored in temporary directory
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        m = mock.patch('jiractl.cache.get_cache_path', return_value=os.path.join(self.tmpdir, "cache.db"))
+        m.start()
+        self.addCleanup(m.stop)
         m = mock.patch('jiractl.app.JiraApp.jira')
         self.jira = m.start()
         self.addCleanup(self.jira.stop)
+        self.jira._options = {"server": "http://jira"}
+        self.jira._get_json.side_effect = lambda path, **kwargs: METADATA[path]
         m = mock.patch('sys.stderr')
         self.stderr = m.start()
         self.addCleanup(self.stderr.stop)
@@ -32,13 +59,17 @@ class BaseUnitTest(unittest.TestCase):
         self.stdout = m.start()
         self.addCleanup(self.stdout.stop)
 
-    @staticmethod
-    def check_output(command, argv, expected_data, columns=None):
+    def check_output(self, command, argv, expected_data, columns=None):
         with mock.patch.object(command, 'produce_output') as output_mock:
             app.debug("command", command, argv)
 
         # parsed_args, columns, data
-        output_mock.assert_called_once_with(mock.ANY, columns or command.columns, expected_data)
+        output_mock.assert_called_once_with(mock.ANY, columns or command.columns, mock.ANY)
+        data = output_mock.call_args[0][2]
+        if not isinstance(data, (list, tuple)):
+            # list commands may produce rows lazily
+            data = list(data)
+        self.assertEqual(expected_data, data)
 
     def check_output_one(self, command, argv):
         expected_data = (mock.ANY,) * len(command.columns)
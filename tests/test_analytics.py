@@ -0,0 +1,128 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import calendar
+import random
+import unittest
+
+import mock
+
+from jiractl import analytics
+
+
+DAY = analytics.DAY
+
+# Monday
+T0 = calendar.timegm((2020, 1, 6, 0, 0, 0))
+
+
+def make_timeline():
+    timeline = analytics.Timeline(["In Progress"], ["Closed"], now=T0 + 20 * DAY)
+    # completed in 5 days, started once
+    timeline.add_issue(T0, [
+        (T0 + DAY, "Open", "In Progress"), (T0 + 2 * DAY, "In Progress", "Open"),
+        (T0 + 3 * DAY, "Open", "In Progress"), (T0 + 5 * DAY, "In Progress", "Closed"),
+    ])
+    # completed in the third week without start
+    timeline.add_issue(T0 + 10 * DAY, [(T0 + 15 * DAY, "Open", "Closed")])
+    # in progress until now
+    timeline.add_issue(T0 + 16 * DAY, [(T0 + 18 * DAY, "Open", "In Progress")])
+    # without transitions
+    timeline.add_issue(T0 + 19 * DAY, [], "Open")
+    return timeline
+
+
+def make_random_timeline(count, seed):
+    rnd = random.Random(seed)
+    statuses = ["Open", "In Progress", "Review", "Closed"]
+    timeline = analytics.Timeline(["In Progress"], ["Closed"], now=T0 + 400 * DAY)
+    for _ in range(count):
+        created = T0 + rnd.uniform(0, 300 * DAY)
+        moment, status, transitions = created, "Open", []
+        for _ in range(rnd.randint(0, 8)):
+            moment += rnd.uniform(0, 10 * DAY)
+            to_status = rnd.choice([x for x in statuses if x != status])
+            transitions.append((moment, status, to_status))
+            status = to_status
+        timeline.add_issue(created, transitions, "Open")
+    return timeline
+
+
+class TestAnalytics(unittest.TestCase):
+
+    def check_timeline(self):
+        timeline = make_timeline()
+        self.assertEqual(4, len(timeline))
+        self.assertEqual([5 * DAY, 5 * DAY], sorted(timeline.get_lead_times()))
+        self.assertEqual([4 * DAY], list(timeline.get_cycle_times()))
+        in_status = timeline.get_time_in_status()
+        # the time in done status is not counted
+        self.assertEqual(["In Progress", "Open"], sorted(in_status))
+        self.assertEqual([2 * DAY, 3 * DAY], sorted(in_status["In Progress"]))
+        self.assertEqual([DAY, 2 * DAY, 2 * DAY, 5 * DAY], sorted(in_status["Open"]))
+        self.assertEqual([(T0, 1), (T0 + 7 * DAY, 0), (T0 + 14 * DAY, 1)], timeline.get_throughput())
+
+    def test_timeline(self):
+        with mock.patch.object(analytics, "numpy", None):
+            self.check_timeline()
+
+    @unittest.skipIf(analytics.numpy is None, "numpy is not installed")
+    def test_timeline_numpy(self):
+        self.check_timeline()
+
+    def test_summarize(self):
+        with mock.patch.object(analytics, "numpy", None):
+            self.assertEqual((4, 2.5, [2, 4, 1], 4), analytics.summarize([4, 1, 3, 2], [50, 100, 0]))
+            self.assertEqual((0, None, [None], None), analytics.summarize([], [50]))
+
+    @unittest.skipIf(analytics.numpy is None, "numpy is not installed")
+    def test_summarize_numpy(self):
+        self.assertEqual((4, 2.5, [2, 4, 1], 4), analytics.summarize([4, 1, 3, 2], [50, 100, 0]))
+        self.assertEqual((0, None, [None], None), analytics.summarize([], [50]))
+
+    @unittest.skipIf(analytics.numpy is None, "numpy is not installed")
+    def test_numpy_and_pure_are_identical(self):
+        timeline = make_random_timeline(500, 42)
+        percentiles = [50, 85, 95]
+
+        def get_metrics():
+            in_status = timeline.get_time_in_status()
+            return {
+                "lead": analytics.summarize(timeline.get_lead_times(), percentiles),
+                "cycle": analytics.summarize(timeline.get_cycle_times(), percentiles),
+                "status": dict((k, analytics.summarize(v, percentiles)) for k, v in in_status.items()),
+                "throughput": timeline.get_throughput(),
+            }
+
+        expected = get_metrics()
+        with mock.patch.object(analytics, "numpy", None):
+            actual = get_metrics()
+        # the sums may differ in the last digits due to order of additions
+        for name in ("lead", "cycle"):
+            self.assertEqual(expected[name][0], actual[name][0])
+            self.assertAlmostEqual(expected[name][1], actual[name][1], places=3)
+            self.assertEqual(expected[name][2:], actual[name][2:])
+        self.assertEqual(sorted(expected["status"]), sorted(actual["status"]))
+        for status, metrics in expected["status"].items():
+            self.assertEqual(metrics[0], actual["status"][status][0])
+            self.assertAlmostEqual(metrics[1], actual["status"][status][1], places=3)
+            for x, y in zip(metrics[2] + [metrics[3]], actual["status"][status][2] + [actual["status"][status][3]]):
+                self.assertAlmostEqual(x, y, places=3)
+        self.assertEqual(expected["throughput"], actual["throughput"])
+
+    def test_get_week(self):
+        self.assertEqual(T0, analytics.get_week(T0))
+        self.assertEqual(T0, analytics.get_week(T0 + 7 * DAY - 1))
+        self.assertEqual(T0 + 7 * DAY, analytics.get_week(T0 + 7 * DAY))
@@ -0,0 +1,125 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import threading
+import time
+import unittest
+
+import mock
+
+from jiractl import backend
+
+
+def make_fetch(total, page_limit=None, report_total=True):
+    def fetch(start_at, max_results):
+        count = min(max_results, page_limit or max_results)
+        return list(range(start_at, min(start_at + count, total))), total if report_total else None
+    return fetch
+
+
+class TestBackend(unittest.TestCase):
+    backend_class = backend.Backend
+
+    def setUp(self):
+        self.backend = self.backend_class(mock.MagicMock(), 4)
+
+    def test_fetch_all_pages(self):
+        self.assertEqual(list(range(7)), list(self.backend.fetch_pages(make_fetch(7), 2)))
+
+    def test_server_limits_page_size(self):
+        self.assertEqual(list(range(7)), list(self.backend.fetch_pages(make_fetch(7, page_limit=3), 5)))
+
+    def test_lazy_server_limits_page_size(self):
+        fetch = mock.Mock(side_effect=make_fetch(7, page_limit=3))
+        self.assertEqual(list(range(7)), list(self.backend.fetch_pages(fetch, 5, lazy=True)))
+        self.assertEqual([mock.call(0, 5), mock.call(3, 5), mock.call(6, 5)], fetch.call_args_list)
+
+    def test_total_is_unknown(self):
+        self.assertEqual(list(range(7)), list(self.backend.fetch_pages(make_fetch(7, report_total=False), 2)))
+        self.assertEqual(list(range(4)), list(self.backend.fetch_pages(make_fetch(4, report_total=False), 2)))
+
+    def test_no_items(self):
+        self.assertEqual([], list(self.backend.fetch_pages(make_fetch(0), 2)))
+
+    def test_search_issues_raw(self):
+        self.backend.raw = True
+        self.backend.jira.search_issues.side_effect = [
+            {"issues": [{"id": "1", "fields": {"status": {"name": "Open"}}}, {"id": "2", "fields": {}}], "total": 3},
+            {"issues": [{"id": "3", "fields": {}}], "total": 3},
+        ]
+        issues = list(self.backend.search_issues("project=P1", 2, fields="status", lazy=True))
+        self.assertEqual(["1", "2", "3"], [x.id for x in issues])
+        self.assertEqual("Open", issues[0].fields.status.name)
+        self.backend.jira.search_issues.assert_called_with(
+            "project=P1", startAt=2, maxResults=2, fields="status", json_result=True
+        )
+
+    def test_comments_raw(self):
+        self.backend.raw = True
+        self.backend.jira._get_json.return_value = {"comments": [{"id": "1", "body": "B1"}], "total": 1}
+        comments = list(self.backend.comments("P1-1", 10))
+        self.assertEqual(["B1"], [x.body for x in comments])
+        self.backend.jira._get_json.assert_called_once_with(
+            "issue/P1-1/comment", params={"startAt": 0, "maxResults": 10}
+        )
+
+    def test_remote_links_raw(self):
+        self.backend.raw = True
+        self.backend.jira._get_json.return_value = [{"id": 1, "object": {"url": "http://x"}}]
+        links = self.backend.remote_links("P1-1")
+        self.assertEqual(["http://x"], [x.object.url for x in links])
+        self.assertEqual(0, self.backend.jira.remote_links.call_count)
+
+
+class TestThreadedBackend(TestBackend):
+    backend_class = backend.ThreadedBackend
+
+    def test_limit_requests_in_flight(self):
+        lock = threading.Lock()
+        state = {"active": 0, "max": 0}
+
+        def request(x):
+            with lock:
+                state["active"] += 1
+                state["max"] = max(state["max"], state["active"])
+            time.sleep(0.01)
+            with lock:
+                state["active"] -= 1
+            return x
+
+        results = [self.backend.map(request, range(10), workers=3) for _ in range(3)]
+        threads = [threading.Thread(target=list, args=(x,)) for x in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(state["max"], 4)
+
+    def test_nested_calls(self):
+        result = self.backend.map(lambda x: self.backend.call(lambda: x * 2), range(10), workers=4)
+        self.assertEqual([x * 2 for x in range(10)], list(result))
+
+    def test_resize_pool(self):
+        session = mock.Mock()
+        session.get_adapter.return_value = mock.Mock(_pool_maxsize=10)
+        backend.ThreadedBackend(mock.Mock(_session=session), 8)
+        self.assertEqual(0, session.mount.call_count)
+        adapter = session.get_adapter.return_value
+        self.assertEqual(0, adapter.init_poolmanager.call_count)
+        backend.ThreadedBackend(mock.Mock(_session=session), 16)
+        # the adapter is kept, only its pool is replaced
+        self.assertEqual(0, session.mount.call_count)
+        adapter.init_poolmanager.assert_called_with(adapter._pool_connections, 16, adapter._pool_block)
+        self.assertEqual(2, adapter.init_poolmanager.call_count)
@@ -0,0 +1,125 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import tempfile
+
+from cliff.commandmanager import CommandManager
+import mock
+
+from jiractl import app
+from jiractl.commands import batch
+from jiractl.commands import issues
+from jiractl.commands import labels
+
+from tests import base
+
+
+class TestParseLine(base.BaseUnitTest):
+
+    def test_parse_shell_line(self):
+        self.assertEqual(
+            ["issue", "comments", "add", "--issue=I1", "--text", "some text"],
+            batch.parse_line(u'issue comments add --issue=I1 --text "some text"\n')
+        )
+
+    def test_parse_json_line(self):
+        self.assertEqual(["issue", "--id=I1"], batch.parse_line(u'["issue", "--id=I1"]'))
+        self.assertEqual(["issue", "--id=I1"], batch.parse_line(u'{"argv": ["issue", "--id=I1"]}'))
+
+    def test_skip_empty_lines_and_comments(self):
+        self.assertIsNone(batch.parse_line(u'  \n'))
+        self.assertIsNone(batch.parse_line(u'# comment\n'))
+
+
+class TestBatch(base.BaseUnitTest):
+
+    def run_batch(self, lines, *args):
+        cmd_mgr = CommandManager("jiractl.tests", convert_underscores=True)
+        cmd_mgr.add_command("batch", batch.Batch)
+        cmd_mgr.add_command("issue", issues.ShowIssue)
+        cmd_mgr.add_command("issue labels", labels.ListLabels)
+        cmd_mgr.add_command("issue labels add", labels.AddLabel)
+
+        with tempfile.NamedTemporaryFile() as stream:
+            stream.write("\n".join(lines))
+            stream.flush()
+            with mock.patch.object(batch.Batch, 'produce_output') as output_mock:
+                app.create_app(cmd_mgr).run(["batch", "--file", stream.name, "--debug"] + list(args))
+
+        output_mock.assert_called_once_with(mock.ANY, batch.Batch.columns, mock.ANY)
+        return sorted(output_mock.call_args[0][2])
+
+    def test_execute_commands(self):
+        self.jira.issue.return_value = mock.Mock(fields=mock.Mock(labels=["label1"]), key="I1")
+        result = self.run_batch([
+            "issue --id=I1 -c key",
+            "# comment",
+            "issue labels --issue=I1",
+            '["issue", "labels", "add", "--issue=I1", "--labels=label1"]',
+        ])
+        self.assertEqual(3, len(result))
+        self.assertEqual((1, "issue", "ok"), result[0][:3])
+        self.assertEqual("I1", json.loads(result[0][3])["key"])
+        self.assertEqual((3, "issue labels", "ok", json.dumps([{"label": "label1"}])), result[1])
+        self.assertEqual((4, "issue labels add", "ok", json.dumps("Done.")), result[2])
+
+    def test_report_failures(self):
+        self.jira.issue.side_effect = ValueError("not found")
+        result = self.run_batch([
+            "issue --id=I1",
+            "issue labels",
+            "unknown command",
+        ])
+        self.assertEqual(
+            [
+                (1, "issue", "error", "ValueError: not found"),
+                (2, "issue labels", "error", mock.ANY),
+                (3, "unknown command", "error", mock.ANY),
+            ],
+            result
+        )
+
+    def test_keep_order_of_commands_for_same_issue(self):
+        lines = ["issue labels add --issue=I1 --labels=label{0}".format(i) for i in range(10)]
+        result = self.run_batch(lines, "--workers=3")
+        self.assertEqual(["ok"] * 10, [x[2] for x in result])
+        self.assertEqual(
+            [[{"add": "label{0}".format(i)}] for i in range(10)],
+            [json.loads(x[1]["data"])["update"]["labels"] for x in self.jira._session.put.call_args_list]
+        )
+
+    def test_keep_order_of_commands_for_several_issues(self):
+        self.jira._get_url.side_effect = lambda path: path
+        lines = [
+            "issue labels add --issue I1 I{0} --labels=label{1}".format(i + 2, i) if i % 2 else
+            "issue labels add --issue=I1 --labels=label{0}".format(i)
+            for i in range(10)
+        ]
+        result = self.run_batch(lines, "--workers=3")
+        self.assertEqual(["ok"] * 10, [x[2] for x in result])
+        self.assertEqual(
+            [[{"add": "label{0}".format(i)}] for i in range(10)],
+            [
+                json.loads(x[1]["data"])["update"]["labels"] for x in self.jira._session.put.call_args_list
+                if x[0][0] == "issue/I1"
+            ]
+        )
+
+    def test_get_issues(self):
+        self.assertEqual(["I1"], batch.Batch.get_issues(mock.Mock(issue=None, id="I1", query=None)))
+        self.assertEqual(["I1", "I2"], batch.Batch.get_issues(mock.Mock(issue=["I1", "I2"], query=None)))
+        self.assertEqual([], batch.Batch.get_issues(mock.Mock(issue=None, id=None, query=None)))
+        self.assertIsNone(batch.Batch.get_issues(mock.Mock(issue=None, id=None, query="project = P1")))
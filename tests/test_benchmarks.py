@@ -0,0 +1,110 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import io
+import json
+import os
+import unittest
+
+import jira
+import mock
+
+from benchmarks import fakejira
+from benchmarks import run
+
+
+class TestFakeJira(unittest.TestCase):
+
+    def setUp(self):
+        self.server = fakejira.FakeJira(fakejira.Dataset(issues=30, small_issues=5, comments=7, links=2)).start()
+        self.addCleanup(self.server.stop)
+        self.jira = jira.JIRA(self.server.url)
+
+    def test_search(self):
+        issues = self.jira.search_issues("project = P1 AND assignee = user1", maxResults=2, fields="summary,status")
+        self.assertEqual(3, issues.total)
+        self.assertEqual(["P1-1", "P1-11"], [x.key for x in issues])
+        self.assertEqual({"summary", "status"}, set(issues[0].raw["fields"]))
+
+    def test_update_and_comments(self):
+        self.jira.add_comment("P2-1", "new")
+        comments = self.jira._get_json("issue/P2-1/comment", params={"orderBy": "-created", "maxResults": 2})
+        self.assertEqual(8, comments["total"])
+        self.assertEqual("new", comments["comments"][0]["body"])
+        data = {"update": {"labels": [{"add": "L1"}, {"remove": "l1"}]}}
+        self.jira._session.put(self.jira._get_url("issue/P2-1"), data=json.dumps(data))
+        self.assertEqual(["L1"], self.jira.issue("P2-1").fields.labels)
+
+    def test_changelog(self):
+        issues = self.jira.search_issues("project = P1", maxResults=2, expand="changelog", json_result=True)["issues"]
+        changelog = issues[1]["changelog"]
+        self.assertEqual(len(changelog["histories"]), changelog["total"])
+        self.assertEqual("Open", changelog["histories"][0]["items"][0]["fromString"])
+        # the long changelog is truncated by search
+        data = fakejira.Dataset(issues=100)
+        issue = data.search("project = P1", 96, 1, None, "changelog")["issues"][0]
+        self.assertEqual(100, len(issue["changelog"]["histories"]))
+        self.assertEqual(122, len(data.get_issue("P1-97", expand="changelog")["changelog"]["histories"]))
+
+    def test_stats(self):
+        before = self.server.stats.snapshot()
+        self.jira.issue("P1-1")
+        after = self.server.stats.snapshot()
+        self.assertEqual(1, after["requests"] - before["requests"])
+        self.assertGreater(after["bytes"], before["bytes"])
+
+
+class TestRun(unittest.TestCase):
+
+    def test_every_entry_point_has_scenario(self):
+        self.assertLessEqual(set(run.get_entry_points()), set(x[0] for x in run.SCENARIOS))
+
+    def test_compare(self):
+        metrics = {"wall": 1.0, "requests": 10, "bytes": 100, "rss": 1000}
+        baseline = {"dataset": {}, "scenarios": {"issue": metrics}}
+        results = {"dataset": {}, "scenarios": {"issue": dict(metrics, requests=11, wall=1.1)}}
+        stream = io.BytesIO()
+        self.assertEqual([("issue", "requests", 10, 11)], run.compare(baseline, results, stream))
+        self.assertIn("wall +10%", stream.getvalue())
+
+    def test_failed_command_output(self):
+        env = dict(os.environ, PYTHONPATH=run.ROOT)
+        stderr = io.BytesIO()
+        with mock.patch("sys.stderr", stderr):
+            code = run.run_command(["--debug", "no-such-command"], env)[0]
+        self.assertEqual(2, code)
+        self.assertIn("no-such-command", stderr.getvalue())
+
+    def test_failed_scenarios_are_not_results(self):
+        args = argparse.Namespace(
+            issues=1, small_issues=1, comments=1, links=1, text_size=10, latency=0, bulk_issues=1, batch_commands=1,
+            repeat=2, scenario=["issue", "issues"], output=None, compare=None
+        )
+        # the metadata is refreshed, then the first scenario fails once
+        codes = iter([0, 0, 2, 0, 0])
+        stderr = io.BytesIO()
+        with mock.patch.object(run, "run_command", side_effect=lambda *_: (next(codes), 0.1, 1000)), \
+                mock.patch("sys.stderr", stderr):
+            with self.assertRaises(RuntimeError) as ctx:
+                run.run(args)
+        self.assertEqual("The scenarios failed: issue", str(ctx.exception))
+        self.assertIn("issue: FAILED", stderr.getvalue())
+        self.assertIn("issues: {", stderr.getvalue())
+
+        with mock.patch.object(run, "run_command", return_value=(2, 0.1, 1000)), mock.patch("sys.stderr", stderr):
+            with self.assertRaises(RuntimeError):
+                run.run(args)
+            self.assertEqual(1, run.main(["--issues", "1", "--small-issues", "1", "--scenario", "issue"]))
@@ -0,0 +1,253 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import mock
+
+from jiractl import app
+from jiractl import cache
+from jiractl.commands import issues
+
+from tests import base
+
+
+def make_issue(key, updated="2017-01-01T00:00:00.000+0000", **fields):
+    fields["updated"] = updated
+    return mock.Mock(raw={"id": "1", "key": key, "fields": fields}, fields=mock.Mock(updated=updated))
+
+
+class TestConnect(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def test_create_schema_once(self):
+        path = os.path.join(self.tmpdir, "cache.db")
+        with mock.patch("sqlite3.connect") as connect_mock:
+            cache.connect(path, cache.SCHEMA)
+            open(path, "w").close()
+            cache.connect(path, cache.SCHEMA)
+            cache.connect(path, cache.METADATA_SCHEMA)
+            self.assertEqual(2, connect_mock.return_value.executescript.call_count)
+            # the database has been removed
+            os.remove(path)
+            cache.connect(path, cache.SCHEMA)
+            self.assertEqual(3, connect_mock.return_value.executescript.call_count)
+
+
+class TestIssueCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.cache = cache.IssueCache(os.path.join(self.tmpdir, "cache.db"))
+        self.addCleanup(self.cache.close)
+        self.jira = mock.Mock(_options={"server": "http://jira"})
+
+    def test_fetch_missing_issue(self):
+        self.jira.issue.return_value = make_issue("P-1", summary="S1")
+        issue = self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=60)
+        self.assertIs(self.jira.issue.return_value, issue)
+        self.jira.issue.assert_called_once_with("P-1", fields="summary,updated")
+
+    def test_use_fresh_issue(self):
+        self.jira.issue.return_value = make_issue("P-1", summary="S1")
+        self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=60)
+        issue = self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=60)
+        self.assertEqual("S1", issue.fields.summary)
+        self.assertEqual(1, self.jira.issue.call_count)
+
+    def test_revalidate_not_changed_issue(self):
+        self.jira.issue.return_value = make_issue("P-1", summary="S1")
+        self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=60)
+        issue = self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=0)
+        self.assertEqual("S1", issue.fields.summary)
+        self.jira.issue.assert_called_with("P-1", fields="updated")
+        self.assertEqual(2, self.jira.issue.call_count)
+
+    def test_revalidate_changed_issue(self):
+        self.jira.issue.return_value = make_issue("P-1", summary="S1")
+        self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=60)
+        self.jira.issue.return_value = make_issue("P-1", updated="2017-01-02T00:00:00.000+0000", summary="S2")
+        issue = self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=0)
+        self.assertIs(self.jira.issue.return_value, issue)
+        self.jira.issue.assert_called_with("P-1", fields="summary,updated")
+        self.assertEqual(3, self.jira.issue.call_count)
+
+    def test_fetch_missing_fields(self):
+        self.jira.issue.return_value = make_issue("P-1", summary="S1")
+        self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=60)
+        self.cache.get_issue(self.jira, "P-1", fields="labels", max_stale=60)
+        self.jira.issue.assert_called_with("P-1", fields="labels,summary,updated")
+
+    def test_invalidate(self):
+        self.jira.issue.return_value = make_issue("P-1", summary="S1")
+        self.cache.get_issue(self.jira, "1", fields="summary", max_stale=60)
+        self.cache.invalidate(self.jira, "P-1")
+        self.cache.get_issue(self.jira, "1", fields="summary", max_stale=60)
+        self.assertEqual(2, self.jira.issue.call_count)
+
+    def test_issues_of_servers_are_separated(self):
+        self.jira.issue.return_value = make_issue("P-1", summary="S1")
+        self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=60)
+        other = mock.Mock(_options={"server": "http://other"})
+        other.issue.return_value = make_issue("P-1", summary="S2")
+        self.assertIs(other.issue.return_value, self.cache.get_issue(other, "P-1", fields="summary", max_stale=60))
+        self.cache.invalidate(other, "P-1")
+        self.assertEqual("S1", self.cache.get_issue(self.jira, "P-1", fields="summary", max_stale=60).fields.summary)
+        self.assertEqual(1, self.jira.issue.call_count)
+
+    def test_evict_least_recently_used(self):
+        self.cache.max_size = 150
+        for key in ("P-1", "P-2", "P-3"):
+            self.jira.issue.return_value = make_issue(key)
+            self.cache.get_issue(self.jira, key, max_stale=60)
+        self.jira.issue.reset_mock()
+        self.cache.get_issue(self.jira, "P-3", max_stale=60)
+        self.assertEqual(0, self.jira.issue.call_count)
+        self.cache.get_issue(self.jira, "P-1", max_stale=60)
+        self.assertEqual(1, self.jira.issue.call_count)
+
+
+class TestTransitionCache(unittest.TestCase):
+
+    key = ("10", "1", "3")
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.cache = cache.TransitionCache(os.path.join(self.tmpdir, "cache.db"))
+        self.addCleanup(self.cache.close)
+        self.jira = mock.Mock(_options={"server": "http://jira"})
+        self.jira.transitions.return_value = [
+            {"id": "11", "name": "Start", "to": {"name": "In Progress"}},
+            {"id": "21", "name": "Close", "to": {"name": "Closed"}},
+        ]
+
+    def test_fetch_missing_transitions(self):
+        self.assertEqual("11", self.cache.get_transition_id(self.jira, "P-1", self.key, "start"))
+        self.jira.transitions.assert_called_once_with("P-1")
+
+    def test_use_cached_transitions(self):
+        self.cache.get_transition_id(self.jira, "P-1", self.key, "Start")
+        self.assertEqual("21", self.cache.get_transition_id(self.jira, "P-2", self.key, "Close"))
+        self.assertEqual(1, self.jira.transitions.call_count)
+
+    def test_find_by_target_status(self):
+        self.assertEqual("11", self.cache.get_transition_id(self.jira, "P-1", self.key, "In Progress"))
+
+    def test_refresh_on_miss(self):
+        self.cache.get_transition_id(self.jira, "P-1", self.key, "Start")
+        self.jira.transitions.return_value = [{"id": "31", "name": "Review", "to": {"name": "Review"}}]
+        self.assertEqual("31", self.cache.get_transition_id(self.jira, "P-1", self.key, "Review"))
+        self.assertEqual(2, self.jira.transitions.call_count)
+
+    def test_unavailable_transition(self):
+        self.assertRaises(ValueError, self.cache.get_transition_id, self.jira, "P-1", self.key, "Reopen")
+
+    def test_persist_transitions(self):
+        self.cache.get_transition_id(self.jira, "P-1", self.key, "Start")
+        other = cache.TransitionCache(os.path.join(self.tmpdir, "cache.db"))
+        self.addCleanup(other.close)
+        self.assertEqual(self.jira.transitions.return_value[0]["id"], other.get(self.jira, self.key)[0]["id"])
+        other.invalidate(self.jira, self.key)
+        self.assertIsNone(self.cache.get(self.jira, self.key))
+
+    def test_transitions_of_servers_are_separated(self):
+        self.cache.get_transition_id(self.jira, "P-1", self.key, "Start")
+        other = mock.Mock(_options={"server": "http://other"})
+        other.transitions.return_value = [{"id": "41", "name": "Start", "to": {"name": "In Progress"}}]
+        self.assertEqual("41", self.cache.get_transition_id(other, "P-1", self.key, "Start"))
+        self.assertEqual("11", self.cache.get_transition_id(self.jira, "P-1", self.key, "Start"))
+        self.assertEqual(1, self.jira.transitions.call_count)
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.cache = cache.MetadataCache(os.path.join(self.tmpdir, "cache.db"), ttl=60)
+        self.addCleanup(self.cache.close)
+        self.jira = mock.Mock(_options={"server": "http://jira"})
+        self.jira._get_json.side_effect = lambda path: base.METADATA[path]
+
+    def test_fetch_missing_metadata(self):
+        self.assertEqual(base.METADATA["field"], self.cache.get(self.jira, "fields"))
+        self.jira._get_json.assert_called_once_with("field")
+
+    def test_use_cached_metadata(self):
+        self.cache.get(self.jira, "linktypes")
+        other = cache.MetadataCache(os.path.join(self.tmpdir, "cache.db"), ttl=60)
+        self.addCleanup(other.close)
+        self.assertEqual(base.METADATA["issueLinkType"]["issueLinkTypes"], other.get(self.jira, "linktypes"))
+        self.assertEqual(1, self.jira._get_json.call_count)
+
+    def test_refresh_expired_metadata(self):
+        self.cache.get(self.jira, "priorities")
+        self.cache.ttl = 0
+        with mock.patch("time.time", return_value=time.time() + 1):
+            self.cache.get(self.jira, "priorities")
+        self.assertEqual(2, self.jira._get_json.call_count)
+
+    def test_metadata_of_servers_are_separated(self):
+        self.cache.get(self.jira, "statuses")
+        self.jira._options = {"server": "http://other"}
+        self.cache.get(self.jira, "statuses")
+        self.assertEqual(2, self.jira._get_json.call_count)
+
+
+class TestCachedCommands(base.BaseUnitTest):
+
+    def test_create_cache_once_in_threads(self):
+        jira_app = app.create_app(mock.Mock())
+        jira_app.options = jira_app.parser.parse_known_args([])[0]
+
+        def create(*args):
+            time.sleep(0.05)
+            return mock.Mock()
+
+        caches = []
+        with mock.patch("jiractl.cache.IssueCache", side_effect=create) as cache_mock:
+            threads = [threading.Thread(target=lambda: caches.append(jira_app.issue_cache)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(1, cache_mock.call_count)
+        self.assertEqual(1, len(set(map(id, caches))))
+
+    def test_use_cache_if_max_stale_specified(self):
+        argv = ['--id=1', '--max-stale=60']
+        with mock.patch('jiractl.cache.IssueCache') as cache_mock:
+            self.check_output(issues.ShowIssue, argv, mock.ANY)
+        cache_mock.return_value.get_issue.assert_called_once_with(
+            self.jira, "1", fields="project,summary,issuetype,assignee,status", max_stale=60
+        )
+        self.assertEqual(0, self.jira.issue.call_count)
+
+    def test_invalidate_modified_issue(self):
+        with tempfile.NamedTemporaryFile() as cache_file:
+            argv = ['--id=1', '--summary=S1', '--cache-file', cache_file.name]
+            with mock.patch('jiractl.cache.IssueCache') as cache_mock:
+                self.check_stdout(issues.EditIssue, argv, "Done.\n")
+        cache_mock.return_value.invalidate.assert_called_once_with(self.jira, "1")
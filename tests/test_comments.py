@@ -13,8 +13,13 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import functools
+import itertools
+import json
+
 import mock
 
+from jiractl import app
 from jiractl.commands import comments
 
 from tests import base
@@ -23,10 +28,107 @@ from tests import base
 class TestListComments(base.BaseUnitTest):
     command = comments.ListComments
 
+    def get_comments(self, total, path, params):
+        self.assertEqual("issue/ISSUE/comment", path)
+        start_at = params["startAt"]
+        ids = list(range(total))
+        if params["orderBy"] == "-created":
+            ids.reverse()
+        comments = [
+            {
+                "id": str(x), "updated": "U", "author": {"name": "USER"}, "body": "B",
+                "created": "2017-01-01T00:{0:02d}:00.000+0000".format(x)
+            }
+            for x in ids[start_at:start_at + params["maxResults"]]
+        ]
+        return {"comments": comments, "startAt": start_at, "total": total}
+
+    def get_ids(self, argv, count=None):
+        with mock.patch.object(self.command, 'produce_output') as output_mock:
+            app.debug("command", self.command, ['--issue=ISSUE'] + argv)
+        return [x[0] for x in itertools.islice(output_mock.call_args[0][2], count)]
+
+    def get_pages(self):
+        return [x[1]["params"]["startAt"] for x in self.jira._get_json.call_args_list]
+
     def test_success(self):
-        self.jira.comments.return_value = [mock.Mock(), mock.Mock()]
-        self.check_output_many(self.command, ['--issue=ISSUE'], 2)
-        self.jira.comments.assert_called_once_with("ISSUE")
+        self.jira._get_json.side_effect = functools.partial(self.get_comments, 2)
+        self.check_output(self.command, ['--issue=ISSUE'], [("0", "U", "USER", "B"), ("1", "U", "USER", "B")])
+        self.jira._get_json.assert_called_once_with(
+            "issue/ISSUE/comment", params={"startAt": 0, "maxResults": 100, "orderBy": "created"}
+        )
+
+    def test_fetch_pages_concurrently(self):
+        self.jira._get_json.side_effect = functools.partial(self.get_comments, 7)
+        self.check_output(self.command, ['--issue=ISSUE', '--page-size=2'], [
+            (str(x), "U", "USER", "B") for x in range(7)
+        ])
+        self.assertEqual(
+            [0, 2, 4, 6], sorted(x[1]["params"]["startAt"] for x in self.jira._get_json.call_args_list)
+        )
+
+    def test_after_id_fetches_tail_only(self):
+        self.jira._get_json.side_effect = functools.partial(self.get_comments, 50)
+        self.assertEqual(["46", "47", "48", "49"], self.get_ids(['--after-id=45', '--page-size=3']))
+        self.assertEqual([0, 3], self.get_pages())
+        self.assertEqual("-created", self.jira._get_json.call_args[1]["params"]["orderBy"])
+
+    def test_since(self):
+        self.jira._get_json.side_effect = functools.partial(self.get_comments, 50)
+        self.assertEqual(
+            ["49", "48"], self.get_ids(['--since=2017-01-01T00:47:30.000+0000', '--newest', '--page-size=10'])
+        )
+        self.assertEqual([0], self.get_pages())
+
+    def test_limit_newest(self):
+        self.jira._get_json.side_effect = functools.partial(self.get_comments, 50)
+        self.assertEqual(["49", "48"], self.get_ids(['--limit=2', '--newest']))
+        self.jira._get_json.assert_called_once_with(
+            "issue/ISSUE/comment", params={"startAt": 0, "maxResults": 2, "orderBy": "-created"}
+        )
+
+    def test_limit(self):
+        self.jira._get_json.side_effect = functools.partial(self.get_comments, 50)
+        self.assertEqual(["0", "1", "2"], self.get_ids(['--limit=3', '--page-size=2']))
+        self.assertEqual([0, 2], self.get_pages())
+
+    @mock.patch('time.sleep')
+    def test_follow(self, sleep_mock):
+        state = {"total": 3, "edited": set()}
+
+        def get_comments(path, params):
+            data = self.get_comments(state["total"], path, params)
+            for comment in data["comments"]:
+                if int(comment["id"]) in state["edited"]:
+                    comment["updated"] = "U2"
+            return data
+
+        def get_issue(issue, fields):
+            # the comments are changed after the second poll
+            if self.jira.issue.call_count == 3:
+                state.update(total=5, edited={1})
+            return mock.Mock(fields=mock.Mock(updated=str(state["total"]) + str(state["edited"])))
+
+        self.jira._get_json.side_effect = get_comments
+        self.jira.issue.side_effect = get_issue
+        argv = ['--after-id=0', '--follow', '--interval=10', '-f', 'value']
+        with mock.patch.object(self.command, 'produce_output') as output_mock:
+            app.debug("command", self.command, ['--issue=ISSUE'] + argv)
+        rows = list(itertools.islice(output_mock.call_args[0][2], 5))
+        self.assertEqual([("1", "U"), ("2", "U"), ("1", "U2"), ("3", "U"), ("4", "U")], [x[:2] for x in rows])
+        self.jira.issue.assert_called_with("ISSUE", fields="updated")
+        self.assertEqual(2, sleep_mock.call_count)
+        # the comments are not fetched while the issue is not updated
+        self.assertEqual(
+            ["-created", "created"], [x[1]["params"]["orderBy"] for x in self.jira._get_json.call_args_list]
+        )
+        # the delay is doubled while nothing changes
+        self.assertTrue(10 <= sleep_mock.call_args_list[1][0][0] <= 20)
+
+    def test_timestamp(self):
+        self.assertEqual(1483228800, comments.timestamp("2017-01-01T00:00:00.000+0000"))
+        self.assertEqual(1483228800, comments.timestamp("1483228800"))
+        self.assertRaises(ValueError, comments.timestamp, "yesterday")
 
     def test_required_arguments(self):
         self.check_required_arguments(self.command, ['--issue=ISSUE'])
@@ -60,16 +162,25 @@ class TestEditComment(base.BaseUnitTest):
     def test_specify_all_arguments(self):
         argv = ['--issue=ISSUE', '--id=1', '--text=TEXT1<br>TEXT2', '--visibility=TYPE:VALUE']
         self.check_stdout(self.command, argv, "Done.\n")
-        self.jira.comment.assert_called_once_with("ISSUE", "1")
-        self.jira.comment.return_value.update.assert_called_once_with(
-            body="TEXT1\nTEXT2", visibility={"type": "TYPE", "value": "VALUE"}
+        self.assertEqual(0, self.jira.comment.call_count)
+        self.jira._get_url.assert_called_once_with("issue/ISSUE/comment/1")
+        self.jira._session.put.assert_called_once_with(self.jira._get_url.return_value, data=mock.ANY)
+        self.assertEqual(
+            {"body": "TEXT1\nTEXT2", "visibility": {"type": "TYPE", "value": "VALUE"}},
+            json.loads(self.jira._session.put.call_args[1]["data"])
         )
 
     def test_specify_required_arguments_only(self):
         argv = ['--issue=ISSUE', '--id=1', '--text=TEXT']
         self.check_stdout(self.command, argv, "Done.\n")
+        self.jira._session.put.assert_called_once_with(self.jira._get_url.return_value, data='{"body": "TEXT"}')
+
+    def test_verify(self):
+        argv = ['--issue=ISSUE', '--id=1', '--text=TEXT', '--verify']
+        self.check_stdout(self.command, argv, "Done.\n")
         self.jira.comment.assert_called_once_with("ISSUE", "1")
         self.jira.comment.return_value.update.assert_called_once_with(body="TEXT", visibility=None)
+        self.assertEqual(0, self.jira._session.put.call_count)
 
     def test_required_arguments(self):
         argv = ['--issue=ISSUE', '--id=1']
@@ -0,0 +1,106 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+
+import mock
+
+from jiractl import app
+from jiractl import config
+from jiractl import jsonlib
+
+from tests import base
+
+
+class TestConfig(base.BaseUnitTest):
+
+    def setUp(self):
+        super(TestConfig, self).setUp()
+        self.path = os.path.join(self.tmpdir, "config")
+        m = mock.patch.dict(os.environ, {config.CONFIG_ENV: self.path})
+        m.start()
+        self.addCleanup(m.stop)
+
+    def write(self, text):
+        with open(self.path, "w") as stream:
+            stream.write(text)
+
+    def parse(self, argv):
+        jira_app = app.create_app(mock.Mock())
+        return jira_app.parser.parse_known_args(argv)[0]
+
+    def test_default_path(self):
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertEqual(os.path.join(self.tmpdir, "config"), config.get_config_path())
+
+    def test_no_config(self):
+        options = self.parse([])
+        self.assertEqual(8, options.concurrency)
+        self.assertTrue(options.compression)
+
+    def test_options_from_config(self):
+        self.write("[jiractl]\nserver = http://jira\nconcurrency = 16\ncompression = false\nread-timeout = 5.5\n")
+        options = self.parse([])
+        self.assertEqual("http://jira", options.server)
+        self.assertEqual(16, options.concurrency)
+        self.assertIs(False, options.compression)
+        self.assertEqual(5.5, options.read_timeout)
+        self.assertTrue(options.keep_alive)
+
+        # the command line overrides config
+        options = self.parse(["--concurrency", "4", "--server", "http://other"])
+        self.assertEqual(4, options.concurrency)
+        self.assertEqual("http://other", options.server)
+
+    def test_unknown_option(self):
+        self.write("[jiractl]\nconcurency = 16\nserver = http://jira\n")
+        jira_app = app.create_app(mock.Mock())
+        options = jira_app.parser.parse_known_args([])[0]
+        self.assertEqual(8, options.concurrency)
+        self.assertEqual("http://jira", options.server)
+        self.assertEqual(["Unknown option 'concurency' in {0}".format(self.path)], jira_app.config_problems)
+
+    def test_invalid_value(self):
+        self.write("[jiractl]\nconcurrency = many\ncompression = maybe\nread-timeout = 5.5\n")
+        jira_app = app.create_app(mock.Mock())
+        options = jira_app.parser.parse_known_args([])[0]
+        self.assertEqual(8, options.concurrency)
+        self.assertTrue(options.compression)
+        self.assertEqual(5.5, options.read_timeout)
+        self.assertEqual(2, len(jira_app.config_problems))
+
+    def test_malformed_config(self):
+        self.write("concurrency = 16\n")
+        jira_app = app.create_app(mock.Mock())
+        self.assertEqual(8, jira_app.parser.parse_known_args([])[0].concurrency)
+        self.assertEqual(1, len(jira_app.config_problems))
+
+    def test_problems_are_reported(self):
+        self.write("[jiractl]\nconcurency = 16\n")
+        jira_app = app.create_app(mock.Mock())
+        with mock.patch.object(jira_app.LOG, "warning") as warning:
+            jira_app.initialize_app([])
+        warning.assert_called_once_with("Unknown option 'concurency' in {0}".format(self.path))
+
+
+class TestJsonLib(base.BaseUnitTest):
+
+    def test_get_decoder(self):
+        self.assertEqual({"a": [1]}, jsonlib.get_decoder("json")(b'{"a": [1]}'))
+        self.assertEqual({"a": [1]}, jsonlib.get_decoder()(b'{"a": [1]}'))
+
+    def test_decoder_is_not_installed(self):
+        with mock.patch.dict(jsonlib.DECODERS, ujson=None):
+            self.assertRaises(ValueError, jsonlib.get_decoder, "ujson")
@@ -0,0 +1,127 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import functools
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+from cliff.commandmanager import CommandManager
+import mock
+
+from jiractl import app
+from jiractl.commands import daemon as daemon_commands
+from jiractl.commands import labels
+from jiractl import daemon
+
+from tests import base
+
+
+class TestDaemon(base.BaseUnitTest):
+
+    def setUp(self):
+        super(TestDaemon, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, "daemon.sock")
+        cmd_mgr = CommandManager("jiractl.tests", convert_underscores=True)
+        cmd_mgr.add_command("issue labels", labels.ListLabels)
+        self.app_factory = functools.partial(
+            app.create_app, cmd_mgr, app_class=daemon_commands.DaemonApp, sessions={}
+        )
+        self.jira.issue.return_value = mock.Mock(fields=mock.Mock(labels=["label1", "label2"]))
+
+    def start_server(self):
+        server = daemon.Server(self.path, self.app_factory)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            thread.join()
+            server.server_close()
+
+        self.addCleanup(stop)
+        return server
+
+    def test_forward_if_daemon_is_not_running(self):
+        self.assertIsNone(daemon.forward(["issue", "labels", "--issue=ISSUE"], path=self.path))
+
+    def test_is_local(self):
+        self.assertTrue(daemon.is_local(None, []))
+        self.assertTrue(daemon.is_local("daemon", []))
+        self.assertTrue(daemon.is_local("issue create bulk", ["--file=-"]))
+        self.assertTrue(daemon.is_local("issues search", ["--query=project=P1", "--follow"]))
+        self.assertFalse(daemon.is_local("issue labels add", ["--issue=P1-1", "--labels", "batch"]))
+
+    def test_find_command(self):
+        cmd_app = self.app_factory()
+        self.assertEqual(
+            ("issue labels", ["--issue=batch"]), cmd_app.find_command(["-s", "URL", "issue", "labels", "--issue=batch"])
+        )
+        self.assertEqual((None, ["unknown"]), cmd_app.find_command(["unknown"]))
+        self.assertEqual((None, ["--version"]), cmd_app.find_command(["--version"]))
+        self.assertEqual(0, self.stderr.write.call_count)
+
+    def test_forward_command(self):
+        self.start_server()
+        stdout = io.BytesIO()
+        stderr = io.BytesIO()
+        code = daemon.forward(["issue", "labels", "--issue=ISSUE", "-f", "value"], self.path, stdout, stderr)
+        self.assertEqual(0, code)
+        self.assertEqual("label1\nlabel2\n", stdout.getvalue())
+
+    def test_forward_streams_output(self):
+        written = threading.Event()
+
+        def run(argv):
+            sys.stdout.write(u"first\n")
+            # the client receives output while the command is running
+            return 0 if written.wait(5) else 1
+
+        self.app_factory = mock.Mock(return_value=mock.Mock(run=run))
+        self.start_server()
+        stdout = mock.Mock(write=lambda data: written.set())
+        self.assertEqual(0, daemon.forward(["issue", "labels"], self.path, stdout, io.BytesIO()))
+
+    def test_execute_in_client_directory(self):
+        directories = []
+        cmd_app = mock.Mock(run=lambda argv: directories.append(os.getcwd()) or 0)
+        server = daemon.Server(self.path, mock.Mock(return_value=cmd_app))
+        self.addCleanup(server.server_close)
+        cwd = os.getcwd()
+        self.assertEqual(0, server.execute(["issue"], io.BytesIO(), io.BytesIO(), self.tmpdir))
+        self.assertEqual([os.path.realpath(self.tmpdir)], [os.path.realpath(x) for x in directories])
+        self.assertEqual(cwd, os.getcwd())
+
+    def test_execute_invalid_command(self):
+        server = daemon.Server(self.path, self.app_factory)
+        self.addCleanup(server.server_close)
+        stderr = io.BytesIO()
+        self.assertEqual(2, server.execute(["issue", "labels"], io.BytesIO(), stderr))
+        self.assertIn("--issue", stderr.getvalue())
+
+    def test_sessions_are_shared(self):
+        sessions = {}
+        for _ in range(2):
+            cmd_app = daemon_commands.DaemonApp(
+                description="", version="", command_manager=mock.Mock(), sessions=sessions
+            )
+            cmd_app.options = mock.Mock(server="URL", user="USER", password="PASSWORD")
+            self.assertIs(self.jira, cmd_app.jira)
+        self.assertEqual({("URL", "USER", "PASSWORD"): self.jira}, sessions)
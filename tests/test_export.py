@@ -0,0 +1,145 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import gzip
+import json
+import os
+
+import mock
+
+from jiractl import app
+from jiractl.commands import export
+
+from tests import base
+
+
+def make_issue(number):
+    return {"id": str(number), "key": "P1-{0}".format(number), "fields": {
+        "project": {"name": "Project 1"}, "summary": u"S{0}, \"q\"".format(number), "issuetype": {"name": "Bug"},
+        "assignee": None, "status": {"name": "Open"}, "customfield_10010": number,
+        # the issues are created at the same time in pairs
+        "created": "2017-01-01T00:0{0}:00.000+0000".format(number // 2),
+    }}
+
+
+class TestExportIssues(base.BaseUnitTest):
+    command = export.ExportIssues
+
+    def setUp(self):
+        super(TestExportIssues, self).setUp()
+        self.issues = [make_issue(x) for x in range(1, 6)]
+        self.failures = set()
+        self.requests = []
+        self.jira._get_url.return_value = "URL"
+        self.jira._session.get.side_effect = self.search
+        self.out = os.path.join(self.tmpdir, "issues.jsonl.gz")
+
+    def search(self, url, params):
+        start_at = params["startAt"]
+        self.requests.append(start_at)
+        if start_at in self.failures:
+            self.failures.discard(start_at)
+            raise IOError("connection reset")
+        # the server limits the size of page, the condition on creation time is ignored
+        issues = self.issues[start_at:start_at + 2]
+        return mock.Mock(content=json.dumps({"startAt": start_at, "total": len(self.issues), "issues": issues}))
+
+    def export(self, *argv):
+        argv = ["--query=project=P1 ORDER BY key", "--out", self.out, "--processes=1", "--workers=2"] + list(argv)
+        with mock.patch.object(self.command, "produce_output") as output_mock:
+            app.debug("command", self.command, argv)
+        return output_mock.call_args[0][2]
+
+    def read(self):
+        with gzip.open(self.out) as stream:
+            return stream.read().decode("utf8").splitlines()
+
+    def test_export_jsonl(self):
+        self.assertEqual(("project=P1 ORDER BY key", self.out, 5, 5), self.export())
+        rows = [json.loads(x) for x in self.read()]
+        self.assertEqual(["P1-{0}".format(x) for x in range(1, 6)], [x["key"] for x in rows])
+        self.assertEqual(
+            {"project": "Project 1", "id": "1", "key": "P1-1", "summary": u"S1, \"q\"", "type": "Bug",
+             "assignee": None, "status": "Open"},
+            rows[0]
+        )
+        self.assertEqual([0, 2, 4], sorted(self.requests))
+        self.jira._session.get.assert_any_call("URL", params={
+            "jql": "project=P1 ORDER BY created ASC, key ASC", "startAt": 0, "maxResults": 100,
+            "fields": "project,summary,issuetype,assignee,status,created",
+        })
+        self.assertFalse(os.path.exists(self.out + export.CHECKPOINT_SUFFIX))
+
+    def test_export_csv_with_custom_fields(self):
+        self.out = os.path.join(self.tmpdir, "issues.csv.gz")
+        self.export("--fields", "Story Points")
+        lines = self.read()
+        self.assertEqual("project,id,key,summary,type,assignee,status,Story Points", lines[0])
+        self.assertEqual('Project 1,1,P1-1,"S1, ""q""",Bug,,Open,1', lines[1])
+        self.assertEqual(6, len(lines))
+        self.assertEqual("project,summary,issuetype,assignee,status,customfield_10010,created",
+                         self.jira._session.get.call_args[1]["params"]["fields"])
+
+    def test_resume(self):
+        self.failures.add(2)
+        self.assertRaises(IOError, self.export)
+        checkpoint_path = self.out + export.CHECKPOINT_SUFFIX
+        with open(checkpoint_path) as stream:
+            state = json.load(stream)
+        self.assertEqual(2, state["exported"])
+        self.assertEqual([1483228860000, "P1", 2], state["after"])
+        # the data, that has been written after checkpoint, is dropped
+        with open(self.out, "ab") as stream:
+            stream.write("garbage")
+
+        # the exported issue is deleted, so the offsets of remaining ones are shifted
+        del self.issues[0]
+        self.requests = []
+        self.assertEqual(("project=P1 ORDER BY key", self.out, 5, 5), self.export())
+        self.assertEqual([0, 2], sorted(self.requests))
+        self.jira._session.get.assert_called_with("URL", params={
+            "jql": u'(project=P1) AND created >= "2016/12/31 00:01" ORDER BY created ASC, key ASC',
+            "startAt": 2, "maxResults": 100, "fields": "project,summary,issuetype,assignee,status,created",
+        })
+        self.assertEqual(["P1-{0}".format(x) for x in range(1, 6)], [json.loads(x)["key"] for x in self.read()])
+        self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_resume_in_the_same_second(self):
+        # the server orders by creation time with milliseconds, then by key
+        self.issues = [self.issues[x] for x in (0, 2, 1, 3, 4)]
+        times = ["00:00:00.100", "00:00:00.200", "00:00:00.900", "00:00:01.000", "00:00:01.000"]
+        for issue, created in zip(self.issues, times):
+            issue["fields"]["created"] = "2017-01-01T{0}+0000".format(created)
+        self.failures.add(2)
+        self.assertRaises(IOError, self.export)
+        with open(self.out + export.CHECKPOINT_SUFFIX) as stream:
+            self.assertEqual([1483228800200, "P1", 3], json.load(stream)["after"])
+
+        self.assertEqual(("project=P1 ORDER BY key", self.out, 5, 5), self.export())
+        self.assertEqual(["P1-1", "P1-3", "P1-2", "P1-4", "P1-5"], [json.loads(x)["key"] for x in self.read()])
+
+    def test_resume_with_other_arguments(self):
+        self.failures.add(2)
+        self.assertRaises(IOError, self.export)
+        self.assertRaises(ValueError, self.export, "--output-format=csv")
+        # the export is started from scratch
+        self.requests = []
+        self.export("--output-format=csv", "--restart")
+        self.assertEqual([0, 2, 4], sorted(self.requests))
+        self.assertEqual(6, len(self.read()))
+
+    def test_process_pool(self):
+        self.export("--processes=2")
+        self.assertEqual(["P1-{0}".format(x) for x in range(1, 6)], [json.loads(x)["key"] for x in self.read()])
@@ -0,0 +1,81 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import io
+import json
+import unittest
+
+from jiractl import formatters
+
+
+COLUMNS = ("id", "key", "summary")
+
+
+class TestStreamFormatters(unittest.TestCase):
+
+    def emit(self, formatter, rows, **kwargs):
+        stream = io.StringIO()
+        written = []
+
+        def data():
+            for row in rows:
+                # the previous row has been written before the next one is produced
+                written.append(stream.getvalue())
+                yield row
+
+        parser = argparse.ArgumentParser()
+        formatter.add_argument_group(parser)
+        parsed_args = parser.parse_args([])
+        parsed_args.__dict__.update(kwargs)
+        formatter.emit_list(COLUMNS, data(), stream, parsed_args)
+        return stream.getvalue(), written
+
+    def test_jsonl(self):
+        output, written = self.emit(formatters.JSONLinesFormatter(), [(1, "P1-1", u"S\u0101"), (2, "P1-2", None)])
+        lines = output.splitlines()
+        self.assertEqual({"id": 1, "key": "P1-1", "summary": u"S\u0101"}, json.loads(lines[0]))
+        self.assertEqual('{"id": 2, "key": "P1-2", "summary": null}', lines[1])
+        self.assertEqual(["", lines[0] + "\n"], written)
+
+    def test_csv(self):
+        output, written = self.emit(formatters.CSVFormatter(), [(1, "P1-1", u'a, "b"'), (2, "P1-2", None)])
+        self.assertEqual(u'id,key,summary\r\n1,P1-1,"a, ""b"""\r\n2,P1-2,\r\n', output)
+        self.assertEqual(u"id,key,summary\r\n", written[0])
+
+    def test_tsv(self):
+        output, written = self.emit(formatters.TSVFormatter(), [(1, "P1-1", u"a\tb\nc\\d"), (2, "P1-2", None)])
+        self.assertEqual(u"id\tkey\tsummary\n1\tP1-1\ta\\tb\\nc\\\\d\n2\tP1-2\t\n", output)
+        self.assertEqual(2, len(written[1].splitlines()))
+
+    def test_table(self):
+        rows = [(1, "P1-1", u"S1"), (2, "P1-2", u"line1\nline2"), (10, "P1-10", u"long summary")]
+        output, written = self.emit(formatters.TableFormatter(), rows, sample_rows=2)
+        self.assertEqual(
+            u"+----+------+-------------+\n"
+            u"| id | key  | summary     |\n"
+            u"+----+------+-------------+\n"
+            u"|  1 | P1-1 | S1          |\n"
+            u"|  2 | P1-2 | line1 line2 |\n"
+            u"| 10 | P1-10 | long summary |\n"
+            u"+----+------+-------------+\n",
+            output
+        )
+        # the sample is written before the rest of rows
+        self.assertIn(u"line1 line2", written[2])
+
+    def test_empty_table(self):
+        output, _ = self.emit(formatters.TableFormatter(), [], sample_rows=2)
+        self.assertEqual(u"", output)
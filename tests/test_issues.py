@@ -13,13 +13,40 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import io
+import itertools
+import json
+import os
+import tempfile
+
+from jira import client
+from jira import exceptions
 import mock
 
+from jiractl import app
+from jiractl import backend
 from jiractl.commands import issues
+from jiractl import mirror
 
 from tests import base
 
 
+FIELDS = "project,summary,issuetype,assignee,status"
+
+
+def make_mirror(path):
+    store = mirror.IssueMirror(path)
+    store.put("q", [
+        ("Project 1", "1", "P1-1", "S1", "Bug", "user", "New", "P1", "2017-01-01T00:00:00.000+0000", None, {}),
+        ("Project 1", "2", "P1-2", "S2", "Bug", "USER", "Work", "P1", "2017-01-02T00:00:00.000+0000", None, {}),
+        ("Project 1", "3", "P1-3", "S3", "Bug", "USER", "Done", "P1", "2017-01-03T00:00:00.000+0000", None, {}),
+        ("Project 2", "4", "P2-1", "S4", "Bug", "USER", "New", "P2", "2017-01-04T00:00:00.000+0000", None, {}),
+    ])
+    for query in ('project = P1', 'project = "Project 1"'):
+        store.set_cursor(query, 1483228800, 1483228800)
+    store.close()
+
+
 class TestCreateIssue(base.BaseUnitTest):
     command = issues.CreateIssue
 
@@ -32,12 +59,12 @@ class TestCreateIssue(base.BaseUnitTest):
         self.check_output_one(self.command, argv)
         self.jira.create_issue.assert_called_once_with(
             fields={
-                "project": "P1", "issuetype": "T1", "summary": "S1", "description": "D1",
+                "project": {"key": "P1"}, "issuetype": {"name": "T1"}, "summary": "S1", "description": "D1",
                 "assignee": {"name": "USER"}, "parent": {"id": "1"},
                 "components": [{"name": "C1"}, {"name": "C2"}],
                 "labels": ["L1", "L2"],
             },
-            prefetch=True
+            prefetch=False
         )
 
     def test_specify_required_arguments_only(self):
@@ -45,15 +72,162 @@ class TestCreateIssue(base.BaseUnitTest):
         argv = ['--project=P1', '--type=T1', '--summary=S1', '--description=D1']
         self.check_output_one(self.command, argv)
         self.jira.create_issue.assert_called_once_with(
-            fields={"project": "P1", "issuetype": "T1", "summary": "S1", "description": "D1"},
-            prefetch=True
+            fields={"project": {"key": "P1"}, "issuetype": {"name": "T1"}, "summary": "S1", "description": "D1"},
+            prefetch=False
         )
 
+    def test_output_is_built_from_sent_fields(self):
+        self.jira.create_issue.return_value = mock.Mock(id="1", key="P1-1")
+        argv = ['--project=P1', '--type=T1', '--summary=S1', '--description=D1', '--assignee=USER']
+        self.check_output(self.command, argv, ("P1", "1", "P1-1", "S1", "T1", "USER", None))
+
+    def test_unknown_issue_type(self):
+        argv = ['--project=P1', '--type=Story', '--summary=S1', '--description=D1']
+        self.assertRaises(ValueError, self.check_output_one, self.command, argv)
+        self.assertEqual(0, self.jira.create_issue.call_count)
+
+    def test_verify(self):
+        self.jira.create_issue.return_value = mock.Mock()
+        argv = ['--project=P1', '--type=T1', '--summary=S1', '--description=D1', '--verify']
+        self.check_output_one(self.command, argv)
+        self.jira.create_issue.assert_called_once_with(fields=mock.ANY, prefetch=True)
+
     def test_required_arguments(self):
         argv = ['--project=P1', '--type=T1', '--summary=S1', '--description=D1']
         self.check_required_arguments(self.command, argv)
 
 
+class TestCreateIssues(base.BaseUnitTest):
+    command = issues.CreateIssues
+
+    def setUp(self):
+        super(TestCreateIssues, self).setUp()
+        # child mocks are created on first access, that is not thread-safe
+        self.jira._get_url.return_value = "URL"
+        self.post = self.jira._session.post
+
+    def check_create(self, lines, argv, expected_data, suffix=".jsonl"):
+        with tempfile.NamedTemporaryFile(suffix=suffix) as stream:
+            stream.write("\n".join(lines))
+            stream.flush()
+            self.check_output(self.command, ["--file", stream.name] + argv, expected_data)
+
+    def test_create_from_stdin(self):
+        self.post.return_value.json.return_value = {"issues": [{"id": "1", "key": "P1-1"}], "errors": []}
+        data = u"summary,labels\n\u041f\u0440\u0438\u0432\u0435\u0442,L1\n".encode("utf8")
+        with mock.patch("sys.stdin", io.BytesIO(data)):
+            self.check_output(
+                self.command, ["--input-format=csv", "--project=P1", "--type=T1"],
+                [(2, "1", "P1-1", u"\u041f\u0440\u0438\u0432\u0435\u0442", None)]
+            )
+        self.assertEqual([[{
+            "project": {"key": "P1"}, "issuetype": {"name": "T1"}, "summary": u"\u041f\u0440\u0438\u0432\u0435\u0442",
+            "labels": ["L1"],
+        }]], self.get_sent_fields())
+
+    def get_sent_fields(self):
+        return [
+            [x["fields"] for x in json.loads(c[1]["data"])["issueUpdates"]] for c in self.post.call_args_list
+        ]
+
+    def test_create_from_jsonl_in_chunks(self):
+        self.post.return_value.json.side_effect = [
+            {"issues": [{"id": "1", "key": "P1-1"}, {"id": "2", "key": "P1-2"}], "errors": []},
+            {"issues": [{"id": "3", "key": "P1-3"}], "errors": []},
+        ]
+        lines = [
+            json.dumps({"project": "P1", "type": "T1", "summary": "S{0}".format(i), "labels": ["L1"]})
+            for i in range(1, 4)
+        ]
+        self.check_create(
+            lines, ["--chunk-size=2", "--workers=1"],
+            [(1, "1", "P1-1", "S1", None), (2, "2", "P1-2", "S2", None), (3, "3", "P1-3", "S3", None)]
+        )
+        self.jira._get_url.assert_called_with("issue/bulk")
+        self.assertEqual(
+            [
+                [
+                    {"project": {"key": "P1"}, "issuetype": {"name": "T1"}, "summary": "S1", "labels": ["L1"]},
+                    {"project": {"key": "P1"}, "issuetype": {"name": "T1"}, "summary": "S2", "labels": ["L1"]},
+                ],
+                [{"project": {"key": "P1"}, "issuetype": {"name": "T1"}, "summary": "S3", "labels": ["L1"]}],
+            ],
+            self.get_sent_fields()
+        )
+
+    def test_create_from_csv(self):
+        self.post.return_value.json.return_value = {"issues": [{"id": "1", "key": "P1-1"}], "errors": []}
+        lines = ["summary,description,parent,components,labels", "S1,D1,10,\"C1, C2\",L1"]
+        self.check_create(lines, ["--project=P1", "--type=T1"], [(2, "1", "P1-1", "S1", None)], suffix=".csv")
+        self.assertEqual(
+            [[{
+                "project": {"key": "P1"}, "issuetype": {"name": "T1"}, "summary": "S1", "description": "D1",
+                "parent": {"id": "10"}, "components": [{"name": "C1"}, {"name": "C2"}], "labels": ["L1"],
+            }]],
+            self.get_sent_fields()
+        )
+
+    def test_report_invalid_rows(self):
+        lines = [
+            json.dumps({"project": "P1", "type": "T1"}),
+            json.dumps({"project": "P1", "type": "T1", "summary": "S2", "priority": "High"}),
+            "not a json",
+        ]
+        lines.append(json.dumps({"project": "P1", "type": "Story", "summary": "S4"}))
+        self.check_create(lines, [], [
+            (1, None, None, None, "missing summary"),
+            (2, None, None, "S2", "unknown columns priority"),
+            (3, None, None, None, "invalid row"),
+            (4, None, None, "S4", "Unknown issue type 'Story', expected one of: T1, Bug"),
+        ])
+        self.assertEqual(0, self.post.call_count)
+
+    def test_resend_rows_failed_because_of_server_error(self):
+        self.post.return_value.json.side_effect = [
+            {
+                "issues": [{"id": "1", "key": "P1-1"}],
+                "errors": [
+                    {"failedElementNumber": 1, "status": 400, "elementErrors": {"errors": {"summary": "too long"}}},
+                    {"failedElementNumber": 2, "status": 503, "elementErrors": {"errorMessages": ["unavailable"]}},
+                ]
+            },
+            {"issues": [{"id": "3", "key": "P1-3"}], "errors": []},
+        ]
+        lines = [json.dumps({"project": "P1", "type": "T1", "summary": "S{0}".format(i)}) for i in range(1, 4)]
+        self.check_create(lines, [], [
+            (1, "1", "P1-1", "S1", None),
+            (2, None, None, "S2", "summary: too long"),
+            (3, "3", "P1-3", "S3", None),
+        ])
+        self.assertEqual(["S3"], [x["summary"] for x in self.get_sent_fields()[1]])
+
+    def test_give_up_after_retries(self):
+        self.post.side_effect = exceptions.JIRAError(status_code=503, text="unavailable")
+        lines = [json.dumps({"project": "P1", "type": "T1", "summary": "S1"})]
+        self.check_create(lines, ["--retries=1"], [(1, None, None, "S1", mock.ANY)])
+        self.assertEqual(2, self.post.call_count)
+
+    def test_do_not_resend_rows_which_may_have_been_created(self):
+        lines = [json.dumps({"project": "P1", "type": "T1", "summary": "S1"})]
+        for error in (IOError("read timeout"), exceptions.JIRAError(status_code=500, text="internal error")):
+            self.post.reset_mock()
+            self.post.side_effect = error
+            self.check_create(lines, [], [(1, None, None, "S1", mock.ANY)])
+            self.assertEqual(1, self.post.call_count)
+
+    def test_all_rows_rejected(self):
+        response = mock.Mock()
+        response.json.return_value = {
+            "issues": [], "errors": [{"failedElementNumber": 0, "status": 400, "elementErrors": {
+                "errorMessages": ["invalid project"]
+            }}]
+        }
+        self.post.side_effect = exceptions.JIRAError(status_code=400, response=response)
+        lines = [json.dumps({"project": "P1", "type": "T1", "summary": "S1"})]
+        self.check_create(lines, [], [(1, None, None, "S1", "invalid project")])
+        self.assertEqual(1, self.post.call_count)
+
+
 class TestEditIssue(base.BaseUnitTest):
     command = issues.EditIssue
 
@@ -62,46 +236,145 @@ class TestEditIssue(base.BaseUnitTest):
             '--id=1', '--summary=S1', '--description=D1', '--assignee=USER', '--status=WORK',
         ]
         self.check_stdout(self.command, argv, "Done.\n")
-        self.jira.issue.assert_called_once_with("1")
-        self.jira.issue.return_value.update.assert_called_once_with(fields={"summary": "S1", "description": "D1"})
+        self.assertEqual(0, self.jira.issue.call_count)
+        self.jira._get_url.assert_called_once_with("issue/1")
+        self.jira._session.put.assert_called_once_with(
+            self.jira._get_url.return_value, data=json.dumps({"fields": {"summary": "S1", "description": "D1"}})
+        )
         self.jira.assign_issue.assert_called_once_with("1", "USER")
         self.jira.transition_issue.assert_called_once_with("1", "WORK")
 
     def test_specify_required_arguments_only(self):
         argv = ['--id=1']
         self.check_stdout(self.command, argv, "Done.\n")
-        self.assertEqual(0, self.jira.issue.call_count)
+        self.assertEqual(0, self.jira._session.put.call_count)
         self.assertEqual(0, self.jira.assign_issue.call_count)
         self.assertEqual(0, self.jira.transition_issue.call_count)
 
     def test_update_custom_fields(self):
-        argv = ['--id=1', "--fields", "custom_1:value1", "custom_2:value2"]
+        argv = ['--id=1', "--fields", "story points:5", "customfield_10020:value2"]
         self.check_stdout(self.command, argv, "Done.\n")
-        self.jira.issue.return_value.update.assert_called_once_with(
-            fields={"custom_1": "value1", "custom_2": "value2"}
+        self.jira._session.put.assert_called_once_with(
+            self.jira._get_url.return_value,
+            data=json.dumps({"fields": {"customfield_10010": "5", "customfield_10020": "value2"}})
         )
         self.assertEqual(0, self.jira.assign_issue.call_count)
         self.assertEqual(0, self.jira.transition_issue.call_count)
 
+    def test_unknown_field(self):
+        self.assertRaises(ValueError, self.check_stdout, self.command, ['--id=1', "--fields", "custom_1:1"], "")
+        self.assertEqual(0, self.jira._session.put.call_count)
+
     def test_required_arguments(self):
         argv = ['--id=1']
         self.check_required_arguments(self.command, argv)
 
 
+def make_issue(key, project="10", issue_type="1", status="3"):
+    fields = mock.Mock(project=mock.Mock(id=project), issuetype=mock.Mock(id=issue_type), status=mock.Mock(id=status))
+    return mock.Mock(key=key, id=key.split("-")[-1], fields=fields)
+
+
+class TestEditIssues(base.BaseUnitTest):
+    command = issues.EditIssue
+
+    def setUp(self):
+        super(TestEditIssues, self).setUp()
+        cache_file = tempfile.NamedTemporaryFile()
+        self.addCleanup(cache_file.close)
+        self.argv = ["--cache-file", cache_file.name, "--workers=1"]
+        self.jira.transitions.return_value = [{"id": "11", "name": "Start", "to": {"name": "WORK"}}]
+        self.jira.transition_issue.return_value = {}
+
+    def test_transition_issues_found_by_query(self):
+        self.jira.search_issues.return_value = [
+            make_issue("P-1"), make_issue("P-2"), make_issue("P-3", status="4"),
+        ]
+        self.check_stdout(self.command, self.argv + ['--query=project=P', '--status=WORK'], "Done.\n")
+        self.jira.search_issues.assert_called_once_with(
+            "project=P", startAt=0, maxResults=100, fields="project,issuetype,status"
+        )
+        # one lookup per group of issues in the same status
+        self.jira.transitions.assert_has_calls([mock.call("P-1"), mock.call("P-3")])
+        self.assertEqual(2, self.jira.transitions.call_count)
+        self.jira.transition_issue.assert_has_calls([
+            mock.call("P-1", "11"), mock.call("P-2", "11"), mock.call("P-3", "11")
+        ])
+
+    def test_transition_list_of_issues(self):
+        self.jira.search_issues.return_value = [make_issue("P-1"), make_issue("P-2")]
+        argv = self.argv + ['--id', 'P-1', '2', 'P-5', '--status=Start', '--summary=S1']
+        self.check_stdout(self.command, argv, "Done.\n")
+        self.jira.search_issues.assert_called_once_with(
+            u'issuekey in ("P-1","2","P-5")', startAt=0, maxResults=100, fields="project,issuetype,status"
+        )
+        self.assertEqual(1, self.jira.transitions.call_count)
+        # the issue, that is not found, is transitioned by name
+        self.jira.transition_issue.assert_has_calls([
+            mock.call("P-1", "11"), mock.call("2", "11"), mock.call("P-5", "Start")
+        ])
+        self.assertEqual(3, self.jira._session.put.call_count)
+
+    def test_use_cached_transitions(self):
+        self.jira.search_issues.return_value = [make_issue("P-1"), make_issue("P-2")]
+        argv = self.argv + ['--id', 'P-1', 'P-2', '--status=WORK']
+        self.check_stdout(self.command, argv, "Done.\n")
+        self.check_stdout(self.command, argv, "Done.\n")
+        self.assertEqual(1, self.jira.transitions.call_count)
+        self.assertEqual(4, self.jira.transition_issue.call_count)
+
+    def test_look_up_by_name_if_cached_transition_fails(self):
+        self.jira.search_issues.return_value = [make_issue("P-1"), make_issue("P-2")]
+        self.jira.transition_issue.side_effect = [exceptions.JIRAError(status_code=400), {}, {}]
+        argv = self.argv + ['--id', 'P-1', 'P-2', '--status=WORK']
+        self.check_stdout(self.command, argv, "Done.\n")
+        self.jira.transition_issue.assert_has_calls([
+            mock.call("P-1", "11"), mock.call("P-1", "WORK"), mock.call("P-2", "11")
+        ])
+
+    def test_report_failures(self):
+        self.jira.search_issues.return_value = [make_issue("P-1"), make_issue("P-2", status="4")]
+        self.jira.transitions.side_effect = [self.jira.transitions.return_value, []]
+        argv = self.argv + ['--id', 'P-1', 'P-2', '--status=WORK']
+        self.check_stdout(self.command, argv, "Failed 1 of 2.\n")
+        self.jira.transition_issue.assert_called_once_with("P-1", "11")
+        self.assertIn(u"P-2: Transition 'WORK' is not available", self.stderr.write.call_args[0][0])
+
+    def test_transition_id_is_used_as_is(self):
+        argv = self.argv + ['--id', 'P-1', 'P-2', '--status=11']
+        self.check_stdout(self.command, argv, "Done.\n")
+        self.assertEqual(0, self.jira.search_issues.call_count)
+        self.jira.transition_issue.assert_has_calls([mock.call("P-1", "11"), mock.call("P-2", "11")])
+
+
 class TestShowIssue(base.BaseUnitTest):
     command = issues.ShowIssue
 
     def test_success(self):
         argv = ['--id=1']
         self.check_output_one(self.command, argv)
-        self.jira.issue.assert_called_once_with("1")
+        self.jira.issue.assert_called_once_with("1", fields=FIELDS)
 
     def test_show_with_custom_column(self):
         argv = ['--id=1', '-c', 'custom_1']
         columns = self.command.columns + ("custom_1",)
         expected_data = (mock.ANY,) * len(columns)
         self.check_output(self.command, argv, expected_data, columns=columns)
-        self.jira.issue.assert_called_once_with("1")
+        self.jira.issue.assert_called_once_with("1", fields="custom_1")
+
+    def test_show_custom_field_by_name(self):
+        argv = ['--id=1', '-c', 'Story Points']
+        columns = self.command.columns + ("Story Points",)
+        expected_data = (mock.ANY,) * len(columns)
+        self.check_output(self.command, argv, expected_data, columns=columns)
+        self.jira.issue.assert_called_once_with("1", fields="customfield_10010")
+
+    def test_show_with_selected_columns(self):
+        argv = ['--id=1', '-c', 'key', '-c', 'status', '-c', 'custom_1']
+        columns = self.command.columns + ("custom_1",)
+        expected_data = (mock.ANY,) * len(columns)
+        self.check_output(self.command, argv, expected_data, columns=columns)
+        self.jira.issue.assert_called_once_with("1", fields="status,custom_1")
 
     def test_required_arguments(self):
         argv = ['--id=1']
@@ -115,12 +388,23 @@ class TestListIssues(base.BaseUnitTest):
         self.jira.search_issues.return_value = [mock.Mock(), mock.Mock()]
         self.check_output_many(self.command, ['--project=P1', '--assigne=USER', '--status', 'NEW', 'WORK'], 2)
         self.jira.search_issues.assert_called_once_with(
-            'project="P1" AND assignee="USER" AND status IN ("NEW","WORK")'
+            'project="P1" AND assignee="USER" AND status IN ("NEW","WORK")', startAt=0, maxResults=100, fields=FIELDS
         )
 
     def test_required_arguments(self):
         self.check_required_arguments(self.command, ['--project=P1', '--assigne=USER', '--status=NEW'])
 
+    def test_local(self):
+        db = os.path.join(self.tmpdir, "mirror.db")
+        make_mirror(db)
+        self.check_output(
+            self.command, ['--project=p1', '--assigne=USER', '--status', 'NEW', 'WORK', '--local', '--db', db], [
+                ("Project 1", "1", "P1-1", "S1", "Bug", "user", "New"),
+                ("Project 1", "2", "P1-2", "S2", "Bug", "USER", "Work"),
+            ]
+        )
+        self.assertFalse(self.jira.search_issues.called)
+
 
 class TestSearchIssues(base.BaseUnitTest):
     command = issues.SearchIssues
@@ -128,7 +412,116 @@ class TestSearchIssues(base.BaseUnitTest):
     def test_success(self):
         self.jira.search_issues.return_value = [mock.Mock(), mock.Mock()]
         self.check_output_many(self.command, ['--query', 'project="P1" AND assignee="USER"'], 2)
-        self.jira.search_issues.assert_called_once_with('project="P1" AND assignee="USER"')
+        self.jira.search_issues.assert_called_once_with(
+            'project="P1" AND assignee="USER"', startAt=0, maxResults=100, fields=FIELDS
+        )
+
+    def test_fetch_selected_columns_only(self):
+        self.jira.search_issues.return_value = [mock.Mock()]
+        self.check_output_many(self.command, ['--query', 'project="P1"', '-c', 'key', '-c', 'type'], 1)
+        self.jira.search_issues.assert_called_once_with('project="P1"', startAt=0, maxResults=100, fields="issuetype")
+
+    def test_raw_json(self):
+        self.jira.search_issues.return_value = {"total": 1, "issues": [{"id": "1", "key": "P1-1", "fields": {
+            "project": {"name": "Project 1"}, "summary": "S1", "issuetype": {"name": "Bug"}, "assignee": None,
+            "status": {"name": "Open"},
+        }}]}
+        expected = [("Project 1", "1", "P1-1", "S1", "Bug", None, "Open")]
+        self.check_output(self.command, ['--query', 'project="P1"', '--raw-json'], expected)
+        self.jira.search_issues.assert_called_once_with(
+            'project="P1"', startAt=0, maxResults=100, fields=FIELDS, json_result=True
+        )
+
+    def test_local(self):
+        db = os.path.join(self.tmpdir, "mirror.db")
+        make_mirror(db)
+        query = 'project = "Project 1" AND updated >= "2017/01/02" AND summary ~ S ORDER BY key DESC'
+        self.check_output(
+            self.command, ['--query', query, '--local', '--db', db], [
+                ("Project 1", "3", "P1-3", "S3", "Bug", "USER", "Done"),
+                ("Project 1", "2", "P1-2", "S2", "Bug", "USER", "Work"),
+            ]
+        )
+        self.assertFalse(self.jira.search_issues.called)
+
+    def test_local_without_database(self):
+        self.jira.search_issues.return_value = [mock.Mock()]
+        db = os.path.join(self.tmpdir, "mirror.db")
+        self.check_output_many(self.command, ['--query', 'project = P1', '--local', '--db', db], 1)
+        self.assertFalse(os.path.exists(db))
+
+    def test_local_query_is_not_covered(self):
+        db = os.path.join(self.tmpdir, "mirror.db")
+        make_mirror(db)
+        self.jira.search_issues.return_value = [mock.Mock()]
+        for query in ('project = P2', 'project = P1 OR project = P2', 'status = New'):
+            self.check_output_many(self.command, ['--query', query, '--local', '--db', db], 1)
+            self.jira.search_issues.assert_called_with(query, startAt=0, maxResults=100, fields=FIELDS)
+
+    def test_local_fallback_to_server(self):
+        self.jira.search_issues.return_value = [mock.Mock()]
+        db = os.path.join(self.tmpdir, "mirror.db")
+        make_mirror(db)
+        argv = ['--query', 'assignee = currentUser()', '--local', '--db', db]
+        self.check_output_many(self.command, argv, 1)
+        self.jira.search_issues.assert_called_once_with(
+            'assignee = currentUser()', startAt=0, maxResults=100, fields=FIELDS
+        )
+
+    @mock.patch('time.sleep')
+    def test_follow(self, sleep_mock):
+        def make_issue(issue_id, updated):
+            return mock.Mock(id=issue_id, fields=mock.Mock(updated=updated))
+
+        self.jira.search_issues.side_effect = [
+            [make_issue("1", "U1"), make_issue("2", "U1")],
+            [make_issue("2", "U1")],
+            [make_issue("2", "U2"), make_issue("3", "U1")],
+        ]
+        with mock.patch.object(self.command, 'produce_output') as output_mock:
+            app.debug("command", self.command, ['--query', 'project="P1" ORDER BY key', '--follow', '-f', 'value'])
+        rows = list(itertools.islice(output_mock.call_args[0][2], 4))
+        self.assertEqual(["1", "2", "2", "3"], [x[1] for x in rows])
+        self.assertEqual(2, sleep_mock.call_count)
+        self.assertRegexpMatches(
+            self.jira.search_issues.call_args[0][0], r'^\(project="P1"\) AND updated >= -\d+m ORDER BY updated ASC$'
+        )
+        self.assertEqual(FIELDS + ",updated", self.jira.search_issues.call_args[1]["fields"])
+
+    def test_follow_requires_streaming_formatter(self):
+        self.assertRaises(
+            ValueError, app.debug, "command", self.command, ['--query', 'project="P1"', '--follow', '-f', 'json']
+        )
+
+    def test_poll_forgets_old_issues(self):
+        seen = {"1": "U1", "2": "U1"}
+        self.jira.search_issues.return_value = [mock.Mock(id="2", fields=mock.Mock(updated="U2"))]
+        parsed_args = mock.Mock(columns=None, page_size=100)
+        cmd = self.command(mock.Mock(backend=backend.Backend(self.jira, 1)), None)
+        self.assertEqual(1, len(list(cmd.poll(parsed_args, 'project="P1"', seen, 0))))
+        self.assertEqual({"2": "U2"}, seen)
+
+    def test_fetch_all_pages(self):
+        self.jira.search_issues.side_effect = [
+            client.ResultList([mock.Mock(), mock.Mock()], _total=3),
+            client.ResultList([mock.Mock()], _total=3),
+        ]
+        self.check_output_many(self.command, ['--query', 'project="P1"', '--page-size=2'], 3)
+        self.jira.search_issues.assert_has_calls([
+            mock.call('project="P1"', startAt=0, maxResults=2, fields=FIELDS),
+            mock.call('project="P1"', startAt=2, maxResults=2, fields=FIELDS),
+        ])
+
+    def test_server_limits_page_size(self):
+        self.jira.search_issues.side_effect = [
+            client.ResultList([mock.Mock()], _total=2),
+            client.ResultList([mock.Mock()], _total=2),
+        ]
+        self.check_output_many(self.command, ['--query', 'project="P1"', '--page-size=5'], 2)
+        self.jira.search_issues.assert_has_calls([
+            mock.call('project="P1"', startAt=0, maxResults=5, fields=FIELDS),
+            mock.call('project="P1"', startAt=1, maxResults=5, fields=FIELDS),
+        ])
 
     def test_required_arguments(self):
         self.check_required_arguments(self.command, ['--query=project="P1"'])
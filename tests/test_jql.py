@@ -0,0 +1,105 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import time
+import unittest
+
+import mock
+
+from jiractl import jql
+
+
+class TestCompileQuery(unittest.TestCase):
+
+    def test_clauses(self):
+        where, params, order = jql.compile_query(
+            u'project = "P1" AND assignee != USER AND status IN ("New", Work) AND type NOT IN (Bug)'
+        )
+        self.assertEqual(
+            u"((project_key COLLATE NOCASE IN (?) OR project COLLATE NOCASE IN (?)) AND "
+            u"assignee COLLATE NOCASE NOT IN (?) AND status COLLATE NOCASE IN (?, ?) AND "
+            u"type COLLATE NOCASE NOT IN (?))",
+            where
+        )
+        self.assertEqual([u"P1", u"P1", u"USER", u"New", u"Work", u"Bug"], params)
+        self.assertEqual(u"", order)
+
+    def test_or_and_parentheses(self):
+        where, params, _ = jql.compile_query(u"(key = P1-1 or summary ~ 'a \\'b') and not id = 10")
+        self.assertEqual(
+            u"((key COLLATE NOCASE IN (?) OR summary LIKE ? ESCAPE '\\') AND NOT id COLLATE NOCASE IN (?))", where
+        )
+        self.assertEqual([u"P1-1", u"%a 'b%", u"10"], params)
+
+    def test_escape_like(self):
+        where, params, _ = jql.compile_query(u"summary !~ '100%_done'")
+        self.assertEqual(u"summary NOT LIKE ? ESCAPE '\\'", where)
+        self.assertEqual([u"%100\\%\\_done%"], params)
+
+    def test_covers(self):
+        self.assertTrue(jql.covers(u"project = P1", u"project = p1 AND status = Open ORDER BY key"))
+        self.assertTrue(jql.covers(u"project = P1 AND type = Bug", u"type = Bug AND (status = Open) AND project = P1"))
+        self.assertTrue(jql.covers(u"project = P1 AND type = Bug", u"(project = P1 AND type = Bug) AND status = Open"))
+        self.assertTrue(jql.covers(u"ORDER BY key", u"status = Open"))
+        self.assertFalse(jql.covers(u"project = P1", u"project = P1 OR status = Open"))
+        self.assertFalse(jql.covers(u"project = P1 AND type = Bug", u"project = P1"))
+        self.assertFalse(jql.covers(u"project = P1", u"project IN (P1, P2)"))
+        self.assertFalse(jql.covers(u"assignee = currentUser()", u"assignee = currentUser()"))
+
+    def test_dates(self):
+        where, params, _ = jql.compile_query(u"updated >= -2d AND created < '2017-01-01'", now=1000000)
+        self.assertEqual(u"(updated_at >= ? AND created_at < ?)", where)
+        self.assertEqual([1000000 - 2 * 86400, time.mktime((2017, 1, 1, 0, 0, 0, 0, 0, -1))], params)
+
+    def test_order_by(self):
+        where, params, order = jql.compile_query(u"ORDER BY updated DESC, key")
+        self.assertEqual(u"1", where)
+        self.assertEqual(
+            u"updated_at DESC, project_key ASC, CAST(substr(key, instr(key, '-') + 1) AS INTEGER) ASC", order
+        )
+
+    def test_unsupported(self):
+        for query in (
+            u"assignee = currentUser()",
+            u"assignee IS EMPTY",
+            u"assignee = EMPTY",
+            u"priority = High",
+            u"summary > a",
+            u"updated = -1d",
+            u"updated > startOfDay()",
+            u"project = P1 AND",
+            u"project = P1 ORDER BY priority",
+            u"(project = P1",
+        ):
+            self.assertRaises(jql.UnsupportedQuery, jql.compile_query, query)
+
+
+class TestParseTime(unittest.TestCase):
+
+    def test_parse_time(self):
+        self.assertEqual(1483228800, jql.parse_time("2017-01-01T00:00:00.000+0000"))
+        self.assertEqual(1483228800, jql.parse_time("2017-01-01T03:00:00.000+0300"))
+        self.assertEqual(1483228800, jql.parse_time("2016-12-31T19:00:00-05:00"))
+        self.assertIsNone(jql.parse_time(None))
+        self.assertEqual(1483228800120, jql.parse_time("2017-01-01T03:00:00.12+0300", milliseconds=True))
+        self.assertEqual(1483228800000, jql.parse_time("2016-12-31T19:00:00-05:00", milliseconds=True))
+
+    def test_parse_time_cache_is_bounded(self):
+        with mock.patch.dict(jql.DAYS, clear=True), mock.patch.object(jql, "DAYS_LIMIT", 2):
+            for day in range(1, 6):
+                self.assertEqual(
+                    1483228800 + (day - 1) * 86400, jql.parse_time("2017-01-0{0}T00:00:00.000+0000".format(day))
+                )
+                self.assertLessEqual(len(jql.DAYS), 2)
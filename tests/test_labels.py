@@ -13,6 +13,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import json
+
 import mock
 
 from jiractl.commands import labels
@@ -27,58 +29,100 @@ class TestListLabels(base.BaseUnitTest):
         self.jira.issue.return_value = mock.Mock(fields=mock.Mock(labels=["label1"]))
         self.check_output_many(self.command, ['--issue=ISSUE'], 1)
 
-        self.jira.issue.assert_called_once_with("ISSUE")
+        self.jira.issue.assert_called_once_with("ISSUE", fields="labels")
 
     def test_required_arguments(self):
         self.check_required_arguments(self.command, ['--issue=ISSUE'])
 
 
-class TestAddLabels(base.BaseUnitTest):
-    command = labels.AddLabel
+class LabelUpdateTestMixin(object):
+    operation = None
 
-    def test_add_existed_label(self):
-        self.jira.issue.return_value = mock.Mock(fields=mock.Mock(labels=["label1"]))
-        argv = ['--issue=ISSUE', '--labels=label1']
-        self.check_stdout(self.command, argv, "Done.\n")
-        self.jira.issue.assert_called_once_with("ISSUE")
-        self.assertEqual(0, self.jira.issue.return_value.update.call_count)
+    def setUp(self):
+        super(LabelUpdateTestMixin, self).setUp()
+        # child mocks are created on first access, that is not thread-safe
+        self.jira._get_url.return_value = "URL"
+        self.jira._session.put.return_value = mock.Mock()
 
-    def test_add_new_label(self):
-        self.jira.issue.return_value = mock.Mock(fields=mock.Mock(labels=[]))
-        argv = ['--issue=ISSUE', '--labels=label1']
-        self.check_stdout(self.command, argv, "Done.\n")
-        self.jira.issue.assert_called_once_with("ISSUE")
-        self.jira.issue.return_value.update.assert_called_once_with(fields={"labels": ["label1"]})
+    def check_updates(self, *expected):
+        self.assertEqual(0, self.jira.issue.call_count)
+        self.jira._get_url.assert_has_calls([mock.call("issue/{0}".format(x)) for x, _ in expected], any_order=True)
+        self.assertEqual(
+            sorted([{"update": {"labels": [{self.operation: x} for x in labels]}} for _, labels in expected]),
+            sorted(json.loads(x[1]["data"]) for x in self.jira._session.put.call_args_list)
+        )
 
-    def test_add_labels(self):
-        self.jira.issue.return_value = mock.Mock(fields=mock.Mock(labels=["label1", "label2"]))
+    def test_update_labels(self):
         argv = ['--issue=ISSUE', '--labels', 'label2', 'label3']
         self.check_stdout(self.command, argv, "Done.\n")
-        self.jira.issue.assert_called_once_with("ISSUE")
-        self.jira.issue.return_value.update.assert_called_once_with(fields={"labels": ["label1", "label2", "label3"]})
+        self.check_updates(("ISSUE", ["label2", "label3"]))
+
+    def test_update_many_issues(self):
+        argv = ['--issue', 'I1', 'I2', '--labels', 'label1']
+        self.check_stdout(self.command, argv, "Done.\n")
+        self.check_updates(("I1", ["label1"]), ("I2", ["label1"]))
+
+    def test_report_failures(self):
+        self.jira._session.put.side_effect = [mock.Mock(), ValueError("error")]
+        argv = ['--issue', 'I1', 'I2', '--labels', 'label1', '--workers=1']
+        self.check_stdout(self.command, argv, "Failed 1 of 2.\n")
+        self.stderr.write.assert_any_call(u"I2: error\n")
 
     def test_required_arguments(self):
         argv = ['--issue=ISSUE', '--labels=label']
         self.check_required_arguments(self.command, argv)
 
 
-class TestDropLabels(base.BaseUnitTest):
-    command = labels.DropLabel
-
-    def test_delete_non_existed_labels(self):
-        self.jira.issue.return_value = mock.Mock(fields=mock.Mock(labels=["label2"]))
-        argv = ['--issue=ISSUE', '--labels', 'label1']
+class TestAddLabels(LabelUpdateTestMixin, base.BaseUnitTest):
+    command = labels.AddLabel
+    operation = "add"
+
+    def test_query(self):
+        self.jira.search_issues.return_value = [
+            mock.Mock(key="I1", fields=mock.Mock(labels=["label1"])),
+            mock.Mock(key="I2", fields=mock.Mock(labels=["label2"])),
+        ]
+        argv = ['--query=project=P1', '--labels=label1']
         self.check_stdout(self.command, argv, "Done.\n")
-        self.jira.issue.assert_called_once_with("ISSUE")
-        self.assertEqual(0, self.jira.issue.return_value.update.call_count)
+        self.jira.search_issues.assert_called_once_with("project=P1", startAt=0, maxResults=100, fields="labels")
+        self.check_updates(("I2", ["label1"]))
 
-    def test_delete_labels(self):
-        self.jira.issue.return_value = mock.Mock(fields=mock.Mock(labels=["label1", "label2"]))
-        argv = ['--issue=ISSUE', '--labels', 'label2', 'label3']
-        self.check_stdout(self.command, argv, "Done.\n")
-        self.jira.issue.assert_called_once_with("ISSUE")
-        self.jira.issue.return_value.update.assert_called_once_with(fields={"labels": ["label1"]})
 
-    def test_required_arguments(self):
-        argv = ['--issue=ISSUE', '--labels=label']
-        self.check_required_arguments(self.command, argv)
+class TestDropLabels(LabelUpdateTestMixin, base.BaseUnitTest):
+    command = labels.DropLabel
+    operation = "remove"
+
+    def test_query(self):
+        self.jira.search_issues.return_value = [
+            mock.Mock(key="I1", fields=mock.Mock(labels=["label1"])),
+            mock.Mock(key="I2", fields=mock.Mock(labels=["label2"])),
+        ]
+        argv = ['--query=project=P1', '--labels=label1']
+        self.check_stdout(self.command, argv, "Done.\n")
+        self.check_updates(("I1", ["label1"]))
+
+    def test_query_depends_on_labels(self):
+        found = ["I1", "I2", "I3"]
+        events = []
+
+        def search(query, startAt, maxResults, fields):
+            events.append("search")
+            page = mock.MagicMock()
+            page.__iter__.return_value = [
+                mock.Mock(key=x, fields=mock.Mock(labels=["old"])) for x in found[startAt:startAt + maxResults]
+            ]
+            page.__len__.return_value = len(found[startAt:startAt + maxResults])
+            page.total = len(found)
+            return page
+
+        def update(url, data):
+            # the updated issue does not match query any more
+            events.append("update")
+            found.pop(0)
+            return mock.Mock()
+
+        self.jira.search_issues.side_effect = search
+        self.jira._session.put.side_effect = update
+        argv = ['--query=labels=old', '--labels=old', '--page-size=1', '--workers=1']
+        self.check_stdout(self.command, argv, "Done.\n")
+        self.assertEqual(["search"] * 3 + ["update"] * 3, events)
@@ -13,6 +13,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from jira import client
 import mock
 
 from jiractl.commands import links
@@ -29,12 +30,55 @@ class TestListLinks(base.BaseUnitTest):
 
         self.check_output_many(self.command, ['--issue=ISSUE'], 2)
 
-        self.jira.issue.assert_called_once_with("ISSUE")
+        self.jira.issue.assert_called_once_with("ISSUE", fields="issuelinks")
         self.jira.remote_links.assert_called_once_with("ISSUE")
 
+    def test_many_issues(self):
+        self.jira.issue.side_effect = lambda x, fields: mock.Mock(fields=mock.Mock(issuelinks=[mock.Mock()]), key=x)
+        self.jira.remote_links.return_value = [mock.Mock()]
+
+        self.check_output(
+            self.command, ['--issue', 'I1', 'I2', 'I3', '--workers=2'],
+            [("I1",) + (mock.ANY,) * 5] * 2 + [("I2",) + (mock.ANY,) * 5] * 2 + [("I3",) + (mock.ANY,) * 5] * 2
+        )
+        self.assertEqual(3, self.jira.issue.call_count)
+        self.jira.remote_links.assert_has_calls([mock.call("I1"), mock.call("I2"), mock.call("I3")], any_order=True)
+
+    def test_query(self):
+        self.jira.search_issues.return_value = [
+            mock.Mock(fields=mock.Mock(issuelinks=[mock.Mock(), mock.Mock()]), key="I1"),
+            mock.Mock(fields=mock.Mock(issuelinks=[]), key="I2"),
+        ]
+        self.jira.remote_links.return_value = [mock.Mock()]
+
+        self.check_output(
+            self.command, ['--query=project=P1'],
+            [("I1",) + (mock.ANY,) * 5] * 3 + [("I2",) + (mock.ANY,) * 5]
+        )
+        self.jira.search_issues.assert_called_once_with("project=P1", startAt=0, maxResults=100, fields="issuelinks")
+        self.assertEqual(0, self.jira.issue.call_count)
+        self.assertEqual(2, self.jira.remote_links.call_count)
+
+    def test_query_server_limits_page_size(self):
+        issues = [mock.Mock(fields=mock.Mock(issuelinks=[]), key=x) for x in ("I1", "I2", "I3")]
+        self.jira.search_issues.side_effect = [
+            client.ResultList(issues[:2], _total=3), client.ResultList(issues[2:], _total=3),
+        ]
+        self.jira.remote_links.return_value = [mock.Mock()]
+
+        self.check_output(
+            self.command, ['--query=project=P1', '--page-size=5'],
+            [("I1",) + (mock.ANY,) * 5, ("I2",) + (mock.ANY,) * 5, ("I3",) + (mock.ANY,) * 5]
+        )
+        self.jira.search_issues.assert_called_with("project=P1", startAt=2, maxResults=5, fields="issuelinks")
+
     def test_required_arguments(self):
         self.check_required_arguments(self.command, ['--issue=ISSUE'])
 
+    def test_issue_and_query_are_exclusive(self):
+        argv = ['--issue=ISSUE', '--query=project=P1']
+        self.check_stderr(self.command, argv, SystemExit, "not allowed with argument")
+
 
 class TestAddLink(base.BaseUnitTest):
     command = links.AddLink
@@ -44,6 +88,7 @@ class TestAddLink(base.BaseUnitTest):
         argv = ['--issue=ISSUE', '--type=DEPENDS', '--target=TARGET', '--text=TEXT']
         self.check_output_one(self.command, argv)
         self.jira.create_issue_link.assert_called_once_with("DEPENDS", "TARGET", "ISSUE", "TEXT")
+        self.assertEqual(0, self.jira.issue_link.call_count)
 
     def test_add_issue_link_wo_text(self):
         self.jira.create_issue.return_value = mock.Mock()
@@ -51,13 +96,25 @@ class TestAddLink(base.BaseUnitTest):
         self.check_output_one(self.command, argv)
         self.jira.create_issue_link.assert_called_once_with("DEPENDS", "TARGET", "ISSUE", None)
 
+    def test_add_issue_link_by_inward_description(self):
+        argv = ['--issue=ISSUE', '--type=is depended on by', '--target=TARGET']
+        self.check_output_one(self.command, argv)
+        self.jira.create_issue_link.assert_called_once_with("DEPENDS", "ISSUE", "TARGET", None)
+
+    def test_unknown_link_type(self):
+        argv = ['--issue=ISSUE', '--type=BLOCKS', '--target=TARGET']
+        self.assertRaises(ValueError, self.check_output_one, self.command, argv)
+        self.assertEqual(0, self.jira.create_issue_link.call_count)
+
     def test_add_remote_link_with_text_and_icon(self):
         self.jira.create_issue.return_value = mock.Mock()
+        self.jira.add_simple_link.return_value = mock.Mock(id="1")
         argv = ['--issue=ISSUE', '--type=link', '--target=TARGET', '--text=TEXT', '--icon=ICON']
-        self.check_output_one(self.command, argv)
+        self.check_output(self.command, argv, ("L1", "link", "TEXT", "TARGET", "ICON"))
         self.jira.add_simple_link.assert_called_once_with(
             "ISSUE", {"url": "TARGET", "title": "TEXT", "icon": {"url16x16": "ICON"}}
         )
+        self.assertEqual(0, self.jira.remote_link.call_count)
 
     def test_add_remote_link_wo_text_and_icon(self):
         self.jira.create_issue.return_value = mock.Mock()
@@ -72,6 +129,23 @@ class TestAddLink(base.BaseUnitTest):
             }
         )
 
+    def test_link_id_is_taken_from_location(self):
+        self.jira.create_issue_link.return_value = mock.Mock(headers={"Location": "http://localhost/issueLink/10"})
+        argv = ['--issue=ISSUE', '--type=DEPENDS', '--target=TARGET']
+        self.check_output(self.command, argv, ("I10", "DEPENDS", "TARGET", "", ""))
+
+    def test_verify_issue_link(self):
+        self.jira.create_issue_link.return_value = mock.Mock(headers={"Location": "http://localhost/issueLink/10"})
+        argv = ['--issue=ISSUE', '--type=DEPENDS', '--target=TARGET', '--verify']
+        self.check_output_one(self.command, argv)
+        self.jira.issue_link.assert_called_once_with("10")
+
+    def test_verify_remote_link(self):
+        self.jira.add_simple_link.return_value = mock.Mock(id="1")
+        argv = ['--issue=ISSUE', '--type=link', '--target=TARGET', '--verify']
+        self.check_output_one(self.command, argv)
+        self.jira.remote_link.assert_called_once_with("ISSUE", "1")
+
     def test_required_arguments(self):
         argv = ['--issue=ISSUE', '--type=link', '--target=TARGET']
         self.check_required_arguments(self.command, argv)
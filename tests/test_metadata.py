@@ -0,0 +1,103 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import io
+
+import jira
+import mock
+import requests
+from requests import adapters
+
+from jiractl import client
+from jiractl.commands import metadata
+from jiractl import ratelimit
+
+from tests import base
+
+
+class TestListMetadata(base.BaseUnitTest):
+    command = metadata.ListMetadata
+
+    def test_success(self):
+        self.check_output(self.command, ['--kind=issuetypes'], [("1", "T1"), ("2", "Bug")])
+        self.check_output(self.command, ['--kind=issuetypes'], [("1", "T1"), ("2", "Bug")])
+        self.jira._get_json.assert_called_once_with("issuetype")
+
+    def test_required_arguments(self):
+        self.check_required_arguments(self.command, ['--kind=fields'])
+
+
+class TestRefreshMetadata(base.BaseUnitTest):
+    command = metadata.RefreshMetadata
+
+    def test_refresh_all(self):
+        self.check_stdout(self.command, [], "Done.\n")
+        self.check_stdout(self.command, [], "Done.\n")
+        self.assertEqual(10, self.jira._get_json.call_count)
+
+    def test_refresh_selected(self):
+        self.check_stdout(self.command, ['--kind', 'fields', 'statuses'], "Done.\n")
+        self.jira._get_json.assert_has_calls([mock.call("field"), mock.call("status")])
+        self.assertEqual(2, self.jira._get_json.call_count)
+
+
+class TestJiraClient(base.BaseUnitTest):
+
+    def test_metadata_is_taken_from_cache(self):
+        cache_mock = mock.Mock()
+        cache_mock.get.side_effect = lambda jira, kind: base.METADATA["issueLinkType"]["issueLinkTypes"]
+        with mock.patch("jira.client.ResilientSession") as session_mock:
+            jira = client.JiraClient(
+                cache_mock, server="http://jira", options={"check_update": False}, get_server_info=False
+            )
+            self.assertEqual(["DEPENDS"], [x.name for x in jira.issue_link_types()])
+        self.assertEqual(0, session_mock.return_value.get.call_count)
+        cache_mock.get.assert_has_calls([mock.call(jira, "fields"), mock.call(jira, "linktypes")])
+
+    def test_transport_options(self):
+        cache_mock = mock.Mock()
+        cache_mock.get.return_value = []
+        with mock.patch("jira.client.ResilientSession") as session_mock:
+            jira = client.JiraClient(
+                cache_mock, server="http://jira", options={"check_update": False}, get_server_info=False,
+                limiter=ratelimit.RateLimiter(8), pool_size=4, keep_alive=False, compression=False,
+                timeout=(1, 2), json_decoder="json"
+            )
+        session_mock.assert_called_once_with(timeout=(1, 2))
+        session = session_mock.return_value
+        session.headers.update.assert_called_with({"Accept-Encoding": "identity", "Connection": "close"})
+        self.assertEqual([4, 4], [x[0][1]._pool_maxsize for x in session.mount.call_args_list])
+
+        session.get.return_value.content = b'{"id": "1"}'
+        self.assertEqual({"id": "1"}, jira._get_json("issue/1"))
+        session.get.return_value.content = b""
+        self.assertEqual({}, jira._get_json("issue/1"))
+        self.assertRaises(ValueError, client.JiraClient, mock.Mock(), json_decoder="unknown")
+
+    def test_throttled_post_is_sent_once(self):
+        cache_mock = mock.Mock()
+        cache_mock.get.return_value = []
+        jira_client = client.JiraClient(
+            cache_mock, server="http://jira", options={"check_update": False}, get_server_info=False,
+            limiter=ratelimit.RateLimiter(8, min_rate=1000)
+        )
+        response = requests.Response()
+        response.status_code = 503
+        response.raw = io.BytesIO(b"")
+        with mock.patch.object(adapters.HTTPAdapter, "send", return_value=response) as send_mock:
+            with mock.patch("time.sleep") as sleep_mock:
+                self.assertRaises(jira.JIRAError, jira_client._session.post, "http://jira/rest/api/2/issue/bulk")
+        self.assertEqual(1, send_mock.call_count)
+        self.assertEqual(0, sleep_mock.call_count)
@@ -0,0 +1,139 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+
+import mock
+import requests
+from requests import adapters
+
+from jiractl import ratelimit
+
+
+def make_response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response.raw = mock.Mock()
+    return response
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.limiter = ratelimit.RateLimiter(8, clock=lambda: self.now)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(5, ratelimit.parse_retry_after("5"))
+        self.assertEqual(10, ratelimit.parse_retry_after("Thu, 01 Jan 1970 00:00:20 GMT", now=10))
+        self.assertIsNone(ratelimit.parse_retry_after("soon"))
+        self.assertIsNone(ratelimit.parse_retry_after(None))
+
+    def test_throttling_decreases_limits(self):
+        for _ in range(4):
+            self.limiter.acquire()
+            self.now += 0.5
+        self.limiter.release(0.1, throttled=True, retry_after=2)
+        self.assertEqual(4, self.limiter.window)
+        # 4 requests in 2 seconds, the rate is halved
+        self.assertEqual(1, self.limiter.rate)
+        self.assertEqual(2, self.limiter.get_delay(self.now))
+        # the requests in flight do not decrease limits again
+        self.limiter.release(0.1, throttled=True)
+        self.assertEqual(4, self.limiter.window)
+
+    def test_success_increases_limits(self):
+        limiter = ratelimit.RateLimiter(8, rate=2, clock=lambda: self.now)
+        limiter.window = 2
+        limiter.acquire()
+        limiter.release(0.1)
+        self.assertEqual(2.5, limiter.window)
+        self.assertEqual(2.5, limiter.rate)
+
+    def test_slow_response_decreases_concurrency(self):
+        self.limiter.acquire()
+        self.limiter.release(0.1)
+        self.limiter.acquire()
+        self.limiter.release(0.3)
+        self.assertEqual(8, self.limiter.window)
+        self.limiter.acquire()
+        self.limiter.release(1.0)
+        self.assertEqual(6.4, self.limiter.window)
+        self.assertIsNone(self.limiter.rate)
+
+    def test_rate_delays_requests(self):
+        limiter = ratelimit.RateLimiter(8, rate=2, clock=lambda: self.now)
+        limiter.acquire()
+        limiter.release()
+        self.assertEqual(0.5, limiter.get_delay(self.now))
+        self.assertEqual(0, limiter.get_delay(self.now + 0.5))
+
+
+class TestRateLimitedAdapter(unittest.TestCase):
+
+    def setUp(self):
+        # the throttled requests are retried without delay
+        self.limiter = ratelimit.RateLimiter(8, min_rate=1000)
+        self.adapter = ratelimit.RateLimitedAdapter(self.limiter, retries=2)
+        m = mock.patch.object(adapters.HTTPAdapter, 'send')
+        self.send = m.start()
+        self.addCleanup(m.stop)
+
+    def make_request(self, method):
+        return requests.Request(method, "http://jira/rest/api/2/issue/1").prepare()
+
+    def test_retry_throttled_get(self):
+        self.send.side_effect = [make_response(429, {"Retry-After": "0"}), make_response(200)]
+        self.assertEqual(200, self.adapter.send(self.make_request("GET")).status_code)
+        self.assertEqual(2, self.send.call_count)
+        self.assertEqual(0, self.limiter.in_flight)
+
+    @mock.patch('random.random', return_value=0)
+    def test_retries_are_limited(self, _):
+        self.send.side_effect = [make_response(503)] * 3
+        self.assertEqual(503, self.adapter.send(self.make_request("GET")).status_code)
+        self.assertEqual(3, self.send.call_count)
+
+    def test_post_is_not_retried(self):
+        self.send.return_value = make_response(429, {"Retry-After": "0"})
+        self.assertEqual(429, self.adapter.send(self.make_request("POST")).status_code)
+        self.assertEqual(1, self.send.call_count)
+
+    @mock.patch('time.sleep')
+    def test_retry_gateway_error_of_get(self, sleep_mock):
+        self.send.side_effect = [make_response(502), make_response(504), make_response(200)]
+        self.assertEqual(200, self.adapter.send(self.make_request("GET")).status_code)
+        self.assertEqual(3, self.send.call_count)
+        self.assertEqual(2, sleep_mock.call_count)
+
+    @mock.patch('time.sleep')
+    def test_retry_connection_error_of_get(self, _):
+        self.send.side_effect = [requests.ConnectionError(), make_response(200)]
+        self.assertEqual(200, self.adapter.send(self.make_request("GET")).status_code)
+        self.assertEqual(0, self.limiter.in_flight)
+
+    def test_post_is_not_retried_after_gateway_error(self):
+        self.send.return_value = make_response(502)
+        self.assertEqual(502, self.adapter.send(self.make_request("POST")).status_code)
+        self.send.side_effect = requests.ConnectionError()
+        self.assertRaises(requests.ConnectionError, self.adapter.send, self.make_request("POST"))
+        self.assertEqual(2, self.send.call_count)
+
+    @mock.patch('time.sleep')
+    def test_error_releases_slot(self, _):
+        self.send.side_effect = requests.ConnectionError()
+        self.assertRaises(requests.ConnectionError, self.adapter.send, self.make_request("GET"))
+        self.assertEqual(0, self.limiter.in_flight)
@@ -0,0 +1,77 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+
+from jiractl.commands import comments
+from jiractl.commands import issues
+from jiractl.commands import links
+from jiractl import records
+
+
+ISSUE = {
+    "id": "10",
+    "key": "P1-1",
+    "fields": {
+        "project": {"key": "P1", "name": "Project 1"},
+        "summary": "S1",
+        "issuetype": {"name": "Bug"},
+        "assignee": None,
+        "status": {"name": "Open"},
+        "customfield_10010": 3,
+    },
+}
+
+
+class TestRecord(unittest.TestCase):
+
+    def test_attributes(self):
+        record = records.Record(ISSUE)
+        self.assertEqual("P1-1", record.key)
+        self.assertEqual("Project 1", record.fields.project.name)
+        self.assertIsNone(record.fields.assignee)
+        self.assertIs(ISSUE, record.raw)
+        self.assertRaises(AttributeError, getattr, record.fields, "labels")
+        self.assertIsNone(getattr(record.fields, "labels", None))
+
+    def test_lists(self):
+        record = records.wrap({"items": [{"a": 1}, 2]})
+        self.assertEqual(1, record.items[0].a)
+        self.assertEqual(2, record.items[1])
+
+    def test_format_issue(self):
+        self.assertEqual(
+            ("Project 1", "10", "P1-1", "S1", "Bug", None, "Open", 3),
+            issues.JiraIssueMixin.format_issue(records.Record(ISSUE), ["customfield_10010"])
+        )
+
+    def test_format_comment(self):
+        comment = records.Record({"id": "1", "updated": "U1", "author": {"name": "user"}, "body": "B1"})
+        self.assertEqual(("1", "U1", "user", "B1"), comments.JiraCommentMixin.format_comment(comment))
+
+    def test_format_issue_link(self):
+        link = records.Record({
+            "id": "5", "type": {"inward": "is depended on by", "outward": "depends on"},
+            "inwardIssue": {"key": "P1-2", "fields": {"summary": "S2", "status": {"name": "Open"}}},
+        })
+        self.assertEqual(
+            ("I5", "is depended on by", "S2", "Open", ""), links.JiraLinkMixin.format_issue_link(link)
+        )
+
+    def test_format_remote_link(self):
+        link = records.Record({"id": 7, "object": {"url": "http://x", "title": "X"}})
+        self.assertEqual(
+            ("L7", "link", "X", "http://x", ""), links.JiraLinkMixin().format_remote_link(link)
+        )
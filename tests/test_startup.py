@@ -0,0 +1,88 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import mock
+
+from jiractl import app
+from jiractl.commands import issues
+from jiractl import index
+
+
+# the modules, that must not be imported before the first request
+HEAVY_MODULES = ("jira", "requests", "oauthlib")
+
+STARTUP_SCRIPT = """
+import json
+import sys
+
+from jiractl import app
+app.create_app(app.JiraCommandManager("jiractl"))
+print(json.dumps({"modules": sorted(sys.modules)}))
+"""
+
+
+class TestIndex(unittest.TestCase):
+
+    def test_parse_entry_points(self):
+        self.assertEqual(
+            {"issue": "jiractl.commands.issues:ShowIssue", "issues": "jiractl.commands.issues:ListIssues"},
+            index.parse_entry_points(
+                "\nissue=jiractl.commands.issues:ShowIssue\n  issues = jiractl.commands.issues:ListIssues\n"
+            )
+        )
+
+    def test_write_index(self):
+        with tempfile.NamedTemporaryFile(suffix=".py") as stream:
+            index.write_index(stream.name, "1.0", {"issue": "jiractl.commands.issues:ShowIssue"})
+            namespace = {}
+            execfile(stream.name, namespace)
+        self.assertEqual("1.0", namespace["VERSION"])
+        self.assertEqual({"issue": "jiractl.commands.issues:ShowIssue"}, namespace["COMMANDS"])
+
+    def test_load_commands_from_index(self):
+        commands = {"issue_create": "jiractl.commands.issues:CreateIssue"}
+        with mock.patch("jiractl.index.load_index", return_value=mock.Mock(COMMANDS=commands)):
+            with mock.patch("pkg_resources.iter_entry_points") as scan_mock:
+                cmd_mgr = app.JiraCommandManager("jiractl")
+        self.assertEqual(0, scan_mock.call_count)
+        self.assertEqual(["issue create"], [x[0] for x in cmd_mgr])
+        self.assertEqual(
+            (issues.CreateIssue, "issue create", ["--id=1"]), cmd_mgr.find_command(["issue", "create", "--id=1"])
+        )
+
+    def test_scan_entry_points_without_index(self):
+        with mock.patch("jiractl.index.load_index", return_value=None):
+            with mock.patch("pkg_resources.iter_entry_points", return_value=[]) as scan_mock:
+                app.JiraCommandManager("jiractl")
+        scan_mock.assert_called_once_with("jiractl")
+
+
+class TestStartup(unittest.TestCase):
+
+    def run_startup(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output([sys.executable, "-c", STARTUP_SCRIPT], cwd=root)
+        return json.loads(output)
+
+    def test_heavy_modules_are_not_imported(self):
+        modules = set(self.run_startup()["modules"])
+        self.assertEqual([], [x for x in HEAVY_MODULES if x in modules])
@@ -0,0 +1,80 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import mock
+
+from jiractl.commands import stats
+
+from tests import base
+
+
+def make_history(day, from_status, to_status):
+    return {"created": "2020-01-{0:02d}T00:00:00.000+0000".format(day), "items": [
+        {"field": "assignee", "fromString": None, "toString": "user1"},
+        {"field": "status", "fromString": from_status, "toString": to_status},
+    ]}
+
+
+def make_issue(key, histories, total=None):
+    return {"key": key, "fields": {"created": "2020-01-06T00:00:00.000+0000", "status": {"name": "Open"}},
+            "changelog": {"total": len(histories) if total is None else total, "histories": histories}}
+
+
+HISTORIES = [
+    make_history(8, "Open", "In Progress"), make_history(7, "Open", "Open"), make_history(10, "In Progress", "Done"),
+]
+
+ISSUES = {
+    "P1-1": make_issue("P1-1", HISTORIES[:]),
+    "P1-2": make_issue("P1-2", HISTORIES[2:] + [make_history(9, "In Progress", "Open")]),
+    "P1-3": make_issue("P1-3", []),
+}
+
+
+class TestStatsIssues(base.BaseUnitTest):
+    command = stats.StatsIssues
+
+    def setUp(self):
+        super(TestStatsIssues, self).setUp()
+        self.jira._get_json.side_effect = self.get_json
+
+    def get_json(self, path, params):
+        self.assertEqual("status,created", params["fields"])
+        self.assertEqual("changelog", params["expand"])
+        if path == "search":
+            issues = [ISSUES["P1-1"], ISSUES["P1-3"]]
+            # the changelog of second issue is truncated
+            issues.insert(1, make_issue("P1-2", ISSUES["P1-2"]["changelog"]["histories"][:1], 2))
+            issues = issues[params["startAt"]:params["startAt"] + params["maxResults"]]
+            return {"startAt": params["startAt"], "total": 3, "issues": issues}
+        return ISSUES[path.split("/")[1]]
+
+    def test_durations(self):
+        self.check_output(
+            self.command, ["--query=project=P1", "--page-size=2", "--percentiles", "50", "100"],
+            [("lead time", 2, 4.0, 4.0, 4.0, 4.0), ("cycle time", 1, 2.0, 2.0, 2.0, 2.0),
+             # the issue without transitions is open until now
+             ("status Open", 3, mock.ANY, 2.0, mock.ANY, mock.ANY),
+             ("status In Progress", 2, 2.5, 2.0, 3.0, 3.0)],
+            ("metric", "issues", "mean", "p50", "p100", "max")
+        )
+
+    def test_throughput(self):
+        self.check_output(
+            self.command, ["--query=project=P1", "--report=throughput"], [("2020-01-06", 2)], ("week", "completed")
+        )
+
+    def test_required_arguments(self):
+        self.check_required_arguments(self.command, ["--query=project=P1"])
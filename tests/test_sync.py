@@ -0,0 +1,154 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import os
+import sqlite3
+
+from jira import client
+import mock
+
+from jiractl import app
+from jiractl.commands import sync
+from jiractl import jql
+from jiractl import mirror
+
+from tests import base
+
+
+def named(name):
+    value = mock.Mock()
+    value.name = name
+    return value
+
+
+def make_issue(issue_id, summary="S1", status="Open"):
+    project = named("Project 1")
+    project.key = "P1"
+    fields = mock.Mock(
+        project=project, summary=summary, issuetype=named("Bug"), assignee=named("USER"), status=named(status),
+        updated="2017-01-01T00:00:00.000+0000", created="2016-12-31T00:00:00.000+0000"
+    )
+    return mock.Mock(id=issue_id, key="P1-" + issue_id, fields=fields, raw={"id": issue_id, "fields": {}})
+
+
+class TestSyncIssues(base.BaseUnitTest):
+    command = sync.SyncIssues
+
+    def setUp(self):
+        super(TestSyncIssues, self).setUp()
+        self.db = os.path.join(self.tmpdir, "mirror.db")
+        self.found = {}
+        self.jira.search_issues.side_effect = self.search_issues
+
+    def search_issues(self, query, startAt, maxResults, fields):
+        issues = self.found["updated" if fields == "updated" else "all"]
+        return client.ResultList(issues[startAt:startAt + maxResults], _total=len(issues))
+
+    def run_sync(self, *args):
+        argv = ['--query', 'project=P1 ORDER BY key', '--db', self.db] + list(args)
+        with mock.patch('jiractl.commands.sync.SyncIssues.produce_output') as output_mock:
+            app.debug("command", self.command, argv)
+        return output_mock.call_args[0][2]
+
+    def get_rows(self):
+        connection = sqlite3.connect(self.db)
+        try:
+            return connection.execute("SELECT id, key, summary, status, raw FROM issues ORDER BY id").fetchall()
+        finally:
+            connection.close()
+
+    def test_first_sync_fetches_all(self):
+        self.found["all"] = [make_issue("1"), make_issue("2"), make_issue("3")]
+        self.assertEqual(("project=P1 ORDER BY key", 3, 0, 3), self.run_sync("--page-size=2"))
+        self.jira.search_issues.assert_any_call(
+            "project=P1 ORDER BY created ASC", startAt=0, maxResults=2,
+            fields="project,summary,issuetype,assignee,status,updated,created"
+        )
+        rows = self.get_rows()
+        self.assertEqual([("1", "P1-1", "S1", "Open"), ("2", "P1-2", "S1", "Open")], [x[:4] for x in rows[:2]])
+        self.assertEqual({"id": "1", "fields": {}}, json.loads(rows[0][4]))
+
+    def test_next_sync_fetches_updated(self):
+        self.found["all"] = [make_issue("1"), make_issue("2")]
+        self.run_sync()
+        self.found["all"] = [make_issue("2", summary="S2", status="Closed")]
+        self.jira.search_issues.reset_mock()
+        self.assertEqual(("project=P1 ORDER BY key", 1, 0, 2), self.run_sync())
+        query = self.jira.search_issues.call_args[0][0]
+        self.assertRegexpMatches(query, r"^\(project=P1\) AND updated >= -\d+m ORDER BY created ASC$")
+        self.assertEqual(("2", "P1-2", "S2", "Closed"), self.get_rows()[1][:4])
+
+    def test_scan_removes_issues(self):
+        self.found["all"] = [make_issue("1"), make_issue("2")]
+        self.run_sync()
+        self.found["all"] = []
+        self.found["updated"] = [make_issue("2")]
+        self.assertEqual(("project=P1 ORDER BY key", 0, 1, 1), self.run_sync("--scan-interval=0"))
+        self.assertEqual(["2"], [x[0] for x in self.get_rows()])
+
+    def test_scan_is_periodic(self):
+        self.found["all"] = [make_issue("1")]
+        self.run_sync()
+        self.jira.search_issues.reset_mock()
+        self.run_sync()
+        self.assertEqual(1, self.jira.search_issues.call_count)
+
+    def test_custom_fields(self):
+        self.found["all"] = []
+        self.run_sync("--fields", "Story Points")
+        self.assertEqual(
+            "project,summary,issuetype,assignee,status,updated,created,customfield_10010",
+            self.jira.search_issues.call_args[1]["fields"]
+        )
+
+    def test_required_arguments(self):
+        self.check_required_arguments(self.command, ['--query=project=P1'])
+
+    def test_default_db_is_next_to_cache(self):
+        self.found["all"] = [make_issue("1")]
+        with mock.patch('jiractl.commands.sync.SyncIssues.produce_output'):
+            app.debug("command", self.command, ['--query', 'project=P1'])
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, "mirror.db")))
+
+
+class TestIssueMirror(base.BaseUnitTest):
+
+    def make_store(self):
+        store = mirror.IssueMirror(os.path.join(self.tmpdir, "mirror.db"))
+        self.addCleanup(store.close)
+        return store
+
+    def test_issue_is_kept_while_it_matches_any_query(self):
+        store = self.make_store()
+        row = ("P1", "1", "P1-1", "S1", "Bug", "USER", "Open", "P1", "2017-01-01", None, {})
+        store.put("q1", [row])
+        store.put("q2", [row])
+        self.assertEqual(1, store.reconcile("q1", []))
+        self.assertEqual(1, store.count("q2"))
+        store.reconcile("q2", [])
+        self.assertEqual(0, store.connection.execute("SELECT COUNT(*) FROM issues").fetchone()[0])
+
+    def test_search(self):
+        store = self.make_store()
+        store.put("q", [
+            ("Project 1", "1", "P1-1", "S1", "Bug", "USER", "Open", "P1", "2017-01-01T00:00:00.000+0000", None, {}),
+            ("Project 1", "2", "P1-2", "S2", "Bug", "USER", "Closed", "P1", "2017-01-02T00:00:00.000+0000", None, {}),
+        ])
+        self.assertEqual(
+            [("Project 1", "2", "P1-2", "S2", "Bug", "USER", "Closed")],
+            list(store.search("updated_at > ?", [jql.parse_time("2017-01-01T12:00:00.000+0000")]))
+        )
+        self.assertEqual(["2", "1"], [x[1] for x in store.search("1", [], "id DESC")])
@@ -0,0 +1,120 @@
+"""
+This file is part of jiractl
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import unittest
+
+import mock
+import requests
+from requests import sessions
+
+from jiractl import app
+from jiractl.commands import issues
+from jiractl import trace
+
+from tests import base
+
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.tracer = trace.Tracer(clock=lambda: self.now)
+
+    def test_get_endpoint(self):
+        self.assertEqual("issue/{key}", trace.get_endpoint("http://jira/rest/api/2/issue/P1-1"))
+        self.assertEqual("issue/{id}/comment", trace.get_endpoint("http://jira/rest/api/2/issue/10/comment?a=1"))
+        self.assertEqual("search", trace.get_endpoint("http://jira/jira/rest/api/2/search"))
+
+    def test_percentile(self):
+        values = range(1, 101)
+        self.assertEqual(50, trace.percentile(values, 50))
+        self.assertEqual(99, trace.percentile(values, 99))
+        self.assertEqual(7, trace.percentile([7], 90))
+
+    def test_nested_phases_are_exclusive(self):
+        with self.tracer.phase("command"):
+            self.now += 1
+            with self.tracer.phase("http"):
+                self.now += 2
+            with self.tracer.phase("http"):
+                self.now += 3
+        self.assertEqual({"command": 1, "http": 5}, self.tracer.phases)
+
+    def test_summary(self):
+        for i in range(10):
+            self.tracer.record("GET", "http://jira/rest/api/2/issue/P1-{0}".format(i), 200, 10, i / 10.0)
+        self.tracer.record("POST", "http://jira/rest/api/2/issue", 400, 5, 0.5)
+        self.now = 2.0
+        self.tracer.finish()
+
+        summary = self.tracer.get_summary()
+        self.assertEqual(2.0, summary["total"])
+        get, post = summary["endpoints"]
+        self.assertEqual(("GET", "issue/{key}", 10, 0, 100), tuple(get[x] for x in trace.COLUMNS[:5]))
+        self.assertEqual((0.4, 0.8, 0.9, 0.9), (get["p50"], get["p90"], get["p99"], get["max"]))
+        self.assertEqual(("POST", "issue", 1, 1, 5), tuple(post[x] for x in trace.COLUMNS[:5]))
+
+    def test_report(self):
+        self.tracer.record("GET", "http://jira/rest/api/2/search", 200, 10, 0.25)
+        with self.tracer.phase("http"):
+            self.now += 0.25
+        self.now += 1
+        self.tracer.finish()
+
+        stream = mock.Mock()
+        self.tracer.report(stream)
+        lines = "".join(x[0][0] for x in stream.write.call_args_list).splitlines()
+        self.assertEqual(["GET", "search", "1", "0", "10", "0.250", "0.250", "0.250", "0.250"], lines[1].split())
+        self.assertEqual(["http", "0.250"], lines[3].split())
+        self.assertEqual(["other", "1.000"], lines[4].split())
+        self.assertEqual(["total", "1.250"], lines[5].split())
+
+        stream.reset_mock()
+        self.tracer.report(stream, "json")
+        summary = json.loads(stream.write.call_args[0][0])
+        self.assertEqual(1.25, summary["total"])
+        self.assertEqual("search", summary["endpoints"][0]["endpoint"])
+
+    def test_patches_are_restored(self):
+        send = sessions.Session.send
+        self.tracer.start()
+        self.assertNotEqual(send, sessions.Session.send)
+        self.tracer.finish()
+        self.assertEqual(send, sessions.Session.send)
+        self.assertNotIn("json", sessions.Session.__dict__)
+
+
+class TestTraceHttp(base.BaseUnitTest):
+
+    def test_report_to_stderr(self):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"[]"
+
+        def search_issues(*args, **kwargs):
+            request = requests.Request("GET", "http://jira/rest/api/2/search").prepare()
+            requests.Session().send(request).json()
+            return [mock.Mock()]
+
+        self.jira.search_issues.side_effect = search_issues
+        with mock.patch("requests.sessions.Session.send", return_value=response):
+            app.debug("command", issues.SearchIssues, ["--query=project=P1", "--trace-http"])
+
+        output = "".join(x[0][0] for x in self.stderr.write.call_args_list)
+        self.assertEqual(["GET", "search", "1", "0", "2"], output.split("\n")[-10].split()[:5])
+        self.assertIn("command", output)
+        self.assertIn("decode", output)
+        self.assertIn("render", output)